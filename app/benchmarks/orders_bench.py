@@ -0,0 +1,90 @@
+"""
+Order repository benchmark — query plans of services/orders.py over a million synthetic orders.
+Usage (from app/):
+    python -m benchmarks.orders_bench            # 1,000,000 orders
+    python -m benchmarks.orders_bench 200000
+
+Loads the orders in bulk, then times each plan — the time index, one secondary index, and a
+secondary index with a second filter tested per row — on the first page, on a page deep in the
+history reached by cursor, on a jump by offset, and on count(). Ends with single inserts and
+status changes against the full indexes. Times are the median of repeated runs, in ms.
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from services.orders import OrderRepository
+
+STATUSES  = ['Open', 'Processing', 'Fulfilled', 'Cancelled', 'On Hold']
+CUSTOMERS = [f'Customer {i:02}' for i in range(40)]
+PRODUCTS  = ['Gear Box', 'Sensor Kit', 'Control Unit', 'Panel Module', 'Cable Harness', 'Widget A', 'Motor Drive']
+PAGE = 50
+RUNS = 25
+
+
+def synthetic(n: int, span: float = 3 * 365 * 86400) -> list[dict]:
+    now = time.time()
+    orders = []
+    for _ in range(n):
+        qty = random.randint(1, 10)
+        orders.append({
+            'ts': now - random.uniform(0, span),
+            'status': random.choices(STATUSES, weights=[3, 4, 85, 6, 2])[0],
+            'customer': random.choice(CUSTOMERS),
+            'product': random.choice(PRODUCTS),
+            'qty': qty,
+            'amount': qty * 137.5,
+        })
+    return orders
+
+
+def timed(func, runs: int = RUNS) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(n: int) -> None:
+    random.seed(7)
+    orders = synthetic(n)
+    repo = OrderRepository()
+    start = time.perf_counter()
+    repo.extend(orders)
+    print(f'{n:,} orders loaded in {time.perf_counter() - start:.2f} s\n')
+
+    plans = {
+        'all':                 {},
+        'status':              {'status': 'Open'},
+        'customer':            {'customer': 'Customer 07'},
+        'status + customer':   {'status': 'Fulfilled', 'customer': 'Customer 07'},
+        'rare + common':       {'status': 'On Hold', 'customer': 'Customer 07'},
+        'status, last 30 d':   {'status': 'Fulfilled', 'start': time.time() - 30 * 86400, 'end': time.time()},
+    }
+    print(f'{"query":<20} {"first":>8} {"deep":>8} {"jump":>8} {"count":>8}   plan')
+    for name, filters in plans.items():
+        total = repo.count(**filters)
+        # A cursor deep into the history: the one before the last full page
+        deep = repo.page(1, offset=max(0, total - PAGE - 1), **filters)['next']
+        first_ms = timed(lambda: repo.page(PAGE, **filters))
+        deep_ms = timed(lambda: repo.page(PAGE, deep, **filters)) if deep else float('nan')
+        jump_ms = timed(lambda: repo.page(PAGE, offset=total // 2, **filters))
+        count_ms = timed(lambda: repo.count(**filters))
+        print(f'{name:<20} {first_ms:>8.3f} {deep_ms:>8.3f} {jump_ms:>8.3f} {count_ms:>8.3f}   '
+              f'{repo.explain(**filters)}')
+
+    now = time.time()
+    add_ms = timed(lambda: repo.add(now - random.uniform(0, 86400), status='Open', customer=random.choice(CUSTOMERS),
+                                    product='Gear Box', qty=1, amount=137.5), runs=1000)
+    ids = [f'ORD-{10_000 + random.randrange(n)}' for _ in range(1000)]
+    moves = iter(ids)
+    move_ms = timed(lambda: repo.set_status(next(moves), random.choice(STATUSES)), runs=1000)
+    print(f'\nadd (last 24 h) {add_ms:.3f} ms, set_status {move_ms:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,131 +1,190 @@
 """Dashboard page — KPI overview, revenue trend, order status and throughput charts."""
 
-from nicegui import ui
+import asyncio
+import logging
+
+from nicegui import app, background_tasks, ui
 import services.dashboard_data as data
+from components.feed_listener import FeedListener
+from services import charts
+from services.feeds import Feed
 from services.notifications import notify
 
-
-# ── Shared EChart base style ─────────────────────────────────────────────────
-
-_GRID    = {'left': '3%', 'right': '3%', 'bottom': '3%', 'top': '12%', 'containLabel': True}
-_TT_AXIS = {'trigger': 'axis', 'backgroundColor': '#fff', 'borderColor': '#e4e4e7', 'textStyle': {'color': '#09090b', 'fontSize': 12}}
-_TT_ITEM = {'trigger': 'item', 'backgroundColor': '#fff', 'borderColor': '#e4e4e7', 'textStyle': {'color': '#09090b', 'fontSize': 12}}
-_LEGEND  = {'textStyle': {'color': '#71717a', 'fontSize': 12}}
-
+log = logging.getLogger(__name__)
 
 # ── KPI helpers ──────────────────────────────────────────────────────────────
 
-def _kpi_card(container, label: str, icon: str, key: str, kpis: dict) -> dict:
-    v    = kpis[key]
+def _kpi_texts(v: dict) -> tuple[str, str, str]:
+    """Return (value text, delta text, delta classes) for one KPI."""
     val  = v['value']
     d    = v['delta']
     unit = v['unit']
+    delta_color  = 'text-success' if d >= 0 else 'text-danger'
+    delta_prefix = '▲' if d >= 0 else '▼'
+    return f"{unit}{val:,}", f"{delta_prefix} {abs(d)}{unit} vs yesterday", f'text-xs {delta_color} mt-1'
+
+
+# Placeholder classes until the data arrives; snapshot classes replace them where a target has some
+_LOADING_TEXT  = 'skeleton skeleton-text'
+_LOADING_CHART = 'skeleton'
+
+
+def _kpi_card(container, label: str, icon: str) -> dict:
     refs = {}
     with container:
         with ui.element('div').classes('card flex-1').style('min-width:160px'):
             with ui.row().classes('items-center justify-between mb-3'):
                 ui.label(label).classes('label-text')
                 ui.icon(icon).style('font-size:1.2rem;color:var(--muted-fg)')
-            refs['value'] = ui.label(f"{unit}{val:,}").classes('text-2xl font-bold')
-            delta_color  = 'text-success' if d >= 0 else 'text-danger'
-            delta_prefix = '▲' if d >= 0 else '▼'
-            refs['delta'] = ui.label(f"{delta_prefix} {abs(d)}{unit} vs yesterday").classes(f'text-xs {delta_color} mt-1')
+            refs['value'] = ui.label().classes(f'text-2xl font-bold {_LOADING_TEXT} w-24 mt-2')
+            refs['delta'] = ui.label().classes(f'{_LOADING_TEXT} w-32 mt-3')
     return refs
 
 
 # ── Chart builders ───────────────────────────────────────────────────────────
 
-def _revenue_chart(rev: dict):
+def _revenue_chart():
     return ui.echart({
-        'tooltip': {**_TT_AXIS, 'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#18181b'}}},
-        'legend': {**_LEGEND, 'data': ['Revenue', 'Forecast'], 'left': 'center', 'top': 0},
-        'grid': {'left': '3%', 'right': '3%', 'bottom': '3%', 'top': '14%', 'containLabel': True},
-        'xAxis': {'type': 'category', 'boundaryGap': False, 'data': rev['days'],
-                  'axisLine': {'lineStyle': {'color': '#e4e4e7'}},
-                  'axisTick': {'show': False},
-                  'axisLabel': {'color': '#71717a', 'fontSize': 11}},
-        'yAxis': {'type': 'value',
-                  'splitLine': {'lineStyle': {'color': '#f4f4f5', 'type': 'dashed'}},
-                  'axisLabel': {':formatter': 'v => "€" + v.toLocaleString()', 'color': '#71717a', 'fontSize': 11}},
+        'tooltip': {'trigger': 'axis', 'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#18181b'}}},
+        'legend': {'data': ['Revenue', 'Forecast'], 'top': 0},
+        'grid': {'top': '14%'},
+        'xAxis': {'type': 'category', 'boundaryGap': False, 'data': []},
+        'yAxis': {'type': 'value', 'axisLabel': {':formatter': 'v => "€" + v.toLocaleString()'}},
         'series': [
             {
                 'name': 'Revenue', 'type': 'line', 'smooth': 0.3,
-                'data': rev['revenue'],
-                'symbol': 'circle', 'symbolSize': 6,
-                'lineStyle': {'width': 2.5, 'color': '#64748b'},
+                'data': [],
+                'lineStyle': {'color': '#64748b'},
                 'itemStyle': {'color': '#64748b', 'borderWidth': 2, 'borderColor': '#fff'},
                 'emphasis': {'focus': 'series'},
             },
             {
                 'name': 'Forecast', 'type': 'line', 'smooth': 0.3,
-                'data': rev['forecast'], 'symbol': 'diamond', 'symbolSize': 7,
-                'lineStyle': {'width': 2.5, 'type': 'dashed', 'color': '#60a5fa'},
+                'data': [], 'symbol': 'diamond', 'symbolSize': 7,
+                'lineStyle': {'type': 'dashed', 'color': '#60a5fa'},
                 'itemStyle': {'color': '#60a5fa', 'borderWidth': 2, 'borderColor': '#fff'},
                 'emphasis': {'focus': 'series'},
             },
         ],
-    }).classes('w-full').style('height:300px')
+    }, theme=charts.theme()).classes(f'w-full {_LOADING_CHART}').style('height:300px')
 
 
-def _donut_chart(status: list):
+def _donut_chart():
     return ui.echart({
-        'tooltip': _TT_ITEM,
-        'legend': {**_LEGEND, 'orient': 'horizontal', 'bottom': 0, 'left': 'center',
-                   'itemWidth': 10, 'itemHeight': 10, 'itemGap': 12},
-        'color': ['#4ade80', '#fbbf24', '#60a5fa', '#f87171'],
-        'series': [{
-            'type': 'pie', 'radius': ['44%', '68%'], 'center': ['50%', '44%'],
-            'avoidLabelOverlap': False,
-            'label': {'show': False},
-            'emphasis': {'label': {'show': True, 'fontSize': 13, 'fontWeight': 'bold', 'color': '#09090b'}},
-            'labelLine': {'show': False},
-            'data': status,
-        }],
-    }).classes('w-full').style('height:260px')
-
-
-def _bar_chart(orders: dict):
+        'tooltip': {'trigger': 'item'},
+        'legend': {'bottom': 0, 'itemWidth': 10, 'itemHeight': 10, 'itemGap': 12},
+        'color': ['#60a5fa', '#fbbf24', '#4ade80', '#f87171', '#a1a1aa'],   # data.STATUSES order
+        'series': [{'type': 'pie', 'radius': ['44%', '68%'], 'center': ['50%', '44%'], 'data': []}],
+    }, theme=charts.theme()).classes(f'w-full {_LOADING_CHART}').style('height:260px')
+
+
+def _bar_chart():
     return ui.echart({
-        'tooltip': _TT_AXIS,
-        'legend': {**_LEGEND, 'data': ['Completed', 'Returned'], 'left': 'center', 'top': 0},
-        'grid': _GRID,
-        'xAxis': {'type': 'category', 'data': orders['days'],
-                  'axisLine': {'lineStyle': {'color': '#e4e4e7'}},
-                  'axisLabel': {'color': '#71717a', 'fontSize': 11}},
-        'yAxis': {'type': 'value', 'splitLine': {'lineStyle': {'color': '#f4f4f5'}},
-                  'axisLabel': {'color': '#71717a', 'fontSize': 11}},
+        'tooltip': {'trigger': 'axis'},
+        'legend': {'data': ['Fulfilled', 'Cancelled'], 'top': 0},
+        'xAxis': {'type': 'category', 'data': []},
+        'yAxis': {'type': 'value'},
         'series': [
-            {'name': 'Completed', 'type': 'bar', 'data': orders['completed'],
-             'barMaxWidth': 32, 'itemStyle': {'color': '#38bdf8', 'borderRadius': [4, 4, 0, 0]}},
-            {'name': 'Returned', 'type': 'bar', 'data': orders['returned'],
-             'barMaxWidth': 32, 'itemStyle': {'color': '#fb7185', 'borderRadius': [4, 4, 0, 0]}},
+            {'name': 'Fulfilled', 'type': 'bar', 'data': [], 'itemStyle': {'color': '#38bdf8'}},
+            {'name': 'Cancelled', 'type': 'bar', 'data': [], 'itemStyle': {'color': '#fb7185'}},
         ],
-    }).classes('w-full').style('height:240px')
+    }, theme=charts.theme()).classes(f'w-full {_LOADING_CHART}').style('height:240px')
 
 
-def _area_chart(tp: dict):
+def _area_chart():
     return ui.echart({
-        'tooltip': {**_TT_AXIS, 'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#4ade80'}}},
-        'legend': {**_LEGEND, 'data': ['Actual', 'Target'], 'left': 'center', 'top': 0},
-        'grid': _GRID,
-        'xAxis': {'type': 'category', 'boundaryGap': False, 'data': tp['hours'],
-                  'axisLabel': {'color': '#71717a', 'fontSize': 10, 'interval': 2},
-                  'axisLine': {'lineStyle': {'color': '#e4e4e7'}}},
-        'yAxis': {'type': 'value', 'min': 50, 'max': 100,
-                  'splitLine': {'lineStyle': {'color': '#f4f4f5'}},
-                  'axisLabel': {':formatter': 'v => v + "%"', 'color': '#71717a', 'fontSize': 11}},
+        'tooltip': {'trigger': 'axis', 'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#4ade80'}}},
+        'legend': {'data': ['Actual', 'Target'], 'top': 0},
+        'xAxis': {'type': 'category', 'boundaryGap': False, 'data': [],
+                  'axisLabel': {'fontSize': 10, 'interval': 2}},
+        'yAxis': {'type': 'value', 'min': 50, 'max': 100, 'axisLabel': {':formatter': 'v => v + "%"'}},
         'series': [
             {'name': 'Actual', 'type': 'line', 'smooth': True,
-             'data': tp['actual'], 'symbol': 'none',
+             'data': [], 'symbol': 'none',
              'lineStyle': {'width': 2, 'color': '#4ade80'},
              'itemStyle': {'color': '#4ade80'},
              'areaStyle': {'color': '#4ade80', 'opacity': 0.18}},
             {'name': 'Target', 'type': 'line',
-             'data': tp['target'], 'symbol': 'none',
+             'data': [], 'symbol': 'none',
              'lineStyle': {'width': 1.5, 'type': 'dashed', 'color': '#fbbf24'},
              'itemStyle': {'color': '#fbbf24'}},
         ],
-    }).classes('w-full').style('height:240px')
+    }, theme=charts.theme()).classes(f'w-full {_LOADING_CHART}').style('height:240px')
+
+
+# ── Snapshot — everything a refresh changes, keyed by target name ────────────
+# One section per provider, so a page can show each as soon as its data is in
+
+async def _kpi_section() -> dict:
+    text, classes = {}, {}
+    for key, v in (await data.get_kpis()).items():
+        text[f'{key}.value'], text[f'{key}.delta'], classes[f'{key}.delta'] = _kpi_texts(v)
+        classes[f'{key}.value'] = 'text-2xl font-bold'
+    return {'text': text, 'classes': classes}
+
+
+async def _revenue_section() -> dict:
+    rev = await data.get_revenue_series()
+    return {'charts': {'revenue': {'xAxis': {'data': rev['days']}, 'series': [{'data': rev['revenue']}, {'data': rev['forecast']}],
+                                   'title': _AVAILABLE}}}
+
+
+async def _status_section() -> dict:
+    return {'charts': {'status': {'series': [{'data': await data.get_order_status()}], 'title': _AVAILABLE}}}
+
+
+async def _orders_section() -> dict:
+    orders = await data.get_daily_orders()
+    return {'charts': {'orders': {'xAxis': {'data': orders['days']}, 'series': [{'data': orders['fulfilled']}, {'data': orders['cancelled']}],
+                                  'title': _AVAILABLE}}}
+
+
+async def _throughput_section() -> dict:
+    tp = await data.get_throughput_series()
+    return {'charts': {'throughput': {'xAxis': {'data': tp['hours']}, 'series': [{'data': tp['actual']}, {'data': tp['target']}],
+                                      'title': _AVAILABLE}}}
+
+
+# A section whose provider fails shows this until a later snapshot has its data; the others are unaffected
+_AVAILABLE   = {'show': False}
+_UNAVAILABLE = {'show': True, 'text': 'Data unavailable', 'left': 'center', 'top': 'middle',
+                'textStyle': {'fontSize': 13, 'fontWeight': 'normal', 'color': '#a1a1aa'}}
+_KPI_KEYS = ('orders', 'revenue', 'shipments', 'throughput')
+
+_FAILED = {
+    _kpi_section: {
+        'text':    {**{f'{key}.value': '—' for key in _KPI_KEYS}, **{f'{key}.delta': 'unavailable' for key in _KPI_KEYS}},
+        'classes': {**{f'{key}.value': 'text-2xl font-bold text-muted' for key in _KPI_KEYS},
+                    **{f'{key}.delta': 'text-xs text-muted mt-1' for key in _KPI_KEYS}},
+    },
+    _revenue_section:    {'charts': {'revenue':    {'title': _UNAVAILABLE}}},
+    _status_section:     {'charts': {'status':     {'title': _UNAVAILABLE}}},
+    _orders_section:     {'charts': {'orders':     {'title': _UNAVAILABLE}}},
+    _throughput_section: {'charts': {'throughput': {'title': _UNAVAILABLE}}},
+}
+_SECTIONS = list(_FAILED)
+
+
+async def _section(section) -> dict:
+    """The snapshot part of one section, or — when its provider fails — the part that shows it unavailable."""
+    try:
+        return await section()
+    except Exception:
+        log.exception('dashboard section %s failed', section.__name__)
+        return _FAILED[section]
+
+
+async def _snapshot() -> dict:
+    snapshot: dict = {}
+    for part in await asyncio.gather(*(_section(section) for section in _SECTIONS)):
+        for kind, entries in part.items():
+            snapshot.setdefault(kind, {}).update(entries)
+    return snapshot
+
+
+# Auto-refresh: one server-side loop builds the snapshot and pushes it to every live dashboard
+LIVE_INTERVAL = 15
+FEED = Feed('dashboard:snapshot', _snapshot, interval=LIVE_INTERVAL)
 
 
 # ── Main entry point ─────────────────────────────────────────────────────────
@@ -136,20 +195,21 @@ def content() -> None:
     with ui.row().classes('w-full items-center justify-between mb-2'):
         with ui.column().classes('gap-0'):
             ui.label('Dashboard').classes('page-title')
-            ui.label('Live overview · refreshes on demand').classes('text-sm text-muted')
-        refresh_btn = ui.button('Refresh', icon='refresh', color='white') \
-            .props('flat no-caps').classes('button button-outline')
+            subtitle = ui.label().classes('text-sm text-muted')
+        with ui.row().classes('items-center gap-2'):
+            live_switch = ui.switch('Auto-refresh', value=app.storage.user.get('dashboard-live', False))
+            refresh_btn = ui.button('Refresh', icon='refresh', color='white') \
+                .props('flat no-caps').classes('button button-outline')
 
     ui.element('div').classes('divider mb-4')
 
     # ── KPI cards ────────────────────────────────────────────────
-    kpis = data.get_kpis()
     kpi_refs = {}
     with ui.row().classes('w-full gap-4 flex-wrap mb-4') as kpi_row:
-        kpi_refs['orders']     = _kpi_card(kpi_row, 'Total Orders',       'receipt_long',            'orders',     kpis)
-        kpi_refs['revenue']    = _kpi_card(kpi_row, 'Revenue',            'euro',                    'revenue',    kpis)
-        kpi_refs['shipments']  = _kpi_card(kpi_row, 'Active Shipments',   'local_shipping',          'shipments',  kpis)
-        kpi_refs['throughput'] = _kpi_card(kpi_row, 'Production Rate',    'precision_manufacturing', 'throughput', kpis)
+        kpi_refs['orders']     = _kpi_card(kpi_row, 'Orders Today',       'receipt_long')
+        kpi_refs['revenue']    = _kpi_card(kpi_row, 'Revenue Today',      'euro')
+        kpi_refs['shipments']  = _kpi_card(kpi_row, 'Active Shipments',   'local_shipping')
+        kpi_refs['throughput'] = _kpi_card(kpi_row, 'Production Rate',    'precision_manufacturing')
 
     # ── Row 2 — Revenue trend + Order status ─────────────────────
     with ui.row().classes('w-full gap-4 flex-wrap mb-4'):
@@ -157,15 +217,13 @@ def content() -> None:
             with ui.row().classes('items-center justify-between mb-3'):
                 ui.label('Revenue Trend').classes('section-title')
                 ui.label('Last 30 days').classes('text-xs text-muted')
-            rev_data  = data.get_revenue_series()
-            rev_chart = _revenue_chart(rev_data)
+            rev_chart = _revenue_chart()
 
         with ui.element('div').classes('card').style('min-width:240px;width:280px'):
             with ui.row().classes('items-center justify-between mb-3'):
                 ui.label('Order Status').classes('section-title')
                 ui.label('This month').classes('text-xs text-muted')
-            status_data  = data.get_order_status()
-            donut_chart  = _donut_chart(status_data)
+            donut_chart = _donut_chart()
 
     # ── Row 3 — Daily orders + Throughput ────────────────────────
     with ui.row().classes('w-full gap-4 flex-wrap mb-4'):
@@ -173,56 +231,54 @@ def content() -> None:
             with ui.row().classes('items-center justify-between mb-3'):
                 ui.label('Daily Orders').classes('section-title')
                 ui.label('Last 7 days').classes('text-xs text-muted')
-            order_data = data.get_daily_orders()
-            bar_chart  = _bar_chart(order_data)
+            bar_chart = _bar_chart()
 
         with ui.element('div').classes('card flex-1').style('min-width:280px'):
             with ui.row().classes('items-center justify-between mb-3'):
                 ui.label('Production Throughput').classes('section-title')
                 ui.label('Last 24 h').classes('text-xs text-muted')
-            tp_data    = data.get_throughput_series()
-            area_chart = _area_chart(tp_data)
-
-    # ── Refresh handler ──────────────────────────────────────────
-    def refresh() -> None:
-        # KPIs
-        new_kpis = data.get_kpis()
-        for key, refs in kpi_refs.items():
-            v    = new_kpis[key]
-            unit = v['unit']
-            val  = v['value']
-            d    = v['delta']
-            refs['value'].set_text(f"{unit}{val:,}")
-            delta_color  = 'text-success' if d >= 0 else 'text-danger'
-            delta_prefix = '▲' if d >= 0 else '▼'
-            refs['delta'].set_text(f"{delta_prefix} {abs(d)}{unit} vs yesterday")
-            refs['delta'].classes(replace=f'text-xs {delta_color} mt-1')
-
-        # Revenue chart
-        rev = data.get_revenue_series()
-        rev_chart.options['xAxis']['data']     = rev['days']
-        rev_chart.options['series'][0]['data'] = rev['revenue']
-        rev_chart.options['series'][1]['data'] = rev['forecast']
-        rev_chart.update()
-
-        # Donut
-        donut_chart.options['series'][0]['data'] = data.get_order_status()
-        donut_chart.update()
-
-        # Bar chart
-        orders = data.get_daily_orders()
-        bar_chart.options['xAxis']['data']     = orders['days']
-        bar_chart.options['series'][0]['data'] = orders['completed']
-        bar_chart.options['series'][1]['data'] = orders['returned']
-        bar_chart.update()
-
-        # Area chart
-        tp = data.get_throughput_series()
-        area_chart.options['xAxis']['data']     = tp['hours']
-        area_chart.options['series'][0]['data'] = tp['actual']
-        area_chart.options['series'][1]['data'] = tp['target']
-        area_chart.update()
-
+            area_chart = _area_chart()
+
+    # ── Refresh — manual for this client, or pushed by the shared feed ───────────
+    chart_refs = {'revenue': rev_chart, 'status': donut_chart, 'orders': bar_chart, 'throughput': area_chart}
+    listener = FeedListener(FEED.event, {
+        **{f'{key}.{part}': label for key, refs in kpi_refs.items() for part, label in refs.items()},
+        **chart_refs,
+    })
+
+    # ── First data ───────────────────────────────────────────────
+    # The page goes out with placeholders; each section fills in as soon as its provider answers
+    async def load(section) -> None:
+        part = await _section(section)
+        if listener.is_deleted:
+            return
+        listener.fill(part)
+        for name in part.get('charts', {}):
+            chart_refs[name].classes(remove=_LOADING_CHART)
+
+    async def load_all() -> None:
+        await asyncio.gather(*(load(section) for section in _SECTIONS))
+
+    async def refresh() -> None:
+        snapshot = await _snapshot()
+        if listener.is_deleted:
+            return
+        listener.apply(snapshot)
         notify('Dashboard refreshed', type='positive', title='Refreshed')
 
-    refresh_btn.on('click', refresh)
\ No newline at end of file
+    def set_live(live: bool) -> None:
+        if live:
+            FEED.attach(listener)
+            subtitle.set_text(f'Live overview · refreshes every {LIVE_INTERVAL} s')
+        else:
+            FEED.detach(listener)
+            subtitle.set_text('Live overview · refreshes on demand')
+
+    def toggle_live(e) -> None:
+        app.storage.user['dashboard-live'] = e.value
+        set_live(e.value)
+
+    set_live(live_switch.value)
+    live_switch.on_value_change(toggle_live)
+    refresh_btn.on('click', refresh)
+    background_tasks.create(load_all(), name='dashboard data')
@@ -0,0 +1,175 @@
+// A `data-table` that renders only the rows in view. Rows arrive in pages: the first one with the
+// props, the others from the server (`request` event → `receive`) as they scroll into view.
+// Sorting happens on the server too: a header click drops every page and asks again.
+const OVERSCAN = 6; // rows rendered above and below the viewport
+const MAX_PAGES = 8; // pages held; the ones farthest from the view go first
+
+export default {
+  template: `
+    <div ref="scroller" :style="{ maxHeight: height, overflowY: 'auto' }" @scroll.passive="onScroll">
+      <table class="data-table w-full">
+        <thead>
+          <tr>
+            <th v-for="c in columns" :key="c.field" @click="toggleSort(c)"
+                :style="{ position: 'sticky', top: 0, zIndex: 1, cursor: c.sortable === false ? 'default' : 'pointer', width: c.width }">
+              {{ c.label }}<span v-if="sortField === c.field" style="margin-left:4px">{{ desc ? "↓" : "↑" }}</span>
+            </th>
+          </tr>
+        </thead>
+        <tbody>
+          <tr v-if="padTop" :style="{ height: padTop + 'px' }"><td :colspan="columns.length" :style="spacer"></td></tr>
+          <tr v-for="{ i, row } in visible" :key="i" data-row>
+            <td v-for="c in columns" :key="c.field">
+              <div v-if="!row" class="skeleton skeleton-text w-20"></div>
+              <span v-else-if="c.kind === 'badge'" class="badge" :class="(c.badges || {})[row[c.field]] || 'badge-default'">{{ row[c.field] }}</span>
+              <div v-else-if="c.kind === 'bar'" class="flex items-center gap-3">
+                <div style="flex:1;height:6px;border-radius:9999px;background:#f4f4f5;overflow:hidden">
+                  <div :style="{ width: row[c.field] + '%', height: '100%', background: barColor(c, row[c.field]),
+                                 borderRadius: '9999px', transition: 'width .4s' }"></div>
+                </div>
+                <div v-if="c.show_value" class="text-xs text-muted" style="min-width:36px">{{ row[c.field] }} %</div>
+              </div>
+              <template v-else>
+                <div :class="c.classes">{{ row[c.field] }}</div>
+                <div v-if="c.sub" class="text-xs text-muted">{{ row[c.sub] }}</div>
+              </template>
+            </td>
+          </tr>
+          <tr v-if="padBottom" :style="{ height: padBottom + 'px' }"><td :colspan="columns.length" :style="spacer"></td></tr>
+        </tbody>
+      </table>
+    </div>`,
+  props: {
+    columns: Array,
+    rows: Array,
+    total: Number,
+    page_size: Number,
+    sort: String,
+    descending: Boolean,
+    height: String,
+  },
+  data() {
+    return {
+      pages: {},
+      count: 0,
+      sortField: null,
+      desc: false,
+      generation: 0,
+      scrollTop: 0,
+      viewport: 0,
+      rowHeight: 45,
+      spacer: { padding: "0 !important", border: "none !important" },
+    };
+  },
+  computed: {
+    first() {
+      return Math.max(0, Math.floor(this.scrollTop / this.rowHeight) - OVERSCAN);
+    },
+    last() {
+      return Math.min(this.count, Math.ceil((this.scrollTop + this.viewport) / this.rowHeight) + OVERSCAN);
+    },
+    visible() {
+      const out = [];
+      for (let i = this.first; i < this.last; i++) {
+        out.push({ i, row: this.pages[Math.floor(i / this.page_size)]?.[i % this.page_size] });
+      }
+      return out;
+    },
+    padTop() {
+      return this.first * this.rowHeight;
+    },
+    padBottom() {
+      return Math.max(0, this.count - this.last) * this.rowHeight;
+    },
+  },
+  watch: {
+    rows() {
+      this.reset();
+    },
+    total() {
+      this.reset();
+    },
+    first() {
+      this.load();
+    },
+    last() {
+      this.load();
+    },
+  },
+  created() {
+    this.reset();
+  },
+  mounted() {
+    this.resizeObserver = new ResizeObserver(() => this.measure());
+    this.resizeObserver.observe(this.$refs.scroller);
+    this.measure();
+  },
+  updated() {
+    // Rows are as tall as their content; spacers follow the first rendered one
+    const tr = this.$refs.scroller?.querySelector("tbody tr[data-row]");
+    if (tr?.offsetHeight && Math.abs(tr.offsetHeight - this.rowHeight) > 0.5) this.rowHeight = tr.offsetHeight;
+  },
+  unmounted() {
+    this.resizeObserver?.disconnect();
+  },
+  methods: {
+    measure() {
+      const el = this.$refs.scroller;
+      if (!el) return;
+      this.viewport = Math.max(el.clientHeight, parseFloat(getComputedStyle(el).maxHeight) || 0);
+    },
+    onScroll(e) {
+      this.scrollTop = e.target.scrollTop;
+    },
+    reset() {
+      // The props hold the first page of their sort — the server's answer to a fresh load
+      this.sortField = this.sort;
+      this.desc = this.descending;
+      this.generation++;
+      this.pending = new Set();
+      this.pages = this.rows ? { 0: Object.freeze(this.rows) } : {};
+      this.count = this.total ?? 0;
+      this.load();
+    },
+    toggleSort(column) {
+      if (column.sortable === false) return;
+      if (this.sortField !== column.field) [this.sortField, this.desc] = [column.field, false];
+      else if (!this.desc) this.desc = true;
+      else [this.sortField, this.desc] = [null, false];
+      this.generation++;
+      this.pending = new Set();
+      this.pages = {};
+      this.load();
+    },
+    load() {
+      const size = this.page_size;
+      const wanted = [];
+      for (let p = Math.floor(this.first / size); p * size < Math.max(this.last, 1); p++) {
+        if (!(p in this.pages) && !this.pending.has(p)) wanted.push(p);
+      }
+      if (!wanted.length) return;
+      wanted.forEach((p) => this.pending.add(p));
+      this.$emit("request", { pages: wanted, sort: this.sortField, descending: this.desc, generation: this.generation });
+    },
+    receive({ pages, total, generation }) {
+      if (generation !== this.generation) return; // an answer for a sort that is gone
+      for (const [p, rows] of Object.entries(pages)) {
+        this.pending.delete(Number(p));
+        this.pages[p] = Object.freeze(rows);
+      }
+      this.count = total;
+      const held = Object.keys(this.pages).map(Number);
+      if (held.length > MAX_PAGES) {
+        const here = Math.floor(this.first / this.page_size);
+        held.sort((a, b) => Math.abs(b - here) - Math.abs(a - here));
+        for (const p of held.slice(0, held.length - MAX_PAGES)) delete this.pages[p];
+      }
+    },
+    barColor(column, value) {
+      // `colors`: [[threshold, color], …] ascending; the last threshold `value` reaches wins
+      let color = null;
+      for (const [threshold, c] of column.colors || []) if (value >= threshold) color = c;
+      return color ?? "#60a5fa";
+    },
+  },
+};
@@ -0,0 +1,90 @@
+"""Data table — a `data-table` rendered in the browser from row data, only the rows in view, sorted and paged on the server."""
+
+import inspect
+from collections.abc import Awaitable, Callable
+
+from nicegui import ui
+
+# source(start, end, sort field or None, descending) → (rows[start:end] in that order, total rows)
+Source = Callable[[int, int, str | None, bool], tuple[list[dict], int] | Awaitable[tuple[list[dict], int]]]
+
+
+class DataTable(ui.element, component='data_table.js'):
+
+    def __init__(self, columns: list[dict], rows: list[dict] | None = None, *, source: Source | None = None,
+                 page_size: int = 50, height: str = '480px', sort: str | None = None,
+                 descending: bool = False) -> None:
+        """Table over `rows`, or over `source` for rows the server should not hold in full.
+
+        Each column is a dict: `field`, `label` and optionally
+        - `kind`: 'text' (default), 'badge' (class per value from `badges`) or 'bar' (a 0–100 value
+          as a progress bar, coloured by `colors` = [[threshold, color], …]; `show_value` adds "n %")
+        - `classes` for the text, `sub` a field shown as a second, muted line
+        - `sortable` (default True), `sort_by` a field to sort by instead of `field`, `width`
+
+        The browser holds a few pages of `page_size` rows and draws only those scrolled into view
+        within `height`; one element, however many rows.
+        """
+        super().__init__()
+        self._columns = columns
+        self._rows = rows or []
+        self._sorted: dict[tuple, list[dict]] = {}      # (sort field, descending) → rows in that order
+        self._source = source or self._list_source
+        self._props['columns'] = columns
+        self._props['page_size'] = page_size
+        self._props['height'] = height
+        self._props['sort'] = sort
+        self._props['descending'] = descending
+        self._preload()
+        self.on('request', self._handle_request)
+
+    def set_rows(self, rows: list[dict]) -> None:
+        """Replace the rows of a table built over a list; the browser starts again from its first page."""
+        self._rows = rows
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Drop what the browser holds and load the view again, e.g. after the source's rows changed."""
+        self._sorted.clear()
+        self._preload()
+        if self._props['rows'] is not None:
+            self.update()       # the new first page resets the browser's view
+        else:
+            self.run_method('reset')
+
+    def _preload(self) -> None:
+        # A list's first page ships with the element; other sources are asked from the browser
+        if self._source == self._list_source:
+            sort, descending = self._props['sort'], self._props['descending']
+            self._props['rows'], self._props['total'] = self._list_source(0, self._props['page_size'], sort, descending)
+        else:
+            self._props['rows'], self._props['total'] = None, 0
+
+    async def _handle_request(self, e) -> None:
+        size = self._props['page_size']
+        sort, descending = e.args['sort'], e.args['descending']
+        pages, total = {}, 0
+        for page in e.args['pages']:
+            result = self._source(page * size, (page + 1) * size, sort, descending)
+            if inspect.isawaitable(result):
+                result = await result
+            pages[page], total = result
+        if not self.is_deleted:
+            self.run_method('receive', {'pages': pages, 'total': total, 'generation': e.args['generation']})
+
+    def _list_source(self, start: int, end: int, sort: str | None, descending: bool) -> tuple[list[dict], int]:
+        if sort is None:
+            return self._rows[start:end], len(self._rows)
+        rows = self._sorted.get((sort, descending))
+        if rows is None:
+            field = next((c.get('sort_by', c['field']) for c in self._columns if c['field'] == sort), sort)
+            # Empty cells last either way; mixed types compare as text
+            rows = sorted((r for r in self._rows if r.get(field) is not None),
+                          key=lambda r: _key(r[field]), reverse=descending)
+            rows += [r for r in self._rows if r.get(field) is None]
+            self._sorted[(sort, descending)] = rows
+        return rows[start:end], len(rows)
+
+
+def _key(value) -> tuple:
+    return (0, value, '') if isinstance(value, (int, float)) else (1, 0, str(value).lower())
@@ -0,0 +1,45 @@
+// Applies services.feeds snapshots to this page's elements as they arrive on the socket.
+// `targets` maps snapshot names to element ids; the server mirrors the same values without an update.
+// Snapshots may be deltas (services/charts.py): only changed entries, plus `rolls` for shifted windows.
+export default {
+  template: `<span style="display: none"></span>`,
+  props: {
+    event: String,
+    targets: Object,
+  },
+  mounted() {
+    this.handler = (snapshot) => this.apply(snapshot);
+    setTimeout(() => window.socket.on(this.event, this.handler), 0); // NOTE: window.socket is created in app.mounted()
+  },
+  unmounted() {
+    window.socket?.off(this.event, this.handler);
+  },
+  methods: {
+    apply(snapshot) {
+      for (const [name, text] of Object.entries(snapshot.text || {})) {
+        const element = mounted_app.elements[this.targets[name]];
+        if (element) element.text = text;
+      }
+      for (const [name, classes] of Object.entries(snapshot.classes || {})) {
+        const element = mounted_app.elements[this.targets[name]];
+        if (element) element.class = classes.split(" ");
+      }
+      // Rolling windows: drop `shift` points from the front, append the new tail
+      for (const [name, roll] of Object.entries(snapshot.rolls || {})) {
+        const chart = getElement(this.targets[name])?.chart;
+        if (!chart) continue;
+        const option = chart.getOption();
+        const update = {
+          series: option.series.map((s, i) =>
+            i in roll.series ? { data: s.data.slice(roll.shift).concat(roll.series[i]) } : {},
+          ),
+        };
+        if (roll.xAxis) update.xAxis = { data: option.xAxis[0].data.slice(roll.shift).concat(roll.xAxis) };
+        chart.setOption(update);
+      }
+      for (const [name, options] of Object.entries(snapshot.charts || {})) {
+        getElement(this.targets[name])?.chart?.setOption(options);
+      }
+    },
+  },
+};
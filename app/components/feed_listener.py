@@ -0,0 +1,87 @@
+"""Feed listener — receives services.feeds snapshots in the browser and applies them to this page's elements."""
+
+import copy
+
+from nicegui import ui
+
+from services import charts
+
+
+class FeedListener(ui.element, component='feed_listener.js'):
+
+    def __init__(self, event: str, targets: dict[str, ui.element]) -> None:
+        """Apply snapshots pushed as `event` to `targets` (snapshot name → element on this page)."""
+        super().__init__()
+        self._targets = targets
+        self._props['event'] = event
+        self._props['targets'] = {name: element.id for name, element in targets.items()}
+        self.feeds: set = set()
+
+    def apply(self, snapshot: dict) -> None:
+        """Apply a snapshot built for this client alone, sending only what differs from the page."""
+        changes = charts.diff_snapshot(self._state(snapshot), snapshot)
+        self._mirror(snapshot)
+        if changes:
+            self.run_method('apply', changes)
+        # The page no longer matches the last broadcast, so feeds send it the full snapshot next
+        for feed in self.feeds:
+            feed.desync(self.client.id)
+
+    def fill(self, snapshot: dict) -> None:
+        """Apply a snapshot as regular element updates — for first data on a page whose charts may not be mounted yet."""
+        self._mirror(snapshot)
+        for name in {*snapshot.get('text', {}), *snapshot.get('classes', {}), *snapshot.get('charts', {})}:
+            self._targets[name].update()
+        for feed in self.feeds:
+            feed.desync(self.client.id)
+
+    def mirror(self, snapshot: dict) -> None:
+        """Record a full broadcast snapshot server-side; the browser applies it (or its delta) from the feed event."""
+        self._mirror(snapshot)
+
+    def _state(self, snapshot: dict) -> dict:
+        """What this page currently shows, in the shape of `snapshot`."""
+        targets = self._targets
+        return {
+            'text':    {name: targets[name].text for name in snapshot.get('text', {})},
+            'classes': {name: ' '.join(targets[name]._classes) for name in snapshot.get('classes', {})},
+            'charts':  {name: charts.project(targets[name]._props['options'], patch)
+                        for name, patch in snapshot.get('charts', {}).items()},
+        }
+
+    def _mirror(self, snapshot: dict) -> None:
+        # Classes and props are observable; suspend them so mirroring does not resend the element.
+        # `text` is a BindableProperty whose change handler calls update(): set its stored value and
+        # the model text directly, so `.text` and a later set_text() see what the browser shows
+        for name, text in snapshot.get('text', {}).items():
+            setattr(self._targets[name], '___text', text)
+            self._targets[name]._text_to_model_text(text)
+        for name, classes in snapshot.get('classes', {}).items():
+            with self._targets[name]._classes.suspend_updates():
+                self._targets[name]._classes[:] = classes.split()
+        for name, options in snapshot.get('charts', {}).items():
+            with self._targets[name]._props.suspend_updates():
+                _merge(self._targets[name]._props['options'], options)
+
+    def _handle_delete(self) -> None:
+        for feed in list(self.feeds):
+            feed.detach(self)
+        super()._handle_delete()
+
+
+def _merge(target: dict, patch: dict) -> None:
+    # Same rules as ECharts' setOption merge: dicts recursively, component lists (series, …) by index,
+    # data arrays replaced. The patch is shared by every client — dicts are copied in, data lists
+    # are shared read-only
+    for key, value in patch.items():
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _merge(current, value)
+        elif key != 'data' and isinstance(value, list) and isinstance(current, list) and value and all(isinstance(v, dict) for v in value):
+            for i, item in enumerate(value):
+                if i < len(current) and isinstance(current[i], dict):
+                    _merge(current[i], item)
+                else:
+                    current.append(copy.deepcopy(item))
+        else:
+            target[key] = copy.deepcopy(value) if isinstance(value, dict) else value
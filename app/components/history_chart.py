@@ -0,0 +1,107 @@
+"""History chart — a time-axis echart that shows a long history downsampled to its pixel width and fetches finer data for the zoomed window."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from nicegui import background_tasks, events, ui
+
+# Points per series before the browser reports the real width, and the most we ever send
+DEFAULT_WIDTH = 1000
+MAX_POINTS = 4000
+
+# Reads the visible window and the chart width in the browser; `{id}` is the chart's element id
+_VIEW_JS = '''(e) => {{
+    const chart = getElement({id}).chart;
+    if ({once}) {{ if (chart.__viewSent) return; chart.__viewSent = true; }}
+    const zoom = chart.getOption().dataZoom[0];
+    emit({{start: zoom.startValue, end: zoom.endValue, width: chart.getWidth()}});
+}}'''
+
+Fetch = Callable[[float | None, float | None, int], Awaitable[list[list]]]
+
+
+class HistoryChart(ui.echart):
+
+    def __init__(self, options: dict, fetch: Fetch, *,
+                 window: tuple[float, float] | None = None, theme: str | None = None) -> None:
+        """Line chart over `await fetch(start, end, points)` → one [[epoch ms, value], …] list per series.
+
+        `start` and `end` are epoch seconds, None for the whole history. Each series in `options` gets
+        its data from here once the page is out — a pulsing placeholder until then; `window` is the
+        initially visible (start, end) in epoch seconds.
+        """
+        self._fetch = fetch
+        self._points = _budget(DEFAULT_WIDTH)
+        self._overview: list[list] = [[] for _ in options['series']]
+        self._lock = asyncio.Lock()     # views are computed one at a time, the first load first
+        self._window = (window[0] * 1000, window[1] * 1000) if window else None   # in axis values (ms)
+        options.setdefault('xAxis', {})['type'] = 'time'
+        options['dataZoom'] = [
+            {'type': 'inside', 'filterMode': 'none', 'rangeMode': ['value', 'value']},
+            {'type': 'slider', 'filterMode': 'none', 'height': 18, 'bottom': 8, 'showDetail': False},
+        ]
+        if self._window:
+            for zoom in options['dataZoom']:
+                zoom['startValue'], zoom['endValue'] = self._window
+        for series in options['series']:
+            series['data'] = []
+            series.setdefault('showSymbol', False)
+        super().__init__(options, theme=theme)
+        self.classes('skeleton')
+        background_tasks.create(self._load(), name='history chart')
+        # Settled zooms fetch detail; the first render reports the real width once
+        self.on('chart:datazoom', self._handle_view, js_handler=_VIEW_JS.format(id=self.id, once='false'),
+                throttle=0.3, leading_events=False)
+        self.on('chart:finished', self._handle_view, js_handler=_VIEW_JS.format(id=self.id, once='true'))
+
+    async def _load(self) -> None:
+        async with self._lock:
+            self._overview = await self._fetch(None, None, self._points)
+            view = await self._view(self._window)
+            if self.is_deleted:
+                return
+            for series, data in zip(self.options['series'], view):
+                series['data'] = data
+            self.classes(remove='skeleton')     # one update with the data
+
+    async def _handle_view(self, e: events.GenericEventArguments) -> None:
+        args = e.args or {}
+        points = _budget(args.get('width') or DEFAULT_WIDTH)
+        start, end = args.get('start'), args.get('end')
+        window = (start, end) if start is not None and end is not None else None
+        async with self._lock:
+            if points == self._points and window == self._window:
+                return
+            if points != self._points:
+                self._points = points
+                self._overview = await self._fetch(None, None, points)
+            self._window = window
+            view = await self._view(window)
+        current = [s.get('data') for s in self.options['series']]
+        if view == current or self.is_deleted:
+            return
+        # Only the data travels; the options held server-side are kept in step without an update
+        with self._props.suspend_updates():
+            for series, data in zip(self.options['series'], view):
+                series['data'] = data
+        self.run_chart_method('setOption', {'series': [{'data': data} for data in view]})
+
+    async def _view(self, window: tuple[float, float] | None) -> list[list]:
+        """The overview, with the points inside `window` (ms) replaced by a finer fetch of that window."""
+        if window is None or self._covers(window):
+            return self._overview
+        start, end = window
+        detail = await self._fetch(start / 1000, end / 1000, self._points)
+        return [[p for p in overview if p[0] < start] + fine + [p for p in overview if p[0] > end]
+                for overview, fine in zip(self._overview, detail)]
+
+    def _covers(self, window: tuple[float, float]) -> bool:
+        series = [data for data in self._overview if data]
+        if not series:
+            return True
+        return window[0] <= min(d[0][0] for d in series) and window[1] >= max(d[-1][0] for d in series)
+
+
+def _budget(width: float) -> int:
+    # About one point per pixel, rounded up to a multiple of 100 so clients share cached fetches
+    return min(MAX_POINTS, max(100, -(-int(width) // 100) * 100))
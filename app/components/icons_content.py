@@ -2,7 +2,9 @@
 
 import re
 from pathlib import Path
-from nicegui import ui
+from nicegui import app, ui
+
+from services import assets
 
 # ── Parse Tabler icons from icons.css at module load ──────────────────────────────────────────────────────
 def _load_tabler_icons() -> list[str]:
@@ -241,6 +243,10 @@ window.ibCopy = function(text, tile) {
 
 # ── Component entry point ──────────────────────────────────────────────────────
 def content() -> None:
+    # The main layout only carries the icon subset — load the complete set once per client
+    if not app.storage.client.get('tabler-full-css'):
+        ui.add_head_html(assets.stylesheet('css/icons.css'))
+        app.storage.client['tabler-full-css'] = True
     ui.add_body_html(_COPY_JS)
 
     # ── Page header ───────────────────────────────────────────────────────────
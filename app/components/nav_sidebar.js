@@ -0,0 +1,86 @@
+// Sidebar navigation rendered entirely in the browser from one `links` prop.
+// Clicks highlight immediately; the <a href> is picked up by the sub-pages router for navigation.
+// Collapsing animates the drawer locally and reports only the settled state, debounced.
+const EXPANDED_WIDTH = 300;
+const COLLAPSED_WIDTH = 100;
+const LABEL_DELAY_MS = 50;
+const PERSIST_DELAY_MS = 600;
+
+export default {
+  template: `
+    <nav class="nav-sidebar w-full">
+      <template v-for="link in links" :key="link.path">
+        <q-separator v-if="link.separator" class="nicegui-separator" />
+        <a :href="prefix + link.path"
+           class="nicegui-link w-full no-underline text-black"
+           :class="{ 'nav-link-active': link.path === current }"
+           style="border-radius: 2rem;"
+           @click="current = link.path">
+          <div class="nicegui-row items-center mb-2 mt-2 cursor-pointer w-full no-wrap">
+            <q-icon :name="link.icon" class="ml-5 text-2xl flex-shrink-0"
+                    :class="{ 'nav-icon-active': link.path === current }" />
+            <div class="text-lg sidebar-label ml-3 flex-shrink-0"
+                 :class="labelsCollapsed ? 'collapsed' : 'expanded'">{{ link.label }}</div>
+          </div>
+        </a>
+      </template>
+      <q-btn flat color="primary"
+             class="absolute bottom-4 right-4 transition-all duration-300"
+             :icon="isCollapsed ? 'chevron_right' : 'chevron_left'"
+             :label="isCollapsed ? '' : 'Collapse'"
+             @click="toggle" />
+    </nav>
+  `,
+  props: {
+    links: Array,
+    active: String,
+    collapsed: Boolean,
+    drawer: Number,
+  },
+  data() {
+    return {
+      current: this.active,
+      prefix: "",
+      isCollapsed: this.collapsed,
+      labelsCollapsed: this.collapsed,
+      labelTimer: null,
+      persistTimer: null,
+    };
+  },
+  mounted() {
+    setTimeout(() => (this.prefix = window.path_prefix || ""), 0); // NOTE: window.path_prefix is set in app.mounted()
+  },
+  unmounted() {
+    clearTimeout(this.labelTimer);
+    clearTimeout(this.persistTimer);
+  },
+  watch: {
+    active(value) {
+      this.current = value;
+    },
+  },
+  methods: {
+    setActive(path) {
+      this.current = path;
+    },
+    setDrawerWidth(width) {
+      const drawer = mounted_app.elements[this.drawer];
+      if (drawer) drawer.props.width = width;
+    },
+    toggle() {
+      // Same choreography as before, without the server: widen then reveal labels, or hide labels then narrow
+      this.isCollapsed = !this.isCollapsed;
+      clearTimeout(this.labelTimer);
+      if (this.isCollapsed) {
+        this.labelsCollapsed = true;
+        this.labelTimer = setTimeout(() => this.setDrawerWidth(COLLAPSED_WIDTH), LABEL_DELAY_MS);
+      } else {
+        this.setDrawerWidth(EXPANDED_WIDTH);
+        this.labelTimer = setTimeout(() => (this.labelsCollapsed = false), LABEL_DELAY_MS);
+      }
+      // Rapid toggles collapse into one message carrying the final state
+      clearTimeout(this.persistTimer);
+      this.persistTimer = setTimeout(() => this.$emit("collapse", this.isCollapsed), PERSIST_DELAY_MS);
+    },
+  },
+};
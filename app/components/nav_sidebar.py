@@ -0,0 +1,50 @@
+"""Sidebar navigation — one client-side element rendering every link from the navigation registry."""
+
+from collections.abc import Callable
+
+from nicegui import ui
+
+EXPANDED_WIDTH  = 300
+COLLAPSED_WIDTH = 100
+
+
+class NavSidebar(ui.element, component='nav_sidebar.js'):
+
+    def __init__(self,
+                 links: list[dict],
+                 drawer: ui.left_drawer,
+                 *,
+                 active: str | None = None,
+                 collapsed: bool = False,
+                 on_collapse: Callable[[bool], None] | None = None) -> None:
+        """Render `links` (see services.navigation.Navigation.links) as sidebar entries inside `drawer`.
+
+        Highlighting and collapsing run in the browser. `on_collapse` receives the settled collapsed
+        state once the user stops toggling; the server-side props are synced silently.
+        """
+        super().__init__()
+        self._drawer = drawer
+        self._props['links'] = links
+        self._props['drawer'] = drawer.id
+        self._props['active'] = active
+        self._props['collapsed'] = collapsed
+        drawer._props['width'] = COLLAPSED_WIDTH if collapsed else EXPANDED_WIDTH
+
+        def handle_collapse(e) -> None:
+            state = bool(e.args)
+            # The browser already shows this state — record it without echoing an update back
+            with self._props.suspend_updates():
+                self._props['collapsed'] = state
+            with self._drawer._props.suspend_updates():
+                self._drawer._props['width'] = COLLAPSED_WIDTH if state else EXPANDED_WIDTH
+            if on_collapse is not None:
+                on_collapse(state)
+
+        self.on('collapse', handle_collapse)
+
+    def set_active(self, path: str | None) -> None:
+        # Only the path travels; a full update would resend every link
+        if self._props['active'] != path:
+            with self._props.suspend_updates():
+                self._props['active'] = path
+            self.run_method('setActive', path)
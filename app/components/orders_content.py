@@ -1,24 +1,12 @@
-﻿"""Orders page — KPI summary, daily volume/revenue chart and recent orders table."""
+﻿"""Orders page — KPI summary, daily volume/revenue chart, recent orders and the full, paged order history."""
 
-from nicegui import ui
-from services.notifications import notify
-
-# ── Mock data ─────────────────────────────────────────────────────────────────
-_RECENT = [
-    {'id': 'ORD-4014', 'customer': 'Acme Corp',  'product': 'Gear Box',      'qty': 3,  'total': '€ 412.50',  'status': 'Fulfilled',  'date': 'Feb 27, 14:32'},
-    {'id': 'ORD-4013', 'customer': 'Beta GmbH',  'product': 'Sensor Kit',    'qty': 1,  'total': '€ 137.50',  'status': 'Processing', 'date': 'Feb 27, 11:05'},
-    {'id': 'ORD-4012', 'customer': 'Gamma Ltd',  'product': 'Panel Module',  'qty': 5,  'total': '€ 687.50',  'status': 'Open',       'date': 'Feb 27, 09:48'},
-    {'id': 'ORD-4011', 'customer': 'Delta AG',   'product': 'Cable Harness', 'qty': 2,  'total': '€ 275.00',  'status': 'Cancelled',  'date': 'Feb 26, 17:21'},
-    {'id': 'ORD-4010', 'customer': 'Epsilon BV', 'product': 'Widget A',      'qty': 10, 'total': '€ 1375.00', 'status': 'Fulfilled',  'date': 'Feb 26, 14:10'},
-    {'id': 'ORD-4009', 'customer': 'Zeta KG',    'product': 'Motor Drive',   'qty': 1,  'total': '€ 137.50',  'status': 'On Hold',    'date': 'Feb 26, 10:55'},
-]
+from datetime import datetime
 
-_STATUS_COUNTS = {'Open': 3, 'Processing': 2, 'Fulfilled': 7, 'Cancelled': 2, 'On Hold': 1}
-_DAILY = {
-    'days':   ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-    'orders': [8, 12, 7, 15, 11, 4, 6],
-    'revenue': [1100, 1650, 960, 2060, 1515, 550, 825],
-}
+from nicegui import background_tasks, run, ui
+import services.dashboard_data as data
+from components.data_table import DataTable
+from services import charts, dialogs
+from services.notifications import notify
 
 _STATUS_STYLE = {
     'Open':       ('badge-info',    '#60a5fa'),
@@ -28,10 +16,17 @@ _STATUS_STYLE = {
     'On Hold':    ('badge-default', '#a1a1aa'),
 }
 
-_TT  = {'backgroundColor': '#fff', 'borderColor': '#e4e4e7', 'textStyle': {'color': '#09090b', 'fontSize': 12}}
-_AX  = {'axisLine': {'lineStyle': {'color': '#e4e4e7'}}, 'axisTick': {'show': False},
-        'axisLabel': {'color': '#71717a', 'fontSize': 11}}
-_SL  = {'splitLine': {'lineStyle': {'color': '#f4f4f5', 'type': 'dashed'}}}
+_COLUMNS = [
+    {'field': 'id',       'label': 'Order ID', 'classes': 'font-semi text-sm'},
+    {'field': 'customer', 'label': 'Customer'},
+    {'field': 'product',  'label': 'Product'},
+    {'field': 'qty',      'label': 'Qty'},
+    {'field': 'total',    'label': 'Total',    'classes': 'font-semi', 'sort_by': 'amount'},
+    {'field': 'status',   'label': 'Status',   'kind': 'badge',
+     'badges': {status: badge for status, (badge, _) in _STATUS_STYLE.items()}},
+    {'field': 'date',     'label': 'Date',     'classes': 'text-muted', 'sort_by': 'ts'},
+]
+_RECENT = 6     # orders in the Recent Orders card
 
 
 def content(searchFilter=None) -> None:
@@ -41,25 +36,24 @@ def content(searchFilter=None) -> None:
         with ui.column().classes('gap-1'):
             ui.label('Orders').classes('page-title')
             ui.label('Track and manage incoming customer orders.').classes('text-sm text-muted')
-        ui.button('+ New Order', color='white', on_click=_new_order_dialog).props('flat no-caps').classes('button button-primary')
+        ui.button('+ New Order', color='white', on_click=lambda: dialogs.show('new-order', _new_order_form)).props('flat no-caps').classes('button button-primary')
     ui.element('div').classes('divider mb-4')
 
-    # ── KPI row ───────────────────────────────────────────────────
-    total   = sum(_STATUS_COUNTS.values())
-    revenue = sum(_DAILY['revenue'])
+    # ── KPI row — last 7 days from the orders rollup, filled in once loaded ─
+    kpi_values = {}
     with ui.row().classes('gap-4 flex-wrap mb-6'):
-        for label, value, sub, color, icon in [
-            ('Total Orders', str(total),                           'this week',   'text-info',    'receipt_long'),
-            ('Revenue',      f'\u20ac {revenue:,}',                'this week',   'text-success', 'payments'),
-            ('Fulfilled',    str(_STATUS_COUNTS['Fulfilled']),     'completed',   'text-success', 'check_circle'),
-            ('Processing',   str(_STATUS_COUNTS['Processing']),    'in progress', 'text-warning', 'autorenew'),
-            ('Cancelled',    str(_STATUS_COUNTS['Cancelled']),     'this week',   'text-danger',  'cancel'),
+        for key, label, sub, color, icon in [
+            ('orders',     'Total Orders', 'last 7 days', 'text-info',    'receipt_long'),
+            ('revenue',    'Revenue',      'last 7 days', 'text-success', 'payments'),
+            ('Fulfilled',  'Fulfilled',    'completed',   'text-success', 'check_circle'),
+            ('Processing', 'Processing',   'in progress', 'text-warning', 'autorenew'),
+            ('Cancelled',  'Cancelled',    'last 7 days', 'text-danger',  'cancel'),
         ]:
             with ui.element('div').classes('card').style('min-width:150px;flex:1'):
                 with ui.row().classes('items-start justify-between mb-3'):
                     ui.label(label).classes('label-text')
                     ui.icon(icon).style('font-size:1.15rem;color:var(--muted-fg)')
-                ui.label(value).classes(f'text-2xl font-bold {color}')
+                kpi_values[key] = (ui.label().classes('skeleton skeleton-text w-20 mt-2 mb-2'), color)
                 ui.label(sub).classes('text-xs text-muted mt-1')
 
     # ── Charts row ────────────────────────────────────────────────
@@ -68,107 +62,151 @@ def content(searchFilter=None) -> None:
         # Status donut
         with ui.element('div').classes('card').style('flex:1;min-width:280px'):
             ui.label('Status Breakdown').classes('card-title mb-1')
-            ui.echart({
-                'tooltip': {'trigger': 'item', **_TT},
-                'legend':  {'bottom': 0, 'left': 'center',
-                            'textStyle': {'color': '#71717a', 'fontSize': 12},
-                            'itemWidth': 10, 'itemHeight': 10, 'itemGap': 12},
-                'series': [{
-                    'type': 'pie', 'radius': ['46%', '70%'], 'center': ['50%', '44%'],
-                    'avoidLabelOverlap': False,
-                    'label': {'show': False},
-                    'emphasis': {'label': {'show': True, 'fontSize': 13, 'fontWeight': 'bold', 'color': '#09090b'}},
-                    'labelLine': {'show': False},
-                    'data': [
-                        {'name': k, 'value': v, 'itemStyle': {'color': _STATUS_STYLE[k][1]}}
-                        for k, v in _STATUS_COUNTS.items()
-                    ],
-                }],
-            }).classes('w-full').style('height:280px')
+            status_chart = ui.echart({
+                'tooltip': {'trigger': 'item'},
+                'legend':  {'bottom': 0, 'itemWidth': 10, 'itemHeight': 10, 'itemGap': 12},
+                'series': [{'type': 'pie', 'radius': ['46%', '70%'], 'center': ['50%', '44%'], 'data': []}],
+            }, theme=charts.theme()).classes('w-full skeleton').style('height:280px')
 
         # Orders (bars) + Revenue (line) — dual axis
         with ui.element('div').classes('card').style('flex:2;min-width:360px'):
-            ui.label('Orders & Revenue — This Week').classes('card-title mb-1')
-            ui.echart({
-                'tooltip': {'trigger': 'axis', **_TT, 'axisPointer': {'type': 'cross'}},
-                'legend': {'data': ['Orders', 'Revenue'], 'top': 0,
-                           'textStyle': {'color': '#71717a', 'fontSize': 12}},
-                'grid': {'left': '3%', 'right': '4%', 'bottom': '3%', 'top': '14%', 'containLabel': True},
-                'xAxis': {'type': 'category', 'data': _DAILY['days'], **_AX},
+            ui.label('Orders & Revenue — Last 7 Days').classes('card-title mb-1')
+            daily_chart = ui.echart({
+                'tooltip': {'trigger': 'axis', 'axisPointer': {'type': 'cross'}},
+                'legend': {'data': ['Orders', 'Revenue'], 'top': 0},
+                'grid': {'right': '4%', 'top': '14%'},
+                'xAxis': {'type': 'category', 'data': []},
                 'yAxis': [
-                    {**_AX, **_SL, 'type': 'value', 'name': 'Orders',
-                     'axisLabel': {'color': '#71717a', 'fontSize': 11}},
-                    {**_AX, **_SL, 'type': 'value', 'name': 'Revenue (€)',
-                     'splitLine': {'show': False},
-                     'axisLabel': {':formatter': 'v => "€" + v', 'color': '#71717a', 'fontSize': 11}},
+                    {'type': 'value', 'name': 'Orders'},
+                    {'type': 'value', 'name': 'Revenue (€)', 'splitLine': {'show': False},
+                     'axisLabel': {':formatter': 'v => "€" + v'}},
                 ],
                 'series': [
                     {'name': 'Orders', 'type': 'bar', 'yAxisIndex': 0,
-                     'data': _DAILY['orders'], 'barMaxWidth': 32,
-                     'itemStyle': {'color': '#60a5fa', 'borderRadius': [4, 4, 0, 0]}},
+                     'data': [], 'itemStyle': {'color': '#60a5fa'}},
                     {'name': 'Revenue', 'type': 'line', 'smooth': True, 'yAxisIndex': 1,
-                     'data': _DAILY['revenue'], 'symbol': 'circle', 'symbolSize': 6,
-                     'lineStyle': {'width': 2.5, 'color': '#4ade80'},
+                     'data': [],
+                     'lineStyle': {'color': '#4ade80'},
                      'itemStyle': {'color': '#4ade80', 'borderWidth': 2, 'borderColor': '#fff'}},
                 ],
-            }).classes('w-full').style('height:280px')
-
-    # ── Recent orders table ───────────────────────────────────────
+            }, theme=charts.theme()).classes('w-full skeleton').style('height:280px')
+
+    async def load() -> None:
+        week = await data.get_order_week()
+        recent = await data.get_orders(_RECENT)
+        if status_chart.is_deleted:
+            return
+        recent_table.set_rows([_display(order) for order in recent['rows']])
+        recent_label.set_text(f'{len(recent["rows"])} of {recent["total"]:,} orders shown')
+        for key, (label, color) in kpi_values.items():
+            value = week[key] if key in week else week['status'][key]
+            label.set_text(f'\u20ac {value:,}' if key == 'revenue' else str(value))
+            label.classes(replace=f'text-2xl font-bold {color}')
+        status_chart.options['series'][0]['data'] = [
+            {'name': k, 'value': v, 'itemStyle': {'color': _STATUS_STYLE[k][1]}} for k, v in week['status'].items()
+        ]
+        daily = week['daily']
+        daily_chart.options['xAxis']['data'] = daily['days']
+        daily_chart.options['series'][0]['data'] = daily['orders']
+        daily_chart.options['series'][1]['data'] = daily['revenue']
+        for chart in (status_chart, daily_chart):
+            chart.classes(remove='skeleton')
+
+    # ── Recent orders table — newest orders from the order repository ─
     with ui.element('div').classes('card mb-4'):
         with ui.row().classes('items-center justify-between mb-4'):
             with ui.column().classes('gap-0'):
                 ui.label('Recent Orders').classes('card-title')
-                ui.label(f'{len(_RECENT)} orders shown').classes('text-xs text-muted mt-1')
-            ui.button('View all', color='white',
-                      on_click=lambda: notify('Loading full order list…', type='info')).props('flat no-caps').classes('button button-ghost button-sm')
-        with ui.element('table').classes('data-table w-full'):
-            with ui.element('thead'):
-                with ui.element('tr'):
-                    for col in ['Order ID', 'Customer', 'Product', 'Qty', 'Total', 'Status', 'Date']:
-                        with ui.element('th'): ui.label(col)
-            with ui.element('tbody'):
-                for r in _RECENT:
-                    badge_cls, _ = _STATUS_STYLE.get(r['status'], ('badge-default', '#a1a1aa'))
-                    with ui.element('tr'):
-                        with ui.element('td'):
-                            ui.label(r['id']).classes('font-semi text-sm')
-                        with ui.element('td'): ui.label(r['customer'])
-                        with ui.element('td'): ui.label(r['product'])
-                        with ui.element('td'): ui.label(str(r['qty']))
-                        with ui.element('td'):
-                            ui.label(r['total']).classes('font-semi')
-                        with ui.element('td'):
-                            ui.label(r['status']).classes(f'badge {badge_cls}')
-                        with ui.element('td'):
-                            ui.label(r['date']).classes('text-muted')
-
-
-def _new_order_dialog() -> None:
-    with ui.dialog(value=True) as dlg, ui.card().style('min-width:380px;padding:28px 32px'):
+                recent_label = ui.label('Loading…').classes('text-xs text-muted mt-1')
+            ui.button('View all', color='white', on_click=_all_orders_dialog).props('flat no-caps').classes('button button-ghost button-sm')
+        recent_table = DataTable(_COLUMNS, [])
+
+    background_tasks.create(load(), name='orders data')
+
+
+def _display(order: dict) -> dict:
+    return {
+        **order,
+        'total': f'\u20ac {order["amount"]:,.2f}',
+        'date': datetime.fromtimestamp(order['ts']).strftime('%b %d, %H:%M'),
+    }
+
+
+class _OrderPages:
+    """DataTable source over the order history: by cursor while the user scrolls on, by offset after a jump."""
+
+    def __init__(self) -> None:
+        self.filters: dict[str, str] = {}
+        self._cursors: dict[tuple[bool, int], str] = {}     # (descending, row position) → cursor before it
+
+    def reset(self) -> None:
+        self._cursors.clear()
+
+    async def __call__(self, start: int, end: int, sort: str | None, descending: bool) -> tuple[list[dict], int]:
+        descending = descending or sort is None     # newest first unless sorted oldest first
+        cursor = self._cursors.get((descending, start))
+        page = await data.get_orders(end - start, cursor, offset=0 if cursor else start,
+                                     descending=descending, **self.filters)
+        if page['next']:
+            self._cursors[(descending, end)] = page['next']
+        return [_display(order) for order in page['rows']], page['total']
+
+
+def _all_orders_dialog() -> None:
+    pages = _OrderPages()
+
+    def apply_filters() -> None:
+        pages.filters = {name: select.value for name, select in (('status', status), ('customer', customer))
+                         if select.value != 'All'}
+        pages.reset()
+        table.refresh()
+
+    with ui.dialog(value=True) as dlg, ui.card().style('min-width:960px;padding:28px 32px'):
+        dlg.on('hide', dlg.delete)
+        with ui.row().classes('items-center justify-between w-full mb-4'):
+            ui.label('All Orders').classes('card-title')
+            ui.button(icon='close', color='white', on_click=dlg.close).props('flat round dense').classes('button button-ghost')
+        with ui.row().classes('gap-4 w-full mb-4'):
+            status = ui.select(['All', *data.STATUSES], value='All', label='Status',
+                               on_change=apply_filters).classes('flex-1').props('outlined dense')
+            customer = ui.select(['All', *data.CUSTOMERS], value='All', label='Customer',
+                                 on_change=apply_filters).classes('flex-1').props('outlined dense')
+        # Only creation time is indexed for ordering; the other columns filter above
+        table = DataTable([{**c, 'sortable': c['field'] == 'date'} for c in _COLUMNS], source=pages,
+                          height='560px', sort='date', descending=True).classes('w-full')
+
+
+def _new_order_form(dlg: ui.dialog) -> None:
+    """Built once per client (services/dialogs.py); every open starts from these values."""
+
+    async def create() -> None:
+        dlg.close()
+        order_id = await run.io_bound(data.create_order, customer.value, product.value, int(qty.value or 1))
+        if order_id:
+            notify(f'{order_id} created successfully', type='positive', title='Order Created')
+
+    with ui.card().style('min-width:380px;padding:28px 32px'):
         with ui.row().classes('items-center justify-between w-full mb-4'):
             ui.label('New Order').classes('card-title')
             ui.button(icon='close', color='white', on_click=dlg.close).props('flat round dense').classes('button button-ghost')
         with ui.column().classes('gap-4 w-full'):
             with ui.element('div').classes('w-full'):
                 ui.label('Customer').classes('field-label')
-                ui.select(['Acme Corp', 'Beta GmbH', 'Gamma Ltd', 'Delta AG', 'Epsilon BV'],
-                          value='Acme Corp').classes('w-full').props('outlined dense')
+                customer = ui.select(['Acme Corp', 'Beta GmbH', 'Gamma Ltd', 'Delta AG', 'Epsilon BV'],
+                                     value='Acme Corp').classes('w-full').props('outlined dense')
             with ui.element('div').classes('w-full'):
                 ui.label('Product').classes('field-label')
-                ui.select(['Widget A', 'Gear Box', 'Control Unit', 'Panel Module'],
-                          value='Widget A').classes('w-full').props('outlined dense')
+                product = ui.select(['Widget A', 'Gear Box', 'Control Unit', 'Panel Module'],
+                                    value='Widget A').classes('w-full').props('outlined dense')
             with ui.row().classes('gap-4 w-full'):
                 with ui.element('div').classes('flex-1'):
                     ui.label('Quantity').classes('field-label')
-                    ui.number(value=1, min=1, max=999).classes('w-full').props('outlined dense')
+                    qty = ui.number(value=1, min=1, max=999, precision=0).classes('w-full').props('outlined dense')
                 with ui.element('div').classes('flex-1'):
                     ui.label('Priority').classes('field-label')
                     ui.select(['Normal', 'High', 'Urgent'], value='Normal').classes('w-full').props('outlined dense')
         ui.element('div').classes('divider mt-4 mb-4')
         with ui.row().classes('gap-3 justify-end w-full'):
             ui.button('Cancel', color='white', on_click=dlg.close).props('flat no-caps').classes('button button-outline button-sm')
-            ui.button('Create Order', color='white', on_click=lambda: [
-                notify('Order created successfully', type='positive', title='Order Created'),
-                dlg.close(),
-            ]).props('flat no-caps').classes('button button-primary button-sm')
+            ui.button('Create Order', color='white', on_click=create).props('flat no-caps').classes('button button-primary button-sm')
 
@@ -1,28 +1,34 @@
 """Packings page — Kanban board (Pending → In Progress → Packed) with pipeline summary."""
 
 from nicegui import ui
+from services import db
 from services.notifications import notify
 
-_COLUMNS = {
-    'Pending': [
-        {'id': 'PKG-6000', 'order': 'ORD-4007', 'customer': 'Acme Corp',  'product': 'Gear Box',       'units': 3,  'due': 'Mar 01', 'pack_type': 'Box M'},
-        {'id': 'PKG-6001', 'order': 'ORD-4010', 'customer': 'Gamma Ltd',  'product': 'Sensor Kit',     'units': 1,  'due': 'Mar 02', 'pack_type': 'Envelope'},
-        {'id': 'PKG-6002', 'order': 'ORD-4012', 'customer': 'Zeta KG',    'product': 'Panel Module',   'units': 5,  'due': 'Mar 03', 'pack_type': 'Box L'},
-        {'id': 'PKG-6003', 'order': 'ORD-4014', 'customer': 'Theta Inc',  'product': 'Widget A',       'units': 10, 'due': 'Mar 04', 'pack_type': 'Pallet'},
-    ],
-    'In Progress': [
-        {'id': 'PKG-6004', 'order': 'ORD-4001', 'customer': 'Beta GmbH',  'product': 'Control Unit',   'units': 2,  'due': 'Feb 28', 'pack_type': 'Box S'},
-        {'id': 'PKG-6005', 'order': 'ORD-4003', 'customer': 'Delta AG',   'product': 'Cable Harness',  'units': 4,  'due': 'Mar 01', 'pack_type': 'Box M'},
-        {'id': 'PKG-6006', 'order': 'ORD-4009', 'customer': 'Iota LLC',   'product': 'Motor Drive',    'units': 1,  'due': 'Mar 01', 'pack_type': 'Box S'},
-    ],
-    'Packed': [
-        {'id': 'PKG-6007', 'order': 'ORD-4000', 'customer': 'Epsilon BV', 'product': 'Filter Pack',    'units': 6,  'due': 'Feb 27', 'pack_type': 'Box L'},
-        {'id': 'PKG-6008', 'order': 'ORD-4002', 'customer': 'Kappa OY',   'product': 'Valve Assembly', 'units': 2,  'due': 'Feb 27', 'pack_type': 'Box M'},
-        {'id': 'PKG-6009', 'order': 'ORD-4004', 'customer': 'Eta SRL',    'product': 'Bracket Set',    'units': 8,  'due': 'Feb 26', 'pack_type': 'Pallet'},
-        {'id': 'PKG-6010', 'order': 'ORD-4006', 'customer': 'Acme Corp',  'product': 'Gear Box',       'units': 1,  'due': 'Feb 26', 'pack_type': 'Envelope'},
-        {'id': 'PKG-6011', 'order': 'ORD-4008', 'customer': 'Beta GmbH',  'product': 'Widget A',       'units': 3,  'due': 'Feb 25', 'pack_type': 'Box S'},
-    ],
-}
+# Stored in the database; these are its first rows. `stage` is the board column, or 'Dispatched'
+_JOBS = db.load_or_seed('packing_jobs', [
+    {'id': 'PKG-6000', 'order_id': 'ORD-4007', 'customer': 'Acme Corp',   'product': 'Gear Box',        'units': 3,  'due': 'Mar 01', 'pack_type': 'Box M',     'stage': 'Pending'},
+    {'id': 'PKG-6001', 'order_id': 'ORD-4010', 'customer': 'Gamma Ltd',   'product': 'Sensor Kit',      'units': 1,  'due': 'Mar 02', 'pack_type': 'Envelope',  'stage': 'Pending'},
+    {'id': 'PKG-6002', 'order_id': 'ORD-4012', 'customer': 'Zeta KG',     'product': 'Panel Module',    'units': 5,  'due': 'Mar 03', 'pack_type': 'Box L',     'stage': 'Pending'},
+    {'id': 'PKG-6003', 'order_id': 'ORD-4014', 'customer': 'Theta Inc',   'product': 'Widget A',        'units': 10, 'due': 'Mar 04', 'pack_type': 'Pallet',    'stage': 'Pending'},
+    {'id': 'PKG-6004', 'order_id': 'ORD-4001', 'customer': 'Beta GmbH',   'product': 'Control Unit',    'units': 2,  'due': 'Feb 28', 'pack_type': 'Box S',     'stage': 'In Progress'},
+    {'id': 'PKG-6005', 'order_id': 'ORD-4003', 'customer': 'Delta AG',    'product': 'Cable Harness',   'units': 4,  'due': 'Mar 01', 'pack_type': 'Box M',     'stage': 'In Progress'},
+    {'id': 'PKG-6006', 'order_id': 'ORD-4009', 'customer': 'Iota LLC',    'product': 'Motor Drive',     'units': 1,  'due': 'Mar 01', 'pack_type': 'Box S',     'stage': 'In Progress'},
+    {'id': 'PKG-6007', 'order_id': 'ORD-4000', 'customer': 'Epsilon BV',  'product': 'Filter Pack',     'units': 6,  'due': 'Feb 27', 'pack_type': 'Box L',     'stage': 'Packed'},
+    {'id': 'PKG-6008', 'order_id': 'ORD-4002', 'customer': 'Kappa OY',    'product': 'Valve Assembly',  'units': 2,  'due': 'Feb 27', 'pack_type': 'Box M',     'stage': 'Packed'},
+    {'id': 'PKG-6009', 'order_id': 'ORD-4004', 'customer': 'Eta SRL',     'product': 'Bracket Set',     'units': 8,  'due': 'Feb 26', 'pack_type': 'Pallet',    'stage': 'Packed'},
+    {'id': 'PKG-6010', 'order_id': 'ORD-4006', 'customer': 'Acme Corp',   'product': 'Gear Box',        'units': 1,  'due': 'Feb 26', 'pack_type': 'Envelope',  'stage': 'Packed'},
+    {'id': 'PKG-6011', 'order_id': 'ORD-4008', 'customer': 'Beta GmbH',   'product': 'Widget A',        'units': 3,  'due': 'Feb 25', 'pack_type': 'Box S',     'stage': 'Packed'},
+])
+
+_STAGES = ('Pending', 'In Progress', 'Packed', 'Dispatched')
+
+
+def advance(job_id: str) -> dict:
+    """Move a job to its next stage, stored at once; returns the job."""
+    job = next(j for j in _JOBS if j['id'] == job_id)
+    job['stage'] = _STAGES[min(_STAGES.index(job['stage']) + 1, len(_STAGES) - 1)]
+    db.execute('UPDATE packing_jobs SET stage = ? WHERE id = ?', (job['stage'], job_id))
+    return job
 
 _COL_STYLE = {
     'Pending':     ('badge-warning', 'text-warning', 'inventory',    '#fbbf24'),
@@ -48,9 +54,16 @@ def content() -> None:
                   on_click=lambda: notify('New job form coming soon', type='info')).props('flat no-caps').classes('button button-primary')
     ui.element('div').classes('divider mb-4')
 
+    board()
+
+
+# ── Summary strip and board — drawn again after every move ───────────────────
+@ui.refreshable
+def board() -> None:
     # ── Pipeline summary strip ────────────────────────────────────
-    total       = sum(len(v) for v in _COLUMNS.values())
-    total_units = sum(j['units'] for jobs in _COLUMNS.values() for j in jobs)
+    columns     = {stage: [j for j in _JOBS if j['stage'] == stage] for stage in _COL_STYLE}
+    total       = sum(len(v) for v in columns.values())
+    total_units = sum(j['units'] for jobs in columns.values() for j in jobs)
 
     with ui.row().classes('gap-0 flex-wrap mb-6 w-full').style(
             'border:1px solid var(--border);border-radius:var(--radius-lg);overflow:hidden'):
@@ -64,7 +77,7 @@ def content() -> None:
         # Pipeline stages
         for col_name in ('Pending', 'In Progress', 'Packed'):
             badge_cls, text_cls, col_icon, col_color = _COL_STYLE[col_name]
-            cnt = len(_COLUMNS[col_name])
+            cnt = len(columns[col_name])
             pct = int(cnt / total * 100) if total else 0
             is_last = col_name == 'Packed'
             with ui.element('div').style(
@@ -78,7 +91,7 @@ def content() -> None:
 
     # ── Kanban board ──────────────────────────────────────────────
     with ui.row().classes('gap-4 items-start w-full'):
-        for col_name, jobs in _COLUMNS.items():
+        for col_name, jobs in columns.items():
             badge_cls, text_cls, col_icon, col_color = _COL_STYLE[col_name]
             action_label, action_cls, action_type, action_title = _COL_ACTION[col_name]
 
@@ -122,8 +135,14 @@ def content() -> None:
                             # Footer: order ref + action
                             ui.element('div').classes('divider mt-0 mb-2')
                             with ui.row().classes('items-center justify-between'):
-                                ui.label(job['order']).classes('text-xs text-faint')
+                                ui.label(job['order_id']).classes('text-xs text-faint')
                                 ui.button(action_label, color='white',
                                           on_click=lambda jid=job['id'], t=action_type, ti=action_title:
-                                          notify(f'{jid} — {ti.lower()}', type=t, title=ti),
-                                          ).props('flat no-caps').classes(f'button {action_cls} button-sm')
\ No newline at end of file
+                                          _move(jid, t, ti),
+                                          ).props('flat no-caps').classes(f'button {action_cls} button-sm')
+
+
+def _move(job_id: str, kind: str, title: str) -> None:
+    advance(job_id)
+    board.refresh()     # every open board
+    notify(f'{job_id} — {title.lower()}', type=kind, title=title)
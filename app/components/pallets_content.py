@@ -1,18 +1,29 @@
 """Pallets page — inventory cards, KPI row and per-location capacity summary table."""
 
 from nicegui import ui
+from components.data_table import DataTable
+from services import db
+from services.kpis import KpiView
 from services.notifications import notify
 
-_PALLETS = [
-    {'id': 'PLT-3000', 'type': 'EUR Pallet',     'location': 'Warehouse A', 'cap': 500, 'load': 480, 'status': 'In Use',     'dot': 'info'},
-    {'id': 'PLT-3001', 'type': 'Half Pallet',     'location': 'Dock 1',      'cap': 300, 'load': 0,   'status': 'Available',  'dot': 'success'},
-    {'id': 'PLT-3002', 'type': 'EUR Pallet',      'location': 'Warehouse B', 'cap': 500, 'load': 500, 'status': 'In Transit', 'dot': 'warning'},
-    {'id': 'PLT-3003', 'type': 'Chemical Pallet', 'location': 'Staging',     'cap': 400, 'load': 120, 'status': 'Available',  'dot': 'success'},
-    {'id': 'PLT-3004', 'type': 'Display Pallet',  'location': 'Line A',      'cap': 250, 'load': 210, 'status': 'In Use',     'dot': 'info'},
-    {'id': 'PLT-3005', 'type': 'EUR Pallet',      'location': 'Dock 2',      'cap': 500, 'load': 80,  'status': 'Damaged',    'dot': 'danger'},
-    {'id': 'PLT-3006', 'type': 'One-way',         'location': 'Warehouse A', 'cap': 600, 'load': 0,   'status': 'Available',  'dot': 'success'},
-    {'id': 'PLT-3007', 'type': 'Half Pallet',     'location': 'Line B',      'cap': 300, 'load': 290, 'status': 'In Use',     'dot': 'info'},
-]
+# Stored in the database; these are its first rows
+_PALLETS = db.load_or_seed('pallets', [
+    {'id': 'PLT-3000', 'type': 'EUR Pallet',     'location': 'Warehouse A', 'cap': 500, 'load': 480, 'status': 'In Use'},
+    {'id': 'PLT-3001', 'type': 'Half Pallet',     'location': 'Dock 1',      'cap': 300, 'load': 0,   'status': 'Available'},
+    {'id': 'PLT-3002', 'type': 'EUR Pallet',      'location': 'Warehouse B', 'cap': 500, 'load': 500, 'status': 'In Transit'},
+    {'id': 'PLT-3003', 'type': 'Chemical Pallet', 'location': 'Staging',     'cap': 400, 'load': 120, 'status': 'Available'},
+    {'id': 'PLT-3004', 'type': 'Display Pallet',  'location': 'Line A',      'cap': 250, 'load': 210, 'status': 'In Use'},
+    {'id': 'PLT-3005', 'type': 'EUR Pallet',      'location': 'Dock 2',      'cap': 500, 'load': 80,  'status': 'Damaged'},
+    {'id': 'PLT-3006', 'type': 'One-way',         'location': 'Warehouse A', 'cap': 600, 'load': 0,   'status': 'Available'},
+    {'id': 'PLT-3007', 'type': 'Half Pallet',     'location': 'Line B',      'cap': 300, 'load': 290, 'status': 'In Use'},
+])
+
+_STATUS_DOT = {
+    'Available':  'success',
+    'In Use':     'info',
+    'In Transit': 'warning',
+    'Damaged':    'danger',
+}
 
 _STATUS_BADGE = {
     'Available':  'badge-success',
@@ -21,9 +32,9 @@ _STATUS_BADGE = {
     'Damaged':    'badge-danger',
 }
 
-_LOCATION_COUNTS: dict = {}
-for _p in _PALLETS:
-    _LOCATION_COUNTS[_p['location']] = _LOCATION_COUNTS.get(_p['location'], 0) + 1
+# Counts and load/capacity sums per status and per location
+_KPIS = KpiView(by=('status', 'location'), sums=('load', 'cap'))
+_KPIS.load(_PALLETS)
 
 
 def content() -> None:
@@ -38,21 +49,17 @@ def content() -> None:
     ui.element('div').classes('divider mb-4')
 
     # ── KPI row ───────────────────────────────────────────────────
-    by_status: dict = {}
-    for p in _PALLETS:
-        by_status[p['status']] = by_status.get(p['status'], 0) + 1
-
-    total_load = sum(p['load'] for p in _PALLETS)
-    total_cap  = sum(p['cap']  for p in _PALLETS)
+    total_load = _KPIS.total('load')
+    total_cap  = _KPIS.total('cap')
     util_pct   = int(total_load / total_cap * 100) if total_cap else 0
 
     with ui.row().classes('gap-4 flex-wrap mb-6'):
         for label, value, sub, color, icon in [
-            ('Total',       str(len(_PALLETS)),                   'registered',       'text-info',    'inventory_2'),
-            ('Available',   str(by_status.get('Available', 0)),   'ready to use',     'text-success', 'check_circle'),
-            ('In Use',      str(by_status.get('In Use', 0)),      'currently loaded', 'text-info',    'forklift'),
-            ('In Transit',  str(by_status.get('In Transit', 0)),  'on the move',      'text-warning', 'moving'),
-            ('Damaged',     str(by_status.get('Damaged', 0)),     'needs inspection', 'text-danger',  'warning'),
+            ('Total',       str(_KPIS.count()),                     'registered',       'text-info',    'inventory_2'),
+            ('Available',   str(_KPIS.count(status='Available')),   'ready to use',     'text-success', 'check_circle'),
+            ('In Use',      str(_KPIS.count(status='In Use')),      'currently loaded', 'text-info',    'forklift'),
+            ('In Transit',  str(_KPIS.count(status='In Transit')),  'on the move',      'text-warning', 'moving'),
+            ('Damaged',     str(_KPIS.count(status='Damaged')),     'needs inspection', 'text-danger',  'warning'),
             ('Utilisation', f'{util_pct} %',                      'fleet avg load',   'text-info' if util_pct < 80 else 'text-warning', 'speed'),
         ]:
             with ui.element('div').classes('card').style('min-width:130px;flex:1'):
@@ -66,7 +73,7 @@ def content() -> None:
     with ui.row().classes('items-center justify-between mb-3'):
         with ui.column().classes('gap-0'):
             ui.label('Pallet Inventory').classes('card-title')
-            ui.label(f'{len(_PALLETS)} pallets registered').classes('text-xs text-muted mt-1')
+            ui.label(f'{_KPIS.count()} pallets registered').classes('text-xs text-muted mt-1')
 
     with ui.row().classes('gap-4 flex-wrap mb-6'):
         for p in _PALLETS:
@@ -78,7 +85,7 @@ def content() -> None:
                 # Card header
                 with ui.row().classes('items-center justify-between mb-3'):
                     with ui.row().classes('items-center gap-2'):
-                        ui.element('span').classes(f'status-dot {p["dot"]}')
+                        ui.element('span').classes(f'status-dot {_STATUS_DOT.get(p["status"], "info")}')
                         ui.label(p['id']).classes('font-semi text-sm')
                     ui.label(p['status']).classes(f'badge {_STATUS_BADGE.get(p["status"], "badge-default")}')
                 # Meta
@@ -108,33 +115,22 @@ def content() -> None:
                               on_click=lambda pid=p['id']: notify(f'{pid} inspection queued', type='warning')).props('flat no-caps').classes('button button-ghost button-sm')
 
     # ── Location summary ──────────────────────────────────────────
+    location_counts = _KPIS.counts('location')
     with ui.element('div').classes('card mb-4'):
         with ui.row().classes('items-center justify-between mb-4'):
             with ui.column().classes('gap-0'):
                 ui.label('By Location').classes('card-title')
-                ui.label(f'{len(_LOCATION_COUNTS)} locations').classes('text-xs text-muted mt-1')
-        with ui.element('table').classes('data-table w-full'):
-            with ui.element('thead'):
-                with ui.element('tr'):
-                    for col in ['Location', 'Pallets', 'Total Load', 'Utilisation']:
-                        with ui.element('th'): ui.label(col)
-            with ui.element('tbody'):
-                for loc, cnt in sorted(_LOCATION_COUNTS.items()):
-                    loc_pallets = [p for p in _PALLETS if p['location'] == loc]
-                    t_load = sum(p['load'] for p in loc_pallets)
-                    t_cap  = sum(p['cap']  for p in loc_pallets)
-                    util   = int(t_load / t_cap * 100) if t_cap else 0
-                    bar_c  = '#4ade80' if util < 80 else '#fbbf24'
-                    with ui.element('tr'):
-                        with ui.element('td'): ui.label(loc).classes('font-semi')
-                        with ui.element('td'): ui.label(str(cnt))
-                        with ui.element('td'): ui.label(f'{t_load:,} / {t_cap:,} kg').classes('text-muted')
-                        with ui.element('td'):
-                            with ui.element('div').classes('flex items-center gap-3'):
-                                ui.element('div').style(
-                                    'flex:1;height:6px;border-radius:9999px;background:#f4f4f5;overflow:hidden'
-                                ).add_slot('default',
-                                    f'<div style="width:{util}%;height:100%;background:{bar_c};'
-                                    f'border-radius:9999px;transition:width .4s"></div>'
-                                )
-                                ui.label(f'{util} %').classes('text-xs text-muted').style('min-width:36px')
\ No newline at end of file
+                ui.label(f'{len(location_counts)} locations').classes('text-xs text-muted mt-1')
+        rows = []
+        for loc, cnt in sorted(location_counts.items()):
+            t_load = _KPIS.total('load', location=loc)
+            t_cap  = _KPIS.total('cap',  location=loc)
+            rows.append({'location': loc, 'pallets': cnt, 'load': f'{t_load:,} / {t_cap:,} kg', 'load_kg': t_load,
+                         'util': int(t_load / t_cap * 100) if t_cap else 0})
+        DataTable([
+            {'field': 'location', 'label': 'Location',    'classes': 'font-semi'},
+            {'field': 'pallets',  'label': 'Pallets'},
+            {'field': 'load',     'label': 'Total Load',  'classes': 'text-muted', 'sort_by': 'load_kg'},
+            {'field': 'util',     'label': 'Utilisation', 'kind': 'bar', 'show_value': True,
+             'colors': [[0, '#4ade80'], [80, '#fbbf24']]},
+        ], rows)
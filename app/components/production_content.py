@@ -1,6 +1,13 @@
-"""Production page — live line status, KPI summary and hourly throughput chart."""
+"""Production page — live line status, KPI summary and per-minute throughput history."""
+
+import time
 
 from nicegui import ui
+import services.dashboard_data as data
+from components.data_table import DataTable
+from components.history_chart import HistoryChart
+from services import charts
+from services.kpis import KpiView
 from services.notifications import notify
 
 _LINES = [
@@ -11,17 +18,17 @@ _LINES = [
     {'name': 'Line E', 'product': 'Widget A',     'shift': 'Night',     'target': 600, 'actual': 561, 'status': 'Running', 'status_cls': 'badge-success'},
 ]
 
-_THROUGHPUT = {
-    'hours':  ['06:00', '08:00', '10:00', '12:00', '14:00', '16:00', '18:00', '20:00'],
-    'line_a': [42, 58, 61, 55, 63, 60, 58, 49],
-    'line_c': [38, 50, 54, 48, 55, 52, 50, 43],
-    'line_e': [60, 72, 75, 68, 78, 74, 71, 65],
-}
+# Line counts per status and target/actual sums
+_KPIS = KpiView(by=('status',), sums=('target', 'actual'))
+_KPIS.load(_LINES)
+
+# Lines plotted in the throughput chart, with their colours
+_CHART_LINES = [('Line A', '#60a5fa'), ('Line C', '#4ade80'), ('Line E', '#fbbf24')]
+
 
-_TT = {'backgroundColor': '#fff', 'borderColor': '#e4e4e7', 'textStyle': {'color': '#09090b', 'fontSize': 12}}
-_AX = {'axisLine': {'lineStyle': {'color': '#e4e4e7'}}, 'axisTick': {'show': False},
-       'axisLabel': {'color': '#71717a', 'fontSize': 11}}
-_SL = {'splitLine': {'lineStyle': {'color': '#f4f4f5', 'type': 'dashed'}}}
+async def _line_rates(start: float | None, end: float | None, points: int) -> list[list]:
+    rates = await data.get_line_rates(tuple(name for name, _ in _CHART_LINES), start, end, points)
+    return [rates['series'][name] for name, _ in _CHART_LINES]
 
 
 def content(searchFilter=None) -> None:
@@ -36,15 +43,15 @@ def content(searchFilter=None) -> None:
     ui.element('div').classes('divider mb-4')
 
     # ── KPI row ───────────────────────────────────────────────────
-    running = sum(1 for l in _LINES if l['status'] == 'Running')
-    total_t = sum(l['target'] for l in _LINES)
-    total_a = sum(l['actual'] for l in _LINES)
+    running = _KPIS.count(status='Running')
+    total_t = _KPIS.total('target')
+    total_a = _KPIS.total('actual')
     eff     = int(total_a / total_t * 100) if total_t else 0
-    alerts  = sum(1 for l in _LINES if l['status'] == 'Error')
+    alerts  = _KPIS.count(status='Error')
 
     with ui.row().classes('gap-4 flex-wrap mb-6'):
         for label, value, sub, color, icon in [
-            ('Active Lines', f'{running} / {len(_LINES)}', 'currently running',          'text-success',                               'conveyor_belt'),
+            ('Active Lines', f'{running} / {_KPIS.count()}', 'currently running',          'text-success',                               'conveyor_belt'),
             ('Units Today',  f'{total_a:,}',               f'of {total_t:,} target',     'text-info',                                  'inventory_2'),
             ('Efficiency',   f'{eff} %',                   'vs daily target',            'text-success' if eff >= 90 else 'text-warning','speed'),
             ('Shifts',       '3',                          'Morning / Afternoon / Night', 'text-info',                                  'schedule'),
@@ -65,63 +72,40 @@ def content(searchFilter=None) -> None:
                 ui.label(f'{len(_LINES)} production lines').classes('text-xs text-muted mt-1')
             ui.button('Refresh', color='white',
                       on_click=lambda: notify('Line data refreshed', type='info')).props('flat no-caps').classes('button button-ghost button-sm')
-        with ui.element('table').classes('data-table w-full'):
-            with ui.element('thead'):
-                with ui.element('tr'):
-                    for col in ['Line', 'Product', 'Shift', 'Progress', 'Actual / Target', 'Status']:
-                        with ui.element('th'): ui.label(col)
-            with ui.element('tbody'):
-                for line in _LINES:
-                    pct = int(line['actual'] / line['target'] * 100) if line['target'] else 0
-                    bar_color = ('#4ade80' if pct >= 90 else '#fbbf24' if pct >= 60 else '#f87171')
-                    with ui.element('tr'):
-                        with ui.element('td'):
-                            ui.label(line['name']).classes('font-semi')
-                        with ui.element('td'): ui.label(line['product'])
-                        with ui.element('td'): ui.label(line['shift'])
-                        with ui.element('td').style('min-width:160px'):
-                            ui.element('div').style(
-                                f'height:6px;border-radius:9999px;background:#f4f4f5;overflow:hidden'
-                            ).add_slot('default',
-                                f'<div style="width:{pct}%;height:100%;background:{bar_color};border-radius:9999px;transition:width .4s"></div>'
-                            )
-                        with ui.element('td'):
-                            ui.label(f'{line["actual"]:,} / {line["target"]:,}').classes('text-sm')
-                            ui.label(f'{pct} %').classes('text-xs text-muted')
-                        with ui.element('td'):
-                            ui.label(line['status']).classes(f'badge {line["status_cls"]}')
+        rows = []
+        for line in _LINES:
+            pct = int(line['actual'] / line['target'] * 100) if line['target'] else 0
+            rows.append({**line, 'pct': pct, 'pct_label': f'{pct} %',
+                         'progress': f'{line["actual"]:,} / {line["target"]:,}'})
+        DataTable([
+            {'field': 'name',     'label': 'Line',            'classes': 'font-semi'},
+            {'field': 'product',  'label': 'Product'},
+            {'field': 'shift',    'label': 'Shift'},
+            {'field': 'pct',      'label': 'Progress',        'kind': 'bar', 'width': '160px',
+             'colors': [[0, '#f87171'], [60, '#fbbf24'], [90, '#4ade80']]},
+            {'field': 'progress', 'label': 'Actual / Target', 'classes': 'text-sm', 'sub': 'pct_label', 'sort_by': 'actual'},
+            {'field': 'status',   'label': 'Status',          'kind': 'badge',
+             'badges': {line['status']: line['status_cls'] for line in _LINES}},
+        ], rows)
 
     # ── Throughput chart ──────────────────────────────────────────
     with ui.element('div').classes('card mb-4').style('padding:20px 20px 12px 20px'):
         with ui.row().classes('items-start justify-between mb-1'):
             with ui.column().classes('gap-0'):
-                ui.label('Throughput Today').classes('card-title')
-                ui.label('Units per hour — running lines only').classes('text-xs text-muted mt-1')
-        ui.echart({
-            'tooltip': {'trigger': 'axis', **_TT,
-                        'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#60a5fa'}}},
-            'legend': {'data': ['Line A', 'Line C', 'Line E'], 'top': 0,
-                       'textStyle': {'color': '#71717a', 'fontSize': 12},
+                ui.label('Throughput').classes('card-title')
+                ui.label('Units per hour, sampled every minute — scroll or drag the slider to explore 60 days').classes('text-xs text-muted mt-1')
+        now = time.time()
+        HistoryChart({
+            'tooltip': {'trigger': 'axis', 'axisPointer': {'type': 'cross', 'label': {'backgroundColor': '#60a5fa'}}},
+            'legend': {'data': [name for name, _ in _CHART_LINES], 'top': 0,
                        'itemWidth': 10, 'itemHeight': 10, 'itemGap': 16},
-            'grid': {'left': '2%', 'right': '2%', 'bottom': '2%', 'top': '14%', 'containLabel': True},
-            'xAxis': {'type': 'category', 'data': _THROUGHPUT['hours'], 'boundaryGap': False, **_AX},
-            'yAxis': {**_AX, **_SL, 'type': 'value', 'name': 'units / h',
-                      'axisLabel': {'color': '#71717a', 'fontSize': 11}},
+            'grid': {'left': '2%', 'right': '2%', 'bottom': 40, 'top': '14%'},
+            'xAxis': {'boundaryGap': False},
+            'yAxis': {'type': 'value', 'name': 'units / h'},
             'series': [
-                {'name': 'Line A', 'type': 'line', 'smooth': True,
-                 'data': _THROUGHPUT['line_a'], 'symbol': 'circle', 'symbolSize': 5,
-                 'lineStyle': {'width': 2.5, 'color': '#60a5fa'},
-                 'itemStyle': {'color': '#60a5fa'},
-                 'areaStyle': {'color': '#60a5fa', 'opacity': 0.10}},
-                {'name': 'Line C', 'type': 'line', 'smooth': True,
-                 'data': _THROUGHPUT['line_c'], 'symbol': 'circle', 'symbolSize': 5,
-                 'lineStyle': {'width': 2.5, 'color': '#4ade80'},
-                 'itemStyle': {'color': '#4ade80'},
-                 'areaStyle': {'color': '#4ade80', 'opacity': 0.10}},
-                {'name': 'Line E', 'type': 'line', 'smooth': True,
-                 'data': _THROUGHPUT['line_e'], 'symbol': 'circle', 'symbolSize': 5,
-                 'lineStyle': {'width': 2.5, 'color': '#fbbf24'},
-                 'itemStyle': {'color': '#fbbf24'},
-                 'areaStyle': {'color': '#fbbf24', 'opacity': 0.10}},
+                {'name': name, 'type': 'line', 'symbolSize': 5,
+                 'lineStyle': {'color': color, 'width': 1.5}, 'itemStyle': {'color': color},
+                 'areaStyle': {'color': color, 'opacity': 0.10}}
+                for name, color in _CHART_LINES
             ],
-        }).classes('w-full').style('height:380px')
\ No newline at end of file
+        }, _line_rates, window=(now - data.DAY, now), theme=charts.theme()).classes('w-full').style('height:380px')
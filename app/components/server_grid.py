@@ -0,0 +1,176 @@
+"""Server grid — an AG Grid on the infinite row model that loads blocks of rows from a JSON endpoint as they scroll into view."""
+
+import json
+import threading
+from collections.abc import Callable
+from typing import Protocol
+
+from nicegui import core, ui
+
+# getRows for AG Grid's infinite row model; `%s` is the endpoint URL as a JS string
+_DATASOURCE = '''{
+    getRows(p) {
+        const query = new URLSearchParams({
+            start: p.startRow, end: p.endRow,
+            sort: JSON.stringify(p.sortModel), filter: JSON.stringify(p.filterModel), ...p.context,
+        });
+        fetch(%s + '?' + query)
+            .then((r) => (r.ok ? r.json() : Promise.reject(r.status)))
+            .then((b) => p.successCallback(b.rows, b.last))
+            .catch(() => p.failCallback());
+    },
+}'''
+
+# Installs api.applyRowDelta({update, reload}): changed rows the browser holds are patched in place,
+# unless a change moves them under the current sort or filter; then, as for added and removed
+# rows, the held blocks are fetched again. `%s` is the row id field as a JS string
+_ON_READY = '''(p) => {
+    const id = %s;
+    p.api.applyRowDelta = ({ update, reload }) => {
+        const keys = [...Object.keys(p.api.getFilterModel()),
+                      ...p.api.getColumnState().filter((c) => c.sort).map((c) => c.colId)];
+        for (const row of update) {
+            const node = p.api.getRowNode(String(row[id]));
+            if (!node?.data) continue;
+            if (keys.some((k) => node.data[k] !== row[k])) reload = true;
+            else node.setData(row);
+        }
+        if (reload) p.api.refreshInfiniteCache();
+    };
+}'''
+
+
+# Sets the search parameter and reloads, all in the browser; `{id}` is the grid's element id.
+# Search results come ranked, so a new search drops the column sort (the user may sort again)
+_SEARCH_JS = '''(value) => {{
+    const api = getElement({id})?.api;
+    const q = (value ?? "").trim();
+    const context = api?.getGridOption("context") ?? {{}};
+    if (!api || (context[{param}] ?? "") === q) return;
+    api.setGridOption("context", {{ ...context, [{param}]: q }});
+    if (q) api.applyColumnState({{ defaultState: {{ sort: null }} }});
+    api.purgeInfiniteCache();
+}}'''
+
+# The grid's current query as the datasource sends it: sort model (in sort order), filter model
+# and context parameters; `{id}` is the grid's element id
+_QUERY_JS = '''
+    const api = getElement({id}).api;
+    const sort = api.getColumnState().filter((c) => c.sort)
+        .sort((a, b) => (a.sortIndex ?? 0) - (b.sortIndex ?? 0))
+        .map((c) => ({{ colId: c.colId, sort: c.sort }}));
+    return {{ sort, filter: api.getFilterModel(), ...api.getGridOption("context") }};
+'''
+
+
+class RowSource(Protocol):
+    def watch(self, callback: Callable[[str, list[dict]], None]) -> None: ...
+    def unwatch(self, callback: Callable[[str, list[dict]], None]) -> None: ...
+
+
+class ServerGrid(ui.aggrid):
+
+    def __init__(self, options: dict, url: str, *, block_size: int = 100, blocks: int = 4,
+                 row_id: str = 'id', theme: str | None = None) -> None:
+        """Grid over `GET url?start=&end=&sort=&filter=` → {'rows': [...], 'last': number of rows}.
+
+        `sort` and `filter` are the grid's sortModel and filterModel as JSON, so sorting and
+        filtering happen on the server. The browser holds at most `blocks` blocks of `block_size`
+        rows; rows are identified by their `row_id` field.
+        """
+        super().__init__({
+            **options,
+            'rowModelType': 'infinite',
+            'cacheBlockSize': block_size,
+            'maxBlocksInCache': blocks,
+            'blockLoadDebounceMillis': 50,      # a fast scroll skips the blocks it flies past
+            'context': {},
+            ':datasource': _DATASOURCE % json.dumps(url),
+            ':getRowId': f'(p) => String(p.data[{json.dumps(row_id)}])',
+            ':onGridReady': _ON_READY % json.dumps(row_id),
+        }, theme=theme)
+        self._row_id = row_id
+        self._sources: list[RowSource] = []
+        # Row changes waiting for the next flush; safe to queue from any thread
+        self._updates: dict[str, dict] = {}
+        self._reload = False
+        self._flush_pending = False
+        self._pending_lock = threading.Lock()
+
+    def set_query(self, **params: str) -> None:
+        """Send `params` with every block request from now on, and reload from the first block."""
+        with self._props.suspend_updates():
+            self.options['context'] = params
+        self.run_grid_method('setGridOption', 'context', params)
+        self.run_grid_method('purgeInfiniteCache')
+
+    def search_from(self, field: ui.input, param: str = 'q', debounce: int = 250) -> None:
+        """Send `field`'s text as query parameter `param` once typing pauses for `debounce` ms.
+
+        The grid reloads straight from the browser; the server only sees the block requests.
+        """
+        field.props(f'debounce={debounce}')
+        field.on('update:model-value', js_handler=_SEARCH_JS.format(id=self.id, param=json.dumps(param)))
+
+    async def query(self) -> dict:
+        """What the browser shows right now: {'sort': [...], 'filter': {...}, **search params}.
+
+        The same arguments the block requests carry, e.g. to export exactly the rows on screen.
+        """
+        return await self.client.run_javascript(_QUERY_JS.format(id=self.id))
+
+    def refresh(self) -> None:
+        """Reload the blocks the browser holds, e.g. after rows were added or changed on the server."""
+        self.run_grid_method('refreshInfiniteCache')
+
+    # ── Row deltas ────────────────────────────────────────────────────────────
+    # Transactions by row id, batched per event-loop tick. The infinite row model has no
+    # applyTransaction: updated rows are patched in the browser, added and removed rows shift
+    # every index after them, so those refetch the held blocks instead of travelling themselves.
+
+    def add_rows(self, rows: list[dict]) -> None:
+        self._queue(reload=True)
+
+    def update_rows(self, rows: list[dict]) -> None:
+        self._queue(rows)
+
+    def remove_rows(self, ids: list[str]) -> None:
+        self._queue(reload=True)
+
+    def follow(self, source: RowSource) -> None:
+        """Apply every write to `source` (e.g. services.shipments.ShipmentTable) while this grid exists."""
+        source.watch(self._handle_change)
+        self._sources.append(source)
+
+    def _handle_change(self, kind: str, rows: list[dict]) -> None:
+        if kind == 'update':
+            self.update_rows(rows)
+        elif kind == 'add':
+            self.add_rows(rows)
+        else:
+            self.remove_rows([row[self._row_id] for row in rows])
+
+    def _queue(self, update: list[dict] = (), reload: bool = False) -> None:
+        # Everything queued until the event loop gets to the flush goes out as one message
+        with self._pending_lock:
+            for row in update:
+                self._updates[str(row[self._row_id])] = row
+            self._reload |= reload
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+        core.loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self) -> None:
+        with self._pending_lock:
+            updates, reload = list(self._updates.values()), self._reload
+            self._updates, self._reload, self._flush_pending = {}, False, False
+        if self.is_deleted or not self.client.has_socket_connection:
+            return      # blocks loaded later come from the server's current rows
+        # Held blocks are refetched anyway, so a reload needs no rows
+        self.run_grid_method('applyRowDelta', {'update': [] if reload else updates, 'reload': reload})
+
+    def _handle_delete(self) -> None:
+        for source in self._sources:
+            source.unwatch(self._handle_change)
+        super()._handle_delete()
@@ -1,37 +1,26 @@
-﻿"""Shipping page — AG Grid shipment list with live search, status badges and KPI cards."""
+﻿"""Shipping page — server-side AG Grid shipment list with ranked search, status badges and KPI cards."""
 
+import asyncio
+import json
 import random
-from nicegui import ui
-from services.notifications import notify
-
-_STATUS_HTML = {
-    'Pending':    '<span class="badge badge-warning">Pending</span>',
-    'In Transit': '<span class="badge badge-info">In Transit</span>',
-    'Delivered':  '<span class="badge badge-success">Delivered</span>',
-    'Cancelled':  '<span class="badge badge-danger">Cancelled</span>',
+from datetime import date, timedelta
+
+from nicegui import background_tasks, run, ui
+
+from components.server_grid import ServerGrid
+from services import exports, shipments
+from services.notifications import notify, notify_ongoing
+
+_STATUS_BADGE = {
+    'Pending':    'badge-warning',
+    'In Transit': 'badge-info',
+    'Delivered':  'badge-success',
+    'Cancelled':  'badge-danger',
 }
 
-_CARRIERS  = ['DHL', 'FedEx', 'UPS', 'GLS', 'DPD']
-_CUSTOMERS = ['Acme Corp', 'Beta GmbH', 'Gamma Ltd', 'Delta AG', 'Epsilon BV',
-              'Zeta KG', 'Eta SRL', 'Theta Inc', 'Iota LLC', 'Kappa OY']
-_CITIES    = ['Berlin', 'Hamburg', 'Munich', 'Amsterdam', 'Vienna',
-              'Zurich', 'Brussels', 'Lyon', 'Milan', 'Warsaw']
-
-_ROWS = [
-    {'id': f'SHP-{1000+i}',
-     'customer':    _CUSTOMERS[i % len(_CUSTOMERS)],
-     'destination': _CITIES[i % len(_CITIES)],
-     'carrier':     _CARRIERS[i % len(_CARRIERS)],
-     'status':      s,
-     'eta':         f'2026-03-{(i % 28)+1:02d}',
-     'weight_kg':   round(5 + i * 2.3, 1),
-     'status_html': _STATUS_HTML[s]}
-    for i, s in enumerate(
-        ['In Transit', 'Pending', 'Delivered', 'In Transit', 'Pending',
-         'Delivered', 'Cancelled', 'In Transit', 'Delivered', 'Pending',
-         'In Transit', 'Delivered', 'Pending', 'Cancelled', 'In Transit']
-    )
-]
+# Renders the status text as its badge in the browser, so rows carry only the status
+_STATUS_RENDERER = f'''(p) => p.value
+    ? `<span class="badge ${{{json.dumps(_STATUS_BADGE)}[p.value] || 'badge-default'}}">${{p.value}}</span>` : ""'''
 
 
 def content() -> None:
@@ -45,70 +34,128 @@ def content() -> None:
                   on_click=lambda: _add_row(grid_ref, notify)).props('flat no-caps').classes('button button-primary')
     ui.element('div').classes('divider mb-4')
 
-    # ── KPI row ───────────────────────────────────────────────────
-    counts = {s: sum(1 for r in _ROWS if r['status'] == s) for s in _STATUS_HTML}
+    # ── KPI row — filled in once the shipment table is loaded ────
+    kpi_values = {}
     with ui.row().classes('gap-4 flex-wrap mb-6'):
-        for label, value, sub, color, icon in [
-            ('Total Shipments', str(len(_ROWS)),            'this week',       'text-info',    'local_shipping'),
-            ('In Transit',      str(counts['In Transit']),  'currently active','text-warning',  'moving'),
-            ('Delivered',       str(counts['Delivered']),   'completed',       'text-success',  'check_circle'),
-            ('Pending',         str(counts['Pending']),     'awaiting pickup', 'text-muted',    'schedule'),
-            ('Cancelled',       str(counts['Cancelled']),   'this week',       'text-danger',   'cancel'),
+        for key, label, sub, color, icon in [
+            ('total',      'Total Shipments', 'on record',        'text-info',    'local_shipping'),
+            ('In Transit', 'In Transit',      'currently active', 'text-warning', 'moving'),
+            ('Delivered',  'Delivered',       'completed',        'text-success', 'check_circle'),
+            ('Pending',    'Pending',         'awaiting pickup',  'text-muted',   'schedule'),
+            ('Cancelled',  'Cancelled',       'on record',        'text-danger',  'cancel'),
         ]:
             with ui.element('div').classes('card').style('min-width:150px;flex:1'):
                 with ui.row().classes('items-start justify-between mb-3'):
                     ui.label(label).classes('label-text')
                     ui.icon(icon).style('font-size:1.15rem;color:var(--muted-fg)')
-                ui.label(value).classes(f'text-2xl font-bold {color}')
+                kpi_values[key] = (ui.label().classes('skeleton skeleton-text w-20 mt-2 mb-2'), color)
                 ui.label(sub).classes('text-xs text-muted mt-1')
 
+    async def load() -> None:
+        # The first visit builds the table, so load it in the thread pool
+        table = await run.io_bound(shipments.table)
+        if grid.is_deleted:
+            return
+        grid.follow(table)      # rows written from now on reach the grid as deltas
+        counts = table.status_counts()
+        counts['total'] = sum(counts.values())
+        for key, (label, color) in kpi_values.items():
+            if label.is_deleted:
+                return
+            label.set_text(f'{counts[key]:,}')
+            label.classes(replace=f'text-2xl font-bold {color}')
+        await run.io_bound(table.prepare_search)     # once per process, before the first search
+
+    background_tasks.create(load(), name='shipping kpis')
+
     # ── Toolbar ───────────────────────────────────────────────────
     grid_ref = {}
     with ui.row().classes('w-full items-center gap-3 mb-3 flex-wrap'):
         search = ui.input(placeholder='Search shipments…').classes('flex-1').props('outlined rounded dense clearable')
         search.add_slot('prepend', '<q-icon name="search" />')
-        ui.button('Export', color='white',
-                  on_click=lambda: notify('Export started', type='info', title='Export')).props('flat no-caps').classes('button button-outline button-sm')
+        ui.button('Remove', icon='delete', color='white', on_click=lambda: _remove_selected(grid)) \
+            .props('flat no-caps').classes('button button-outline button-sm')
+        with ui.button('Export', icon='download', color='white').props('flat no-caps').classes('button button-outline button-sm'):
+            with ui.menu().classes('popover').props('anchor="bottom right" self="top right"'):
+                with ui.menu_item('CSV', on_click=lambda: _export(grid, 'csv')):
+                    ui.icon('description').classes('account-icon')
+                with ui.menu_item('Excel', on_click=lambda: _export(grid, 'xlsx')):
+                    ui.icon('table_chart').classes('account-icon')
 
-    # ── AG Grid ───────────────────────────────────────────────────
-    grid = ui.aggrid({
+    # ── AG Grid — rows, sorting and filtering come from /api/shipments ─
+    grid = ServerGrid({
         'columnDefs': [
             {'headerName': 'Shipment ID', 'field': 'id',           'width': 130, 'pinned': 'left'},
             {'headerName': 'Customer',    'field': 'customer',      'filter': 'agTextColumnFilter',   'floatingFilter': True},
             {'headerName': 'Destination', 'field': 'destination',   'filter': 'agTextColumnFilter',   'floatingFilter': True},
             {'headerName': 'Carrier',     'field': 'carrier',       'filter': 'agTextColumnFilter',   'floatingFilter': True, 'width': 110},
-            {'headerName': 'Status',      'field': 'status_html',   'width': 150},
+            {'headerName': 'Status',      'field': 'status',        'width': 150, ':cellRenderer': _STATUS_RENDERER},
             {'headerName': 'ETA',         'field': 'eta',           'width': 120, 'sort': 'asc'},
             {'headerName': 'Weight (kg)', 'field': 'weight_kg',     'width': 130, 'filter': 'agNumberColumnFilter'},
         ],
-        'rowData': _ROWS,
-        'rowSelection': {'mode': 'multiRow'},
-        'domLayout': 'autoHeight',
+        'rowSelection': {'mode': 'multiRow', 'headerCheckbox': False},   # select-all would cover unloaded rows
         'suppressCellFocus': True,
-    }, html_columns=[4]).classes('w-full')
+    }, '/api/shipments').classes('w-full').style('height:560px')
     grid_ref['grid'] = grid
 
-    search.on('update:model-value', lambda e: grid.run_grid_method(
-        'setGridOption', 'quickFilterText', e.args or ''))
+    grid.search_from(search)     # ranked server-side search over id, customer, destination and carrier
+
+
+_EXPORT_COLUMNS = [
+    ('id', 'Shipment ID'), ('customer', 'Customer'), ('destination', 'Destination'), ('carrier', 'Carrier'),
+    ('status', 'Status'), ('eta', 'ETA'), ('weight_kg', 'Weight (kg)'),
+]
 
 
-def _add_row(grid_ref, notify_fn):
-    grid = grid_ref.get('grid')
-    if not grid:
+async def _export(grid: ServerGrid, kind: str) -> None:
+    """Download every row the grid's filters, sort and search select — streamed, not built in memory."""
+    query = await grid.query()
+    try:
+        # table() builds the table on a first visit: in the thread pool, with the view
+        total, rows = await run.io_bound(lambda: shipments.table().rows(query['sort'], query['filter'], query.get('q', '')))
+    except ValueError:
+        notify('The current filter cannot be exported.', type='negative', title='Export')
         return
-    i = len(grid.options['rowData'])
-    s = random.choice(list(_STATUS_HTML))
-    row = {
-        'id':          f'SHP-{2000+i}',
-        'customer':    random.choice(_CUSTOMERS),
-        'destination': random.choice(_CITIES),
-        'carrier':     random.choice(_CARRIERS),
-        'status':      s,
-        'eta':         f'2026-03-{random.randint(1, 28):02d}',
-        'weight_kg':   round(random.uniform(2, 50), 1),
-        'status_html': _STATUS_HTML[s],
-    }
-    grid.options['rowData'].append(row)
-    grid.run_grid_method('ensureIndexVisible', i)
-    grid.update()
+    job = exports.start(rows, total, _EXPORT_COLUMNS, name='shipments', kind=kind)
+    handle = notify_ongoing(f'Preparing {total:,} rows…', title='Export')
+    ui.download.from_url(job.url)
+    while not job.finished and not job.expired and not grid.is_deleted:
+        await asyncio.sleep(0.5)
+        if job.started:
+            handle.update(f'{job.done:,} of {total:,} rows')
+    if grid.is_deleted:
+        return
+    handle.dismiss()
+    if job.finished and job.done == total:
+        notify(f'{total:,} shipments exported to {job.filename}', type='positive', title='Export')
+    else:
+        notify('The download did not complete.', type='warning', title='Export')
+
+
+async def _remove_selected(grid: ServerGrid) -> None:
+    ids = [row['id'] for row in await grid.get_selected_rows()]
+    if not ids:
+        notify('Select the shipments to remove first.', type='info', title='Remove')
+        return
+    table = await run.io_bound(shipments.table)
+    try:
+        table.remove(ids)       # open grids drop the rows through their deltas
+    except KeyError as e:
+        notify(f'{e.args[0]} was already removed.', type='warning', title='Remove')
+        return
+    notify(f'Removed {len(ids):,} shipment{"s" if len(ids) > 1 else ""}', type='positive', title='Remove')
+
+
+async def _add_row(grid_ref, notify_fn):
+    if not grid_ref.get('grid'):
+        return
+    table = await run.io_bound(shipments.table)     # built in the thread pool if the page's load() has not yet
+    row = table.add(
+        customer=random.choice(shipments.CUSTOMERS),
+        destination=random.choice(shipments.CITIES),
+        carrier=random.choice(shipments.CARRIERS),
+        status=random.choice(shipments.STATUSES),
+        eta=(date.today() + timedelta(days=random.randint(1, 14))).isoformat(),
+        weight_kg=round(random.uniform(2, 50), 1),
+    )
     notify_fn(f'Added {row["id"]}', type='positive', title='Shipment added')
@@ -1,24 +1,21 @@
 """Application entry point — page routing, shared layout decorator and run targets."""
 
 import json
+import logging
 import os
 from functools import wraps
-from pathlib import Path
 
-from nicegui import app, ui
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from nicegui import app, run, ui
 
 import header
-import components.dashboard_content
-import components.design_system_content
-import components.shipping_content
-import components.production_content
-import components.orders_content
-import components.pallets_content
-import components.packings_content
-import components.icons_content
-import components.settings_content
-import components.print_component
-import components.print_demo_content
+from services import assets, db, exports, icon_subset, metrics, pages, shipments, tracing
+from services.navigation import NavItem, Navigation
+from services.pages import LazyPage
+
+logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logging.getLogger('services').setLevel(logging.INFO)
 
 # ── Config ────────────────────────────────────────────────────────────────────────────────
 with open('config.json') as f:
@@ -27,9 +24,29 @@ with open('config.json') as f:
 appName    = config["appName"]
 appVersion = config["appVersion"]
 appPort    = config["appPort"]
+warmUp     = config.get("warmUp", [])
+traceFile  = config.get("traceFile")
+database   = config.get("database", "data/app.db")
 
 app.add_static_files('/assets', 'assets')
 
+# ── Database — SQLite in WAL mode, writes committed behind the pages (services/db.py) ──
+# Before any page module loads: they read their stored rows at import
+db.configure(database)
+app.on_shutdown(db.close)
+
+# ── Static assets — minified, hashed and precompressed once; linked for every page ──
+# Pages only get the Tabler icons they use; /icons links the full icons.css itself
+with pages.timed('asset pipeline'):
+    assets.build()
+with pages.timed('icon subset'):
+    icon_subset.build()
+ui.add_head_html(
+    assets.stylesheet('css/global-css.css') + assets.stylesheet(icon_subset.CSS_SOURCE)
+    + assets.preload_font('css/fonts/inter-600.woff2'),
+    shared=True,
+)
+
 # ── Logo singleton — one instance shared across requests to avoid reload cost ──────
 logo_image = None
 
@@ -41,87 +58,111 @@ def get_logo_image():
 
 
 # ── Base layout decorator — applies theme, global CSS and sidebar shell ────────────
+# Every full page load is traced: head, frame and the sub-page content build (see services/tracing.py)
 def with_base_layout(route_handler):
     @wraps(route_handler)
     def wrapper(*args, **kwargs):
-        ui.colors(primary='#18181b', secondary='#f4f4f5', positive='#4caf50', negative='#ef4444', warning='#f59e0b', info='#3b82f6', accent='#e4e4e7')
-        ui.add_head_html("<style>" + open(Path(__file__).parent / "assets" / "css" / "global-css.css").read() + "</style>", shared=True)
-        ui.add_head_html('<link rel="stylesheet" href="/assets/css/icons.css">', shared=True)
-        
-        # Preload avoids a layout-shift flash when the sidebar logo first renders
-        ui.add_head_html('<link rel="preload" href="/assets/images/logo.png" as="image">')
-
-        if 'sidebar-collapsed' not in app.storage.user:
-            app.storage.user['sidebar-collapsed'] = True
-
-        with header.frame(title=appName, version=appVersion,  get_logo_func=get_logo_image):
-            return route_handler(*args, **kwargs)
-    return wrapper
-
-# ── Page and sub-page routing ────────────────────────────────────────────────────────────
-@ui.page('/')
-@with_base_layout
-def root():
-    ui.sub_pages({
-    '/': index,
-    '/design-system': design_system,
-    '/shipping': shipping,
-    '/production': production,
-    '/production/{searchFilter}' : production_search,
-    '/orders' : orders,
-    '/pallets' : pallets,
-    '/packing' : packing,
-    '/icons'      : icons,
-    '/print-demo' : print_demo,
-    '/settings'   : settings,
-    '/customer/{kundennummer}': customer_page,
-    })
-
-
+        with tracing.render() as trace:
+            with trace.phase('head'):
+                ui.colors(primary='#18181b', secondary='#f4f4f5', positive='#4caf50', negative='#ef4444', warning='#f59e0b', info='#3b82f6', accent='#e4e4e7')
 
-# ── Sub-page handlers ────────────────────────────────────────────────────────────
-def index():
-    components.dashboard_content.content()
+                # Preload avoids a layout-shift flash when the sidebar logo first renders
+                ui.add_head_html('<link rel="preload" href="/assets/images/logo.png" as="image">')
 
-def design_system():
-    components.design_system_content.content()
+                metrics.watch_client(ui.context.client, NAV.route)
 
-def shipping():
-    components.shipping_content.content()
+                if 'sidebar-collapsed' not in app.storage.user:
+                    app.storage.user['sidebar-collapsed'] = True
 
-def production():
-    components.production_content.content(searchFilter='')
-
-def orders():
-    components.orders_content.content()
-
-def pallets():
-    components.pallets_content.content()
-
-def packing():
-    components.packings_content.content()
-
-def icons():
-    components.icons_content.content()
-
-def print_demo():
-    components.print_demo_content.content()
+            with trace.phase('frame'), header.frame(title=appName, version=appVersion, nav=NAV, get_logo_func=get_logo_image):
+                return route_handler(*args, **kwargs)
+    return wrapper
 
-def settings():
-    components.settings_content.content()
+# ── Page and sub-page routing ────────────────────────────────────────────────────────────
+# One table drives both the sub-page routes and the sidebar; entries without a label are routes only.
+# Page modules are imported on first visit; list routes under "warmUp" in config.json to load them at boot
+NAV = Navigation([
+    NavItem('/',                          LazyPage('components.dashboard_content'),                   label='Dashboard',     icon='dashboard'),
+    NavItem('/shipping',                  LazyPage('components.shipping_content'),                    label='Shipping',      icon='local_shipping', also=['/customer']),
+    NavItem('/production',                LazyPage('components.production_content', searchFilter=''), label='Production',    icon='precision_manufacturing'),
+    NavItem('/orders',                    LazyPage('components.orders_content'),                      label='Orders',        icon='fact_check'),
+    NavItem('/pallets',                   LazyPage('components.pallets_content'),                     label='Pallets',       icon='pallet'),
+    NavItem('/packing',                   LazyPage('components.packings_content'),                    label='Packing',       icon='inventory_2'),
+    NavItem('/print-demo',                LazyPage('components.print_demo_content'),                  label='Print Demo',    icon='print'),
+    NavItem('/icons',                     LazyPage('components.icons_content'),                       label='Icons',         icon='grid_view', separator=True),
+    NavItem('/design-system',             LazyPage('components.design_system_content'),               label='Design System', icon='palette'),
+    NavItem('/production/{searchFilter}', LazyPage('components.production_content')),
+    NavItem('/settings',                  LazyPage('components.settings_content')),
+    NavItem('/customer/{kundennummer}',   LazyPage('components.data_content')),
+])
+
+PRINT_PAGE = LazyPage('components.print_component')
+
+# Sub-page builders as mounted — each build is timed per route pattern
+ROUTES = tracing.traced_routes(NAV.routes)
+tracing.configure(traceFile)
+
+pages.warm_up(NAV.routes, warmUp)
+pages.log_report()
 
-def production_search(searchFilter):
-    components.production_content.content(searchFilter=searchFilter)
 
-def customer_page(kundennummer):
-    components.data_content.content(kundennummer)
+@ui.page('/')
+@with_base_layout
+def root():
+    ui.sub_pages(ROUTES)
+
+
+# Runtime counters for Prometheus — clients, elements and websocket traffic per sub-page
+metrics.install()
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Render latency per route and phase — p50/p95/p99 in ms
+@app.get('/metrics/render', include_in_schema=False)
+async def render_metrics_endpoint():
+    return tracing.stats()
+
+
+# Shipping grid rows — one block of the sorted, filtered view per request (components/server_grid.py)
+@app.get('/api/shipments', include_in_schema=False)
+async def shipments_endpoint(start: int = 0, end: int = 100, sort: str = '[]', filter: str = '{}', q: str = ''):
+    def query() -> dict:
+        return shipments.table().block(start, min(end, start + 1000), json.loads(sort), json.loads(filter), q)
+    try:
+        return await run.io_bound(query)
+    except ValueError as e:     # malformed JSON or an unsupported filter
+        raise HTTPException(400, str(e)) from e
+
+# Carrier status updates — a burst of [{'id': 'SHP-…', 'status': …}, …] is one write, one delta per open grid
+@app.post('/api/shipments/status', include_in_schema=False)
+async def shipment_status_endpoint(changes: list[dict]):
+    if any(c.get('status') not in shipments.STATUSES or not isinstance(c.get('id'), str) for c in changes):
+        raise HTTPException(400, f'each change needs an id and a status out of {shipments.STATUSES}')
+
+    def update() -> int:
+        return len(shipments.table().update([{'id': c['id'], 'status': c['status']} for c in changes]))
+    try:
+        return {'updated': await run.io_bound(update)}
+    except KeyError as e:     # a JSON 404; an HTTPException(404) would render the not-found page
+        return JSONResponse({'detail': f'unknown shipment {e}'}, status_code=404)
+
+# Export downloads — one-time links handed out by services.exports.start(), streamed as they are written
+@app.get('/api/export/{token}', include_in_schema=False)
+async def export_endpoint(token: str):
+    job = exports.take(token)
+    if job is None:
+        return JSONResponse({'detail': 'export link expired or already used'}, status_code=404)
+    return StreamingResponse(job.stream(), media_type=job.media_type,
+                             headers={'Content-Disposition': f'attachment; filename="{job.filename}"'})
 
 
 # Standalone print route — no sidebar, no header, no layout wrapper
 @ui.page('/print/{data}')
 def print_standalone(data: str):
-    ui.add_head_html("<style>" + open(Path(__file__).parent / "assets" / "css" / "global-css.css").read() + "</style>")
-    components.print_component.content(data)
+    metrics.watch_client(ui.context.client, lambda path: '/print/{data}')
+    PRINT_PAGE.load()(data)
 
 
 # ── Entry point — uncomment exactly one target ────────────────────────────────
@@ -130,4 +171,4 @@ ui.run(root, storage_secret="myStorageSecret", title=appName, port=appPort, favi
 # ui.run(root, storage_secret="myStorageSecret", title=appName, port=appPort, favicon='ico.ico', reload=False, native=True, window_size=(1600, 900))                # native
 # ui.run(root, storage_secret=os.environ['STORAGE_SECRET'], host=os.environ['HOST'], title=appName, port=appPort, favicon='ico.ico', reconnect_timeout=20, reload=False)  # docker
 
-# python -m PyInstaller --name 'ProductionSuite' --onedir main.py --add-data '...\nicegui;nicegui' --noconfirm --clean
\ No newline at end of file
+# python -m PyInstaller --name 'ProductionSuite' --onedir main.py --add-data '...\nicegui;nicegui' --collect-submodules components --noconfirm --clean
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Static asset pipeline — minifies, fingerprints and precompresses stylesheets and fonts once
+at startup and serves them from memory under content-hashed URLs.
+Usage:
+    from services import assets
+    assets.build()
+    ui.add_head_html(assets.stylesheet('css/global-css.css'), shared=True)
+
+Hashed URLs never change content, so responses carry `Cache-Control: immutable` plus an
+ETag for revalidation.  Brotli is used when the optional `brotli` package is installed.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+
+from fastapi import Request, Response
+from nicegui import app
+
+try:
+    import brotli
+except ImportError:  # optional — gzip alone is still served
+    brotli = None
+
+URL_PREFIX = '/dist'
+
+_ROOT = Path(__file__).parent.parent / 'assets'
+
+# Stylesheets built by build(), relative to assets/
+STYLESHEETS: list[str] = ['css/global-css.css', 'css/icons.css']
+
+_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Only precompress text formats — woff / woff2 are already compressed, and the ttf / eot
+# fallbacks are never fetched by current browsers but would cost seconds of brotli at startup
+_COMPRESSIBLE = {'.css', '.js', '.svg', '.json'}
+
+_URL_RE     = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_COMMENT_RE = re.compile(r'/\*(?!!).*?\*/', re.S)   # keeps /*! license */ banners
+
+
+class _Asset:
+    __slots__ = ('media_type', 'etag', 'body', 'gzip', 'br')
+
+    def __init__(self, media_type: str, etag: str, body: bytes, gz: bytes | None, br: bytes | None) -> None:
+        self.media_type = media_type
+        self.etag = etag
+        self.body = body
+        self.gzip = gz
+        self.br = br
+
+
+_FILES: dict[str, _Asset] = {}   # hashed file name → asset
+_URLS:  dict[str, str]    = {}   # source path (relative to assets/) → hashed URL
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def build() -> None:
+    """Fingerprint every font, then the stylesheets that reference them."""
+    for path in sorted((_ROOT / 'css' / 'fonts').iterdir()):
+        if path.is_file():
+            add(path.relative_to(_ROOT).as_posix(), path.read_bytes())
+    for source in STYLESHEETS:
+        add_css(source, (_ROOT / source).read_text(encoding='utf-8'))
+
+
+def add(source: str, body: bytes) -> str:
+    """Register raw bytes under a source path (relative to assets/) and return the hashed URL."""
+    suffix = Path(source).suffix
+    digest = hashlib.sha256(body).hexdigest()
+    name   = f'{Path(source).stem}.{digest[:12]}{suffix}'
+    media_type = mimetypes.guess_type(source)[0] or 'application/octet-stream'
+    gz = br = None
+    if suffix in _COMPRESSIBLE:
+        gz = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            br = brotli.compress(body, quality=11)
+    _FILES[name] = _Asset(media_type, f'"{digest[:32]}"', body, gz, br)
+    _URLS[source] = f'{URL_PREFIX}/{name}'
+    return _URLS[source]
+
+
+def add_css(source: str, text: str) -> str:
+    """Rewrite url() references to hashed URLs, minify and register a stylesheet."""
+    return add(source, _minify_css(_rewrite_urls(text, source)).encode('utf-8'))
+
+
+def _rewrite_urls(text: str, source: str) -> str:
+    base = Path(source).parent
+
+    def repl(m: re.Match) -> str:
+        ref = m.group(2)
+        if ref.startswith(('data:', 'http:', 'https:', '//')):
+            return m.group(0)
+        path = ref.split('?', 1)[0].split('#', 1)[0]
+        if path.startswith('/assets/'):
+            key = path[len('/assets/'):]
+        else:
+            key = (base / path).as_posix()
+            key = '/'.join(_normalize(key.split('/')))
+        return f'url("{_URLS[key]}")' if key in _URLS else m.group(0)
+
+    return _URL_RE.sub(repl, text)
+
+
+def _normalize(parts: list[str]) -> list[str]:
+    out: list[str] = []
+    for part in parts:
+        if part == '..':
+            if out:
+                out.pop()
+        elif part not in ('', '.'):
+            out.append(part)
+    return out
+
+
+def _minify_css(text: str) -> str:
+    text = _COMMENT_RE.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+# ── Lookup ────────────────────────────────────────────────────────────────────
+
+def url(source: str) -> str:
+    """Hashed URL of a built asset; falls back to the plain /assets path."""
+    return _URLS.get(source, f'/assets/{source}')
+
+
+def stylesheet(source: str) -> str:
+    return f'<link rel="stylesheet" href="{url(source)}">'
+
+
+def preload_font(source: str) -> str:
+    return f'<link rel="preload" href="{url(source)}" as="font" type="font/woff2" crossorigin>'
+
+
+# ── Serving ───────────────────────────────────────────────────────────────────
+
+@app.get(URL_PREFIX + '/{name}')
+def _serve(name: str, request: Request) -> Response:
+    asset = _FILES.get(name)
+    if asset is None:
+        return Response(status_code=404)
+
+    headers = {'Cache-Control': _CACHE_CONTROL, 'ETag': asset.etag, 'Vary': 'Accept-Encoding'}
+    if_none_match = request.headers.get('if-none-match', '')
+    if asset.etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+
+    accept = request.headers.get('accept-encoding', '')
+    body = asset.body
+    if asset.br is not None and 'br' in accept:
+        body, headers['Content-Encoding'] = asset.br, 'br'
+    elif asset.gzip is not None and 'gzip' in accept:
+        body, headers['Content-Encoding'] = asset.gzip, 'gzip'
+    return Response(body, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,181 @@
+"""
+Provider cache — per-function TTL cache with single-flight coalescing and optional
+stale-while-revalidate, for data providers that sit in front of a database or API.
+Usage:
+    from services.cache import cached, stats
+    @cached(ttl=10, stale=20)
+    def get_kpis() -> dict: ...
+
+    get_kpis()              # first caller queries; concurrent callers wait for that same query
+    get_kpis.invalidate()   # drop all entries, e.g. after a write; queries running now are not stored
+    stats()                 # → {'services.dashboard_data.get_kpis': {'hits': ..., ...}}
+
+    @cached(ttl=30)
+    async def get_orders() -> list: ...     # coroutines are cached the same way and stay awaitable
+
+Within `ttl` seconds a value is served from memory. Up to `stale` seconds after that it is
+still served while one background refresh runs. Later calls query again, and only one call per
+key runs at a time: the others block on its result (or await it, for coroutines).
+Cached values are shared between all callers — treat them as read-only.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+
+from nicegui import background_tasks
+
+log = logging.getLogger(__name__)
+
+# Background refreshes for stale entries; providers are I/O bound, two threads are plenty
+_REVALIDATOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-revalidate')
+
+# qualified provider name → cache, for stats()
+_CACHES: dict[str, '_ProviderCache'] = {}
+
+
+class _ProviderCache:
+
+    def __init__(self, func: Callable, ttl: float, stale: float, maxsize: int) -> None:
+        self.func = func
+        self.ttl = ttl
+        self.stale = stale
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()   # key → (fetched at, value)
+        self._flights: dict[tuple, Future] = {}
+        self._generation = 0        # bumped by invalidate(); results of older queries are not stored
+        self._lock = threading.Lock()
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.counts = {'hits': 0, 'stale': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+
+    def get(self, args: tuple, kwargs: dict):
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args,)
+        state, found = self._claim(key, args, kwargs)
+        if state == 'hit':
+            return found
+        if state == 'wait':
+            return found.result()
+        return self._fetch(key, found, args, kwargs)
+
+    async def aget(self, args: tuple, kwargs: dict):
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args,)
+        state, found = self._claim(key, args, kwargs)
+        if state == 'hit':
+            return found
+        if state == 'wait':
+            return await asyncio.wrap_future(found)
+        return await self._afetch(key, found, args, kwargs)
+
+    def _claim(self, key: tuple, args: tuple, kwargs: dict) -> tuple[str, object]:
+        """('hit', value), ('wait', Future of the running query) or ('fetch', (its Future, generation)) — the caller queries."""
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[0] if entry else None
+            if age is not None and age < self.ttl:
+                self._entries.move_to_end(key)
+                self.counts['hits'] += 1
+                return 'hit', entry[1]
+            if age is not None and age < self.ttl + self.stale:
+                self.counts['stale'] += 1
+                if key not in self._flights:
+                    flight = self._flights[key] = (Future(), self._generation)
+                    if self.is_async:
+                        background_tasks.create(self._arevalidate(key, flight, args, kwargs), name=f'revalidate {self.func.__qualname__}')
+                    else:
+                        _REVALIDATOR.submit(self._revalidate, key, flight, args, kwargs)
+                return 'hit', entry[1]
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.counts['coalesced'] += 1
+                return 'wait', flight[0]
+            self._flights[key] = flight = (Future(), self._generation)
+            self.counts['misses'] += 1
+            return 'fetch', flight
+
+    def _fetch(self, key: tuple, flight: tuple[Future, int], args: tuple, kwargs: dict):
+        try:
+            value = self.func(*args, **kwargs)
+        except Exception as e:
+            self._fail(key, flight, e)
+            raise
+        return self._store(key, flight, value)
+
+    async def _afetch(self, key: tuple, flight: tuple[Future, int], args: tuple, kwargs: dict):
+        try:
+            value = await self.func(*args, **kwargs)
+        except Exception as e:
+            self._fail(key, flight, e)
+            raise
+        return self._store(key, flight, value)
+
+    def _store(self, key: tuple, flight: tuple[Future, int], value):
+        future, generation = flight
+        with self._lock:
+            # A query that began before invalidate() answers its own callers but is not kept
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        future.set_result(value)
+        return value
+
+    def _fail(self, key: tuple, flight: tuple[Future, int], error: Exception) -> None:
+        with self._lock:
+            self.counts['errors'] += 1
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight[0].set_exception(error)
+
+    def _revalidate(self, key: tuple, flight: tuple[Future, int], args: tuple, kwargs: dict) -> None:
+        try:
+            self._fetch(key, flight, args, kwargs)
+        except Exception:
+            # The stale value keeps being served until the stale window runs out
+            log.exception('background refresh of %s failed', self.func.__qualname__)
+
+    async def _arevalidate(self, key: tuple, flight: tuple[Future, int], args: tuple, kwargs: dict) -> None:
+        try:
+            await self._afetch(key, flight, args, kwargs)
+        except Exception:
+            log.exception('background refresh of %s failed', self.func.__qualname__)
+
+    def invalidate(self) -> None:
+        """Drop every entry; queries running now still answer their callers, later calls query afresh."""
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+            self._generation += 1
+
+
+def cached(ttl: float, *, stale: float = 0.0, maxsize: int = 32) -> Callable:
+    """Cache a provider's results per argument tuple for `ttl` seconds (see module docstring)."""
+    def decorator(func: Callable) -> Callable:
+        cache = _ProviderCache(func, ttl, stale, maxsize)
+        _CACHES[f'{func.__module__}.{func.__qualname__}'] = cache
+
+        if cache.is_async:
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await cache.aget(args, kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return cache.get(args, kwargs)
+
+        wrapper.invalidate = cache.invalidate
+        return wrapper
+    return decorator
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Hit / stale / miss / coalesced / error counts and current size per provider."""
+    return {name: {**c.counts, 'size': len(c._entries)} for name, c in _CACHES.items()}
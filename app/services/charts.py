@@ -0,0 +1,165 @@
+"""
+ECharts helpers — the shared design-system theme and incremental chart updates.
+Usage:
+    from services import charts
+    ui.echart({'xAxis': {'type': 'category', 'data': days}, 'yAxis': {'type': 'value'},
+               'series': [{'type': 'line', 'data': values}]}, theme=charts.theme())
+
+    patch = {'xAxis': {'data': days}, 'series': [{'data': revenue}, {'data': forecast}]}
+    options, roll = charts.delta(charts.project(chart.options, patch), patch)
+    # options — partial ECharts options with only the series that changed (None if nothing did)
+    # roll    — {'shift': k, 'xAxis': [...], 'series': {i: [...]}}: drop k points, append the tail
+
+    charts.diff_snapshot(old, new)   # same for a whole services.feeds snapshot
+
+theme() serves THEME once as a hashed, immutable asset, so each browser downloads it once and
+chart options only carry data and per-chart overrides.
+
+A chart patch holds data only: any option keys, with `series` matched by index as in
+ECharts' setOption. Styling never travels with an update. When the category axis moved by
+k points and a series moved with it (a rolling 24 h or 30 day window), only the k new points
+are sent for that series.
+"""
+
+import json
+
+from services import assets
+
+# ── Theme ─────────────────────────────────────────────────────────────────────
+
+_TEXT       = '#09090b'
+_MUTED      = '#71717a'
+_BORDER     = '#e4e4e7'
+_GRID_LINE  = '#f4f4f5'
+
+THEME = {
+    'color': ['#60a5fa', '#4ade80', '#fbbf24', '#f87171', '#a1a1aa', '#38bdf8', '#fb7185', '#64748b'],
+    'tooltip': {'backgroundColor': '#fff', 'borderColor': _BORDER, 'textStyle': {'color': _TEXT, 'fontSize': 12}},
+    'legend': {'textStyle': {'color': _MUTED, 'fontSize': 12}},
+    'grid': {'left': '3%', 'right': '3%', 'bottom': '3%', 'top': '12%', 'containLabel': True},
+    'categoryAxis': {
+        'axisLine': {'lineStyle': {'color': _BORDER}},
+        'axisTick': {'show': False},
+        'axisLabel': {'color': _MUTED, 'fontSize': 11},
+    },
+    'valueAxis': {
+        'axisLabel': {'color': _MUTED, 'fontSize': 11},
+        'splitLine': {'lineStyle': {'color': _GRID_LINE, 'type': 'dashed'}},
+    },
+    'line': {'symbol': 'circle', 'symbolSize': 6, 'lineStyle': {'width': 2.5}},
+    'bar': {'barMaxWidth': 32, 'itemStyle': {'borderRadius': [4, 4, 0, 0]}},
+    'pie': {
+        'avoidLabelOverlap': False,
+        'label': {'show': False},
+        'labelLine': {'show': False},
+        'emphasis': {'label': {'show': True, 'fontSize': 13, 'fontWeight': 'bold', 'color': _TEXT}},
+    },
+}
+
+_theme_url: str | None = None
+
+
+def theme() -> str:
+    """URL of THEME for `ui.echart(..., theme=...)`."""
+    global _theme_url
+    if _theme_url is None:
+        body = json.dumps(THEME, separators=(',', ':')).encode('utf-8')
+        _theme_url = assets.add('charts/theme.json', body)
+    return _theme_url
+
+
+# ── Chart patches ─────────────────────────────────────────────────────────────
+
+def project(options: dict, patch: dict) -> dict:
+    """Pick from `options` the values at the keys `patch` sets, in the same shape."""
+    out = {}
+    for key, value in patch.items():
+        current = options.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            out[key] = project(current, value)
+        elif key == 'series' and isinstance(current, list):
+            out[key] = [project(c, v) if isinstance(c, dict) else {} for c, v in zip(current, value)]
+        else:
+            out[key] = current
+    return out
+
+
+def delta(old: dict | None, new: dict) -> tuple[dict | None, dict | None]:
+    """Return (partial options, roll) that turn chart patch `old` into `new`; see module docstring."""
+    if not old:
+        return new, None
+    x_old = old.get('xAxis', {}).get('data')
+    x_new = new.get('xAxis', {}).get('data')
+    shift = _shift(x_old, x_new) if x_old != x_new else 0
+
+    options: dict = {}
+    for key, value in new.items():
+        if key not in ('xAxis', 'series') and old.get(key) != value:
+            options[key] = value
+    if x_old != x_new and not shift:
+        options['xAxis'] = {'data': x_new}
+
+    old_series = old.get('series', [])
+    new_series = new.get('series', [])
+    series_patch: list[dict] = []
+    rolled: dict[str, list] = {}   # series index (as JSON key) → appended points
+    for i, s in enumerate(new_series):
+        data = s.get('data')
+        prev = old_series[i].get('data') if i < len(old_series) else None
+        if shift and _rolls(prev, data, shift):
+            rolled[str(i)] = data[len(data) - shift:]
+            series_patch.append({})
+        elif prev != data or shift:
+            series_patch.append({'data': data})
+        else:
+            series_patch.append({})
+    if any(series_patch):
+        options['series'] = series_patch
+
+    roll = None
+    if shift:
+        roll = {'shift': shift, 'xAxis': x_new[len(x_new) - shift:], 'series': rolled}
+    return options or None, roll
+
+
+def _shift(old: list | None, new: list | None) -> int:
+    """Smallest k with old[k:] == new[:-k] for equal-length windows, else 0."""
+    if not old or not new or len(old) != len(new):
+        return 0
+    n = len(new)
+    first = new[0]
+    for k in range(1, n):
+        if old[k] == first and old[k:] == new[:n - k]:
+            return k
+    return 0
+
+
+def _rolls(old: list | None, new: list | None, shift: int) -> bool:
+    return (old is not None and new is not None and len(old) == len(new)
+            and old[shift:] == new[:len(new) - shift])
+
+
+# ── Snapshots ─────────────────────────────────────────────────────────────────
+
+def diff_snapshot(old: dict | None, new: dict) -> dict:
+    """Reduce a feed snapshot to what changed since `old`; charts may gain a 'rolls' section."""
+    if old is None:
+        return new
+    out: dict = {}
+    for section in ('text', 'classes'):
+        before = old.get(section, {})
+        changed = {name: value for name, value in new.get(section, {}).items() if before.get(name) != value}
+        if changed:
+            out[section] = changed
+    options_out, rolls_out = {}, {}
+    for name, patch in new.get('charts', {}).items():
+        options, roll = delta(old.get('charts', {}).get(name), patch)
+        if options:
+            options_out[name] = options
+        if roll:
+            rolls_out[name] = roll
+    if options_out:
+        out['charts'] = options_out
+    if rolls_out:
+        out['rolls'] = rolls_out
+    return out
@@ -1,18 +1,208 @@
 """
-Dashboard data service — generates realistic mock metrics and chart data.
+Dashboard data service — mock metrics and chart data behind async, cached providers.
 Swap the return values here for real DB / API calls without touching the UI.
+Usage:
+    import services.dashboard_data as data
+    kpis = await data.get_kpis()                    # cached (services/cache.py); runs in the I/O thread pool
+    page = await data.get_orders(50, cursor)        # the order history by cursor (services/orders.py)
+    data.create_order('Acme Corp', 'Gear Box', 3)   # blocking: call through run.io_bound
 """
 
+import math
 import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
+from functools import wraps
+
+from nicegui import run
+
+from services import db, tracing
+from services.cache import cached
+from services.orders import OrderRepository
+from services.rollups import RollupCube
+from services.timeseries import TimeSeriesStore, downsample
+
+MINUTE = 60
+HOUR = 3600
+DAY  = 86400
+
+LINES = ['Line A', 'Line B', 'Line C', 'Line D', 'Line E']
+
+STORE = TimeSeriesStore()
+for _line in LINES:
+    STORE.register('throughput', step=HOUR, capacity=7 * 24, line=_line)   # % of target, one week
+    STORE.register('rate', step=MINUTE, capacity=60 * 24 * 60, line=_line)    # units / h, sixty days
+STORE.register('revenue', step=DAY, capacity=365)                          # € per day, one year
+
+# Nominal units per hour of each line, for the mock rate sampler
+_RATE_BASE = {'Line A': 58, 'Line B': 40, 'Line C': 50, 'Line D': 35, 'Line E': 70}
+
+STATUSES  = ['Open', 'Processing', 'Fulfilled', 'Cancelled', 'On Hold']
+CUSTOMERS = ['Acme Corp', 'Beta GmbH', 'Gamma Ltd', 'Delta AG', 'Epsilon BV', 'Zeta KG']
+PRODUCTS  = ['Gear Box', 'Sensor Kit', 'Control Unit', 'Panel Module', 'Cable Harness', 'Widget A', 'Motor Drive']
+UNIT_PRICE = 137.5
+
+ORDERS = RollupCube(('status', 'customer', 'product'))     # count and € per bucket
+ORDER_BOOK = OrderRepository()                             # every order, for order lists
+
+
+def _in_thread(func: Callable) -> Callable[..., Awaitable]:
+    """Turn a blocking provider body into a coroutine that runs it in the I/O thread pool."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run.io_bound(func, *args, **kwargs)
+    return wrapper
+
+
+# ── Mock sampler — stands in for the line PLCs / ERP feeding the store ─────────
+
+def _sample_up_to_now() -> None:
+    now = time.time()
+    for line in LINES:
+        buf = STORE.buffer('throughput', line)
+        first = now - (buf.capacity - 1) * HOUR if buf.last_slot is None else (buf.last_slot + 1) * HOUR
+        for ts in range(int(first), int(now) + 1, HOUR):
+            STORE.append('throughput', round(random.uniform(70, 98), 1), ts, line)
+    buf = STORE.buffer('revenue')
+    first = now - 59 * DAY if buf.last_slot is None else (buf.last_slot + 1) * DAY
+    for ts in range(int(first), int(now) + 1, DAY):
+        STORE.append('revenue', round(random.uniform(1200, 3800), 0), ts)
+
+
+def _sample_rates_up_to_now() -> None:
+    now = int(time.time()) // MINUTE * MINUTE
+    for line in LINES:
+        buf = STORE.buffer('rate', line)
+        first = now - (buf.capacity - 1) * MINUTE if buf.last_slot is None else (buf.last_slot + 1) * MINUTE
+        if first > now:
+            continue
+        base = _RATE_BASE[line]
+        # Slower at night, a dip at every shift change, noise on top
+        samples = []
+        for ts in range(first, now + 1, MINUTE):
+            day = (ts % DAY) / DAY
+            shift = 0.8 if (ts % (8 * HOUR)) < 15 * MINUTE else 1.0
+            rate = base * (0.85 + 0.15 * math.sin(2 * math.pi * (day - 0.25))) * shift
+            samples.append(round(max(rate + random.gauss(0, base * 0.05), 0.0), 1))
+        STORE.extend('rate', samples, first, line)
+
+
+# Mock order stream — orders arrive over the day and move Open → Processing → a final status.
+# Orders not final yet, with the times their status changes
+_in_flight: list[dict] = []
+_orders_until: float | None = None
+_orders_lock = threading.Lock()
+
+_ORDER_COLUMNS = ('id', 'ts', 'customer', 'product', 'qty', 'amount', 'status')
+_INSERT_ORDER = f'INSERT INTO orders ({", ".join(_ORDER_COLUMNS)}) VALUES ({", ".join("?" * len(_ORDER_COLUMNS))})'
+_FINAL = ('Fulfilled', 'Cancelled', 'On Hold')
+
+
+def _sample_orders_up_to_now() -> None:
+    global _orders_until
+    with _orders_lock:
+        now = time.time()
+        if _orders_until is None:
+            _orders_until = _load_orders(now)
+        t = now - 60 * DAY if _orders_until is None else _orders_until
+        while t < now:
+            t_next = min(t - t % HOUR + HOUR, now)
+            hour = datetime.fromtimestamp(t).hour
+            expected = (16 if 7 <= hour < 19 else 3) * random.uniform(0.6, 1.4) * (t_next - t) / HOUR
+            for _ in range(int(expected) + (random.random() < expected % 1)):
+                _new_order(random.uniform(t, t_next), now)
+            t = t_next
+        _orders_until = now
+        for order in [o for o in _in_flight if o['processing_at'] <= now]:
+            status = _status_at(order, now)
+            if status == order['dims']['status']:
+                continue
+            ORDERS.move(order['ts'], order['amount'], order['dims'], {'status': status})
+            ORDER_BOOK.set_status(order['id'], status)
+            db.execute('UPDATE orders SET status = ? WHERE id = ?', (status, order['id']))
+            order['dims']['status'] = status
+            if status == order['final']:
+                _in_flight.remove(order)
+
+
+def _new_order(ts: float, now: float, customer: str | None = None, product: str | None = None,
+               qty: int | None = None) -> dict:
+    qty = qty or random.randint(1, 10)
+    order = _scheduled({'ts': ts, 'amount': qty * UNIT_PRICE}, ts)
+    order['dims'] = {'status': _status_at(order, now), 'customer': customer or random.choice(CUSTOMERS),
+                     'product': product or random.choice(PRODUCTS)}
+    ORDERS.add(ts, order['amount'], **order['dims'])
+    order['id'] = ORDER_BOOK.add(ts, qty=qty, amount=order['amount'], **order['dims'])
+    db.execute(_INSERT_ORDER, (order['id'], ts, order['dims']['customer'], order['dims']['product'], qty,
+                               order['amount'], order['dims']['status']))
+    if order['dims']['status'] != order['final']:
+        _in_flight.append(order)
+    return order
+
+
+def _scheduled(order: dict, since: float) -> dict:
+    """`order` with the times of its status changes after `since`, and its final status."""
+    order['processing_at'] = since + random.uniform(0.5, 4) * HOUR
+    order['done_at'] = order['processing_at'] + random.uniform(4, 30) * HOUR
+    order['final'] = random.choices(_FINAL, weights=[88, 8, 4])[0]
+    return order
+
+
+def _load_orders(now: float) -> float | None:
+    """Fill the cube and the order book from the stored orders; the time of the last one, None if there are none."""
+    stored = [dict(row) for row in db.query(f'SELECT {", ".join(_ORDER_COLUMNS)} FROM orders ORDER BY rowid')]
+    if not stored:
+        return None
+    ORDER_BOOK.extend(stored)
+    for row in stored:
+        dims = {'status': row['status'], 'customer': row['customer'], 'product': row['product']}
+        ORDERS.add(row['ts'], row['amount'], **dims)
+        if row['status'] not in _FINAL:
+            # Not final when the process stopped: its next changes are scheduled from now
+            order = _scheduled({'id': row['id'], 'ts': row['ts'], 'amount': row['amount'], 'dims': dims}, now)
+            if row['status'] == 'Processing':
+                order['processing_at'] = now
+            _in_flight.append(order)
+    return min(now, max(row['ts'] for row in stored))
+
+
+def create_order(customer: str, product: str, qty: int) -> str:
+    """Enter an order now, as Open; returns its id."""
+    _sample_orders_up_to_now()
+    with _orders_lock:
+        now = time.time()
+        return _new_order(now, now, customer, product, qty)['id']
+
+
+def _status_at(order: dict, now: float) -> str:
+    if now < order['processing_at']:
+        return 'Open'
+    return 'Processing' if now < order['done_at'] else order['final']
+
+
+def _midnight(days_ago: int = 0) -> float:
+    """Start of the local day `days_ago` days back."""
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - timedelta(days=days_ago)).timestamp()
 
 
 # ── KPI cards ────────────────────────────────────────────────────────────────
 
+@tracing.data_source
+@cached(ttl=10, stale=20)
+@_in_thread
 def get_kpis() -> dict:
+    _sample_orders_up_to_now()
+    # Today so far against the same stretch of yesterday
+    now = time.time()
+    today, yesterday = _midnight(), _midnight(1)
+    orders, revenue = ORDERS.totals(today, now)
+    orders_y, revenue_y = ORDERS.totals(yesterday, yesterday + (now - today))
     return {
-        "orders":     {"value": random.randint(320, 420),  "delta": random.randint(-15, 25),  "unit": ""},
-        "revenue":    {"value": random.randint(48000, 72000), "delta": random.randint(-3000, 8000), "unit": "€"},
+        "orders":     {"value": orders,            "delta": orders - orders_y,          "unit": ""},
+        "revenue":    {"value": round(revenue),    "delta": round(revenue - revenue_y), "unit": "€"},
         "shipments":  {"value": random.randint(80, 140),   "delta": random.randint(-10, 20),  "unit": ""},
         "throughput": {"value": random.randint(88, 99),    "delta": round(random.uniform(-2, 3), 1), "unit": "%"},
     }
@@ -20,41 +210,122 @@ def get_kpis() -> dict:
 
 # ── Revenue line chart — last 30 days ────────────────────────────────────────
 
-def get_revenue_series() -> dict:
-    days = [(datetime.today() - timedelta(days=29 - i)).strftime("%d %b") for i in range(30)]
-    revenue  = [round(random.uniform(1200, 3800), 0) for _ in range(30)]
-    forecast = [None] * 25 + [round(random.uniform(2000, 4000), 0) for _ in range(5)]
+@tracing.data_source
+@cached(ttl=300, stale=600)
+@_in_thread
+def get_revenue_series(points: int = 30) -> dict:
+    _sample_up_to_now()
+    times, revenue = downsample(*STORE.window('revenue', 30), points)
+    days = [datetime.fromtimestamp(t).strftime("%d %b") for t in times]
+    # Naive forecast over the last five days: the trailing week's mean, trending up 3 % a day
+    week = [v for v in revenue[-12:-5] if v is not None]
+    base = sum(week) / len(week) if week else 0
+    forecast = [None] * (len(revenue) - 5) + [round(base * (1 + 0.03 * i), 0) for i in range(5)]
     return {"days": days, "revenue": revenue, "forecast": forecast}
 
 
 # ── Order status donut ────────────────────────────────────────────────────────
 
+@tracing.data_source
+@cached(ttl=30, stale=30)
+@_in_thread
 def get_order_status() -> list[dict]:
-    shipped    = random.randint(120, 180)
-    pending    = random.randint(40, 80)
-    processing = random.randint(30, 60)
-    cancelled  = random.randint(5, 20)
-    return [
-        {"name": "Shipped",    "value": shipped},
-        {"name": "Pending",    "value": pending},
-        {"name": "Processing", "value": processing},
-        {"name": "Cancelled",  "value": cancelled},
-    ]
+    _sample_orders_up_to_now()
+    month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp()
+    by_status = ORDERS.totals(month, time.time(), by='status')
+    return [{"name": status, "value": by_status.get(status, (0, 0.0))[0]} for status in STATUSES]
 
 
 # ── Daily orders bar — last 7 days ───────────────────────────────────────────
 
+@tracing.data_source
+@cached(ttl=300, stale=600)
+@_in_thread
 def get_daily_orders() -> dict:
-    days = [(datetime.today() - timedelta(days=6 - i)).strftime("%a") for i in range(7)]
-    completed = [random.randint(30, 70) for _ in range(7)]
-    returned  = [random.randint(1, 10)  for _ in range(7)]
-    return {"days": days, "completed": completed, "returned": returned}
+    _sample_orders_up_to_now()
+    return _days(7)
+
+
+@tracing.data_source
+@cached(ttl=30, stale=30)
+@_in_thread
+def get_order_week() -> dict:
+    """Orders page — last 7 days: totals, per-status counts and the per-day chart."""
+    _sample_orders_up_to_now()
+    now = time.time()
+    start = _midnight(6)
+    orders, revenue = ORDERS.totals(start, now)
+    by_status = ORDERS.totals(start, now, by='status')
+    return {
+        "orders": orders,
+        "revenue": round(revenue),
+        "status": {status: by_status.get(status, (0, 0.0))[0] for status in STATUSES},
+        "daily": _days(7),
+    }
+
+
+# ── Order lists ───────────────────────────────────────────────────────────────
+
+@tracing.data_source
+@_in_thread
+def get_orders(limit: int = 50, cursor: str | None = None, *, offset: int = 0, status: str | None = None,
+               customer: str | None = None, descending: bool = True) -> dict:
+    """Orders page — one page of the order history, newest first, plus the count of matching orders.
+
+    → {'rows': [...], 'next': cursor of the following page or None, 'total': n}
+    """
+    _sample_orders_up_to_now()
+    page = ORDER_BOOK.page(limit, cursor, offset=offset, status=status, customer=customer, descending=descending)
+    page['total'] = ORDER_BOOK.count(status=status, customer=customer)
+    return page
+
+
+def _days(count: int) -> dict:
+    """Per-day orders, revenue and fulfilled / cancelled counts over the last `count` days."""
+    buckets = ORDERS.series(_midnight(count - 1), time.time(), 'day', by='status')
+    return {
+        "days":      [datetime.fromtimestamp(t).strftime("%a") for t, _ in buckets],
+        "orders":    [sum(n for n, _ in s.values()) for _, s in buckets],
+        "revenue":   [round(sum(a for _, a in s.values())) for _, s in buckets],
+        "fulfilled": [s.get('Fulfilled', (0, 0.0))[0] for _, s in buckets],
+        "cancelled": [s.get('Cancelled', (0, 0.0))[0] for _, s in buckets],
+    }
 
 
 # ── Production throughput area — last 24 h ───────────────────────────────────
 
+@tracing.data_source
+@cached(ttl=60, stale=60)
+@_in_thread
 def get_throughput_series() -> dict:
-    hours  = [f"{i:02d}:00" for i in range(24)]
-    actual = [round(random.uniform(70, 98), 1) for _ in range(24)]
-    target = [92.0] * 24
+    _sample_up_to_now()
+    per_line = [STORE.window('throughput', 24, line) for line in LINES]
+    times = per_line[0][0]
+    hours = [datetime.fromtimestamp(t).strftime("%H:00") for t in times]
+    # Plant-wide rate — mean over the lines that reported in each hour
+    actual = []
+    for samples in zip(*(values for _, values in per_line)):
+        present = [v for v in samples if v is not None]
+        actual.append(round(sum(present) / len(present), 1) if present else None)
+    target = [92.0] * len(hours)
     return {"hours": hours, "actual": actual, "target": target}
+
+
+# ── Line rates — per-minute history, downsampled per request ─────────────────
+
+@tracing.data_source
+@cached(ttl=30, stale=30, maxsize=128)
+@_in_thread
+def get_line_rates(lines: tuple[str, ...], start: float | None, end: float | None, points: int) -> dict:
+    """Units per hour of each line between `start` and `end` (epoch seconds; None = whole history)
+    as [epoch ms, value] pairs, at most `points` per line."""
+    _sample_rates_up_to_now()
+    buf = STORE.buffer('rate', lines[0])
+    first = (buf.last_slot - len(buf) + 1) * MINUTE
+    last = buf.last_slot * MINUTE
+    series = {}
+    for line in lines:
+        times, values = downsample(*STORE.range('rate', first if start is None else start,
+                                                last if end is None else end, line), points)
+        series[line] = [[int(t * 1000), v] for t, v in zip(times, values)]
+    return {'first': first * 1000, 'last': last * 1000, 'series': series}
@@ -0,0 +1,192 @@
+"""
+Database — a local SQLite file in WAL mode. Writes go to a write-behind queue and return at
+once; one writer thread commits what has queued up every few milliseconds, in one transaction.
+Usage:
+    from services import db
+    db.configure('data/app.db')     # once at startup (main.py); creates the file and schema
+    db.execute('UPDATE pallets SET status = ? WHERE id = ?', ('Damaged', 'PLT-3005'))    # queued
+    db.executemany('INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)', rows)              # queued
+    db.query('SELECT * FROM pallets')       # → [sqlite3.Row, …]; a connection per thread
+    db.load_or_seed('pallets', PALLETS)     # the table's rows, or `PALLETS` written as its first rows
+    db.flush()                              # wait until everything queued is committed
+
+The in-memory structures stay the source of truth while the process runs; the database makes
+their writes survive a restart, without the page that made them waiting on the disk. A reader
+does not see writes still queued. Statements are fixed SQL strings with parameters, so each
+connection compiles them once and reuses them from its statement cache. Until configure() is
+called (benchmarks, scripts), writes are dropped and queries find nothing.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.005      # s a batch stays open for more writes
+_BATCH_LIMIT = 5000         # statements per transaction
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY, ts REAL NOT NULL, customer TEXT, product TEXT, qty INTEGER, amount REAL, status TEXT
+);
+CREATE TABLE IF NOT EXISTS shipments (
+    id TEXT PRIMARY KEY, customer TEXT, destination TEXT, carrier TEXT, status TEXT, eta TEXT, weight_kg REAL
+);
+CREATE TABLE IF NOT EXISTS pallets (
+    id TEXT PRIMARY KEY, type TEXT, location TEXT, cap INTEGER, load INTEGER, status TEXT
+);
+CREATE TABLE IF NOT EXISTS packing_jobs (
+    id TEXT PRIMARY KEY, order_id TEXT, customer TEXT, product TEXT, units INTEGER, due TEXT, pack_type TEXT,
+    stage TEXT
+);
+'''
+
+_path: Path | None = None
+_local = threading.local()
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_writer: threading.Thread | None = None
+
+
+def configure(path: str) -> None:
+    global _path, _writer, _local
+    # One writer at a time: what the earlier one has queued goes to its own file first
+    close()
+    _path = Path(path)
+    _local = threading.local()      # connections to an earlier file are not reused
+    _path.parent.mkdir(parents=True, exist_ok=True)
+    connection = _connection()
+    connection.execute('PRAGMA journal_mode = WAL')     # stored in the file: readers never block the writer
+    connection.executescript(_SCHEMA)
+    _writer = threading.Thread(target=_write_loop, name='db writer', daemon=True)
+    _writer.start()
+
+
+def enabled() -> bool:
+    return _path is not None
+
+
+def _connection() -> sqlite3.Connection:
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        # Autocommit; the writer opens its transactions itself
+        connection = sqlite3.connect(_path, isolation_level=None, cached_statements=256, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA synchronous = NORMAL')   # WAL: durable at checkpoints, no fsync per commit
+        connection.execute('PRAGMA busy_timeout = 5000')
+        _local.connection = connection
+    return connection
+
+
+# ── Writes ────────────────────────────────────────────────────────────────────
+
+def execute(sql: str, params: tuple = ()) -> None:
+    if _path is not None:
+        _queue.put((sql, [params]))
+
+
+def executemany(sql: str, rows: list[tuple]) -> None:
+    if _path is not None and rows:
+        _queue.put((sql, rows))
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Wait until everything queued so far is committed; False if `timeout` ran out first."""
+    if _writer is None:
+        return True
+    done = threading.Event()
+    _queue.put(done)
+    return done.wait(timeout)
+
+
+def close() -> None:
+    """Commit what is queued and stop the writer — on shutdown, and before configure() switches files."""
+    global _writer
+    if _writer is None:
+        return
+    flush(10)
+    _queue.put(None)
+    _writer.join(10)
+    _writer = None
+
+
+def _write_loop() -> None:
+    connection = _connection()
+    while True:
+        item = _queue.get()
+        batch, waiters, stop = [], [], False
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            if item is None:
+                stop = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                batch.append(item)
+            if stop or len(batch) >= _BATCH_LIMIT:
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                item = _queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            if batch:
+                _commit(connection, batch)
+        except Exception:
+            # Whatever went wrong with this batch, the writer must live on for the next one
+            log.exception('write batch of %d statements failed', len(batch))
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        if stop:
+            connection.close()
+            return
+
+
+def _commit(connection: sqlite3.Connection, batch: list[tuple[str, list[tuple]]]) -> None:
+    # Runs of the same statement go in one executemany, in queue order
+    runs: list[tuple[str, list[tuple]]] = []
+    for sql, rows in batch:
+        if runs and runs[-1][0] == sql:
+            runs[-1][1].extend(rows)
+        else:
+            runs.append((sql, list(rows)))
+    try:
+        connection.execute('BEGIN')
+        for sql, rows in runs:
+            connection.executemany(sql, rows)
+        connection.execute('COMMIT')
+    except Exception:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        # One bad statement must not cost the others their write: commit them one by one
+        for sql, rows in runs:
+            for params in rows:
+                try:
+                    connection.execute(sql, params)
+                except Exception as e:
+                    log.error('write dropped: %s — %s %r', e, sql, params)
+
+
+# ── Reads ─────────────────────────────────────────────────────────────────────
+
+def query(sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+    if _path is None:
+        return []
+    return _connection().execute(sql, params).fetchall()
+
+
+def load_or_seed(table: str, rows: list[dict]) -> list[dict]:
+    """The rows of `table`, in insertion order; when it is empty, `rows` are queued as its first rows and returned."""
+    stored = [dict(row) for row in query(f'SELECT * FROM {table} ORDER BY rowid')]
+    if stored:
+        return stored
+    if rows:
+        columns = list(rows[0])
+        executemany(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                    [tuple(row[c] for c in columns) for row in rows])
+    return rows
@@ -0,0 +1,71 @@
+"""
+Dialog pool — modal forms built once per client and opened again on every later click,
+instead of a new dialog per click that stays attached to the page after it closes.
+Usage:
+    from services import dialogs
+
+    def build(dialog: ui.dialog) -> None:           # runs inside the dialog, once per client
+        with ui.card():
+            name = ui.input('Name', value='')
+            ui.button('Save', on_click=lambda: [save(name.value), dialog.close()])
+
+    dialogs.show('new-order', build)                # builds on first use, then only opens
+
+`build` may return a callback, run on every open after the reset — e.g. to reload data.
+Each open resets the form's fields (every value element inside the dialog) to the values they
+had when it was built. The dialogs hang off the client's root content, so they outlive sub-page
+navigation; they are deleted when the client disconnects, and built again if it comes back.
+"""
+
+from collections.abc import Callable
+
+from nicegui import Client, app, ui
+from nicegui.elements.mixins.value_element import ValueElement
+
+
+class _Pooled:
+
+    def __init__(self, dialog: ui.dialog, on_open: Callable[[], None] | None) -> None:
+        self.dialog = dialog
+        self.on_open = on_open
+        self.initial = {field: field.value for field in dialog.descendants() if isinstance(field, ValueElement)}
+
+    def reset(self) -> None:
+        for field, value in self.initial.items():
+            field.value = value
+
+
+# client id → dialog name → built dialog
+_POOL: dict[str, dict[str, _Pooled]] = {}
+
+
+def show(name: str, build: Callable[[ui.dialog], Callable[[], None] | None]) -> ui.dialog:
+    """Open this client's `name` dialog, built by `build(dialog)` the first time, with its fields reset."""
+    client = ui.context.client
+    pool = _POOL.setdefault(client.id, {})
+    pooled = pool.get(name)
+    if pooled is None or pooled.dialog.is_deleted:
+        with client.content, ui.dialog() as dialog:
+            on_open = build(dialog)
+        pooled = pool[name] = _Pooled(dialog, on_open)
+    else:
+        pooled.reset()
+    if pooled.on_open is not None:
+        pooled.on_open()
+    pooled.dialog.open()
+    return pooled.dialog
+
+
+def _dispose(client: Client) -> None:
+    for pooled in _POOL.pop(client.id, {}).values():
+        if not pooled.dialog.is_deleted:
+            pooled.dialog.delete()
+
+
+def _forget(client: Client) -> None:
+    # Deleted without a disconnect first (never connected): its elements go with it
+    _POOL.pop(client.id, None)
+
+
+app.on_disconnect(_dispose)
+app.on_delete(_forget)
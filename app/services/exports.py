@@ -0,0 +1,200 @@
+"""
+Exports — rows streamed to a download as CSV or XLSX, a chunk at a time, so memory use stays
+flat however many rows there are.
+Usage:
+    from services import exports
+    total, rows = table.rows(sort, filters, search)             # rows: a lazy iterator of dicts
+    job = exports.start(rows, total, [('id', 'Shipment ID'), ('customer', 'Customer')],
+                        name='shipments', kind='xlsx')
+    ui.download.from_url(job.url)       # one-time link, served by GET /api/export/{token} (main.py)
+    job.done, job.total, job.finished   # progress while it streams — poll it from the page
+    job.expired                         # the link was never fetched
+
+CSV goes out with a UTF-8 BOM so Excel picks the encoding. XLSX is written without a library:
+a zip stream of the five parts a workbook needs, the sheet rows as inline strings, compressed
+as they are written. A link not fetched within LINK_TTL seconds expires.
+"""
+
+import csv
+import io
+import secrets
+import threading
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from xml.sax.saxutils import escape
+
+LINK_TTL = 120
+_CHUNK = 1000       # rows per write
+
+_MEDIA_TYPES = {
+    'csv':  'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+Columns = list[tuple[str, str]]     # (row key, header)
+
+
+class ExportJob:
+
+    def __init__(self, rows: Iterable[dict], total: int, columns: Columns, name: str, kind: str) -> None:
+        if kind not in _MEDIA_TYPES:
+            raise ValueError(f'unknown export kind: {kind}')
+        self.token = secrets.token_urlsafe(16)
+        self.kind = kind
+        self.filename = f'{name}-{time.strftime("%Y-%m-%d")}.{kind}'
+        self.columns = columns
+        self.total = total
+        self.done = 0
+        self.started = False
+        self.finished = False
+        self.created = time.time()
+        self._rows = rows
+
+    @property
+    def url(self) -> str:
+        return f'/api/export/{self.token}'
+
+    @property
+    def expired(self) -> bool:
+        return not self.started and time.time() - self.created > LINK_TTL
+
+    @property
+    def media_type(self) -> str:
+        return _MEDIA_TYPES[self.kind]
+
+    def stream(self) -> Iterator[bytes]:
+        """The file, chunk by chunk; a plain generator, so Starlette runs it in its thread pool."""
+        self.started = True
+        chunks = _csv(self) if self.kind == 'csv' else _xlsx(self)
+        try:
+            yield from chunks
+        finally:
+            self.finished = True    # also when the browser cancels the download
+
+
+_JOBS: dict[str, ExportJob] = {}
+_lock = threading.Lock()
+
+
+def start(rows: Iterable[dict], total: int, columns: Columns, *, name: str, kind: str = 'csv') -> ExportJob:
+    job = ExportJob(rows, total, columns, name, kind)
+    with _lock:
+        now = time.time()
+        for token in [t for t, j in _JOBS.items() if now - j.created > LINK_TTL]:
+            _JOBS.pop(token).finished = True
+        _JOBS[job.token] = job
+    return job
+
+
+def take(token: str) -> ExportJob | None:
+    """The job behind a download link; each link works once."""
+    with _lock:
+        job = _JOBS.pop(token, None)
+    if job is None or job.expired:
+        return None
+    return job
+
+
+def _batches(rows: Iterable[dict]) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, _CHUNK)):
+        yield batch
+
+
+# ── CSV ───────────────────────────────────────────────────────────────────────
+
+def _csv(job: ExportJob) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    keys = [key for key, _ in job.columns]
+    buffer.write('\ufeff')
+    writer.writerow([header for _, header in job.columns])
+    for batch in _batches(job._rows):
+        writer.writerows([row.get(key, '') for key in keys] for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        job.done += len(batch)
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+# ── XLSX ──────────────────────────────────────────────────────────────────────
+
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_PACKAGE_RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_DOC_RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': _XML + (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    '_rels/.rels': _XML + (
+        f'<Relationships xmlns="{_PACKAGE_RELS}">'
+        f'<Relationship Id="rId1" Type="{_DOC_RELS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    'xl/_rels/workbook.xml.rels': _XML + (
+        f'<Relationships xmlns="{_PACKAGE_RELS}">'
+        f'<Relationship Id="rId1" Type="{_DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'),
+    'xl/workbook.xml': _XML + (
+        f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_DOC_RELS}">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+}
+
+
+class _Pipe(io.RawIOBase):
+    """Write-only, unseekable sink that zipfile streams into; take() empties it."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _xlsx(job: ExportJob) -> Iterator[bytes]:
+    pipe = _Pipe()
+    keys = [key for key, _ in job.columns]
+    # Not seekable, so zipfile writes each entry's sizes after its data
+    with zipfile.ZipFile(pipe, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, body in _XLSX_PARTS.items():
+            archive.writestr(name, body)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(f'{_XML}<worksheet xmlns="{_MAIN_NS}"><sheetData>'.encode())
+            sheet.write(_xlsx_row([header for _, header in job.columns]))
+            yield pipe.take()
+            for batch in _batches(job._rows):
+                sheet.write(b''.join(_xlsx_row([row.get(key, '') for key in keys]) for row in batch))
+                job.done += len(batch)
+                yield pipe.take()
+            sheet.write(b'</sheetData></worksheet>')
+    yield pipe.take()
+
+
+def _xlsx_row(values: list) -> bytes:
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'.encode()
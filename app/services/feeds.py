@@ -0,0 +1,133 @@
+"""
+Snapshot feeds — one server-side loop per feed builds a snapshot, and one socket.io emit
+delivers it to every subscribed page.
+Usage:
+    from services.feeds import Feed
+    FEED = Feed('dashboard:snapshot', build_snapshot, interval=15)   # async def build_snapshot() -> dict
+
+    listener = FeedListener(FEED.event, {'orders.value': label, 'revenue': chart})   # components/feed_listener.py
+    FEED.attach(listener)      # subscribed while its client is connected
+    FEED.detach(listener)      # also happens automatically when the listener is deleted
+
+A snapshot is a dict with up to three sections, keyed by target name:
+    {'text':    {name: str},            # label text
+     'classes': {name: str},            # replaces the class list
+     'charts':  {name: partial options}}  # merged into an echart's options, series by index
+Clients that showed the previous tick get only what changed (services/charts.py), new
+subscribers get the full snapshot. Either payload is the same for every client, so
+python-socketio encodes it once per tick. Each listener maps the names to its own element ids
+in the browser and mirrors the values into the server-side elements without sending updates.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+from nicegui import Client, app, background_tasks, core
+
+from services import charts, tracing
+
+if TYPE_CHECKING:
+    from components.feed_listener import FeedListener
+
+log = logging.getLogger(__name__)
+
+_FEEDS: list['Feed'] = []
+
+
+class Feed:
+
+    def __init__(self, event: str, build: Callable[[], Awaitable[dict]], interval: float) -> None:
+        self.event = event
+        self.interval = interval
+        self._build = build
+        self._listeners: dict[str, 'FeedListener'] = {}     # client id → listener on its page
+        self._subscribed: set[str] = set()                   # client ids with a live socket
+        self._synced: set[str] = set()                       # clients showing the last broadcast
+        self._last: dict | None = None
+        self._task: asyncio.Task | None = None
+        _FEEDS.append(self)
+
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+
+    def attach(self, listener: 'FeedListener') -> None:
+        client = listener.client
+        self._listeners[client.id] = listener
+        listener.feeds.add(self)
+        if client.has_socket_connection:
+            self.subscribe(client.id)
+
+    def detach(self, listener: 'FeedListener') -> None:
+        client_id = listener.client.id
+        if self._listeners.get(client_id) is listener:
+            del self._listeners[client_id]
+            self.unsubscribe(client_id)
+        listener.feeds.discard(self)
+
+    def subscribe(self, client_id: str) -> None:
+        if client_id in self._listeners:
+            self._subscribed.add(client_id)
+            if self._task is None and core.loop is not None:
+                self._task = background_tasks.create(self._run(), name=f'feed {self.event}')
+
+    def unsubscribe(self, client_id: str) -> None:
+        self._subscribed.discard(client_id)
+        self._synced.discard(client_id)
+
+    def desync(self, client_id: str) -> None:
+        """The client's page changed outside the feed — send it a full snapshot next time."""
+        self._synced.discard(client_id)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribed)
+
+    # ── Push loop ─────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        tracing.detach()    # started from whichever page subscribed first
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if not self._subscribed:
+                    continue
+                try:
+                    await self._tick()
+                except Exception:
+                    # One bad tick must not stop the feed for every subscriber; all get the full snapshot next
+                    log.exception('feed %s tick failed', self.event)
+                    self._synced.clear()
+        finally:
+            self._task = None       # the next subscriber starts the loop again
+
+    async def _tick(self) -> None:
+        snapshot = await self._build()
+        synced = [c for c in self._subscribed if c in self._synced]
+        fresh = [c for c in self._subscribed if c not in self._synced]
+        for client_id in self._subscribed:
+            self._listeners[client_id].mirror(snapshot)
+        changes = charts.diff_snapshot(self._last, snapshot)
+        self._last = snapshot
+        self._synced = set(self._subscribed)
+        # nicegui puts each client's socket in a room named after the client id
+        if synced and changes:
+            await core.sio.emit(self.event, changes, room=synced)
+        if fresh:
+            await core.sio.emit(self.event, snapshot, room=fresh)
+
+
+# ── Connection tracking — shared by all feeds ─────────────────────────────────
+
+def _on_connect(client: Client) -> None:
+    for feed in _FEEDS:
+        feed.subscribe(client.id)
+
+
+def _on_disconnect(client: Client) -> None:
+    for feed in _FEEDS:
+        feed.unsubscribe(client.id)
+
+
+app.on_connect(_on_connect)
+app.on_disconnect(_on_disconnect)
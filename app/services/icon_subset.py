@@ -0,0 +1,115 @@
+"""
+Tabler icon subsetting — scans the app sources for the icons they actually use and builds a
+small stylesheet plus a matching subset font for the main layout.
+The full icons.css is only linked by the icon browser (/icons).
+
+Picked up from the sources:
+    ti-<name> class names          e.g. '<i class="ti ti-{name}"></i>'
+    raw codepoints                 e.g. content: "\\eac5"  /  '\\uea67'  /  '&#xeb55;'
+
+The font is subset with `fontTools` (plus `brotli` for woff2), installed by the Dockerfile;
+on a dev machine without them the subset stylesheet falls back to the full Tabler font files.
+"""
+
+import io
+import logging
+import re
+from pathlib import Path
+
+from services import assets
+
+try:
+    from fontTools import subset as _ft_subset
+    from fontTools.ttLib import TTFont
+    logging.getLogger('fontTools').setLevel(logging.ERROR)   # the shipped font trips harmless header warnings
+except ImportError:  # optional — the CSS is still subset, the font is not
+    _ft_subset = None
+
+try:
+    import brotli  # noqa: F401 — fontTools needs it to write woff2
+    _FLAVOR = 'woff2'
+except ImportError:
+    _FLAVOR = 'woff'
+
+CSS_SOURCE  = 'css/icons-subset.css'
+FONT_SOURCE = f'css/fonts/tabler-icons-subset.{_FLAVOR}'
+
+_APP_ROOT = Path(__file__).parent.parent
+_FULL_CSS = _APP_ROOT / 'assets' / 'css' / 'icons.css'
+_FULL_TTF = _APP_ROOT / 'assets' / 'css' / 'fonts' / 'tabler-icons.ttf'
+
+# Files scanned for icon usage, relative to the app root
+_SCAN_GLOBS = ['*.py', 'components/*.py', 'services/*.py', 'assets/css/global-css.css']
+
+_RULE_RE  = re.compile(r'\.ti-([\w-]+):before\s*\{\s*content:\s*"\\([0-9a-fA-F]{4,5})"')
+_BASE_RE  = re.compile(r'\.ti\s*\{[^}]*\}')
+_CLASS_RE = re.compile(r'\bti-([a-z0-9]+(?:-[a-z0-9]+)*)')
+_CODE_RE  = re.compile(r'\\u([0-9a-fA-F]{4})|\\([0-9a-fA-F]{4,5})\b|&#x([0-9a-fA-F]{4,5});')
+
+
+# ── Scan ──────────────────────────────────────────────────────────────────────
+
+def _icon_map(css: str) -> dict[str, int]:
+    return {name: int(code, 16) for name, code in _RULE_RE.findall(css)}
+
+
+def used_icons(icon_map: dict[str, int]) -> tuple[set[str], set[int]]:
+    """Return (class names, raw codepoints) referenced anywhere in the scanned sources."""
+    known_codes = set(icon_map.values())
+    names: set[str] = set()
+    codes: set[int] = set()
+    for pattern in _SCAN_GLOBS:
+        for path in _APP_ROOT.glob(pattern):
+            text = path.read_text(encoding='utf-8', errors='ignore')
+            names.update(n for n in _CLASS_RE.findall(text) if n in icon_map)
+            for groups in _CODE_RE.findall(text):
+                code = int(next(g for g in groups if g), 16)
+                if code in known_codes:
+                    codes.add(code)
+    return names, codes
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def build() -> str:
+    """Register the subset font and stylesheet with the asset pipeline; returns the CSS URL."""
+    css = _FULL_CSS.read_text(encoding='utf-8')
+    icon_map = _icon_map(css)
+    names, codes = used_icons(icon_map)
+    codepoints = sorted(codes | {icon_map[n] for n in names})
+
+    font = _subset_font(codepoints)
+    if font is not None:
+        assets.add(FONT_SOURCE, font)
+        src = f'url("./fonts/{Path(FONT_SOURCE).name}") format("{_FLAVOR}")'
+    else:
+        src = 'url("./fonts/tabler-icons.woff2") format("woff2"), url("./fonts/tabler-icons.woff") format("woff")'
+
+    base = _BASE_RE.search(css)
+    rules = [
+        '@font-face { font-family: "tabler-icons"; font-style: normal; font-weight: 400; '
+        f'font-display: block; src: {src}; }}',
+        base.group(0) if base else '',
+    ]
+    rules += [f'.ti-{n}:before {{ content: "\\{icon_map[n]:x}"; }}' for n in sorted(names)]
+    return assets.add_css(CSS_SOURCE, '\n'.join(rules))
+
+
+def _subset_font(codepoints: list[int]) -> bytes | None:
+    if _ft_subset is None:
+        return None
+    font = TTFont(_FULL_TTF)
+    # The shipped ligature tables do not decompile cleanly and icons are addressed by codepoint anyway
+    for tag in ('GSUB', 'GPOS', 'GDEF'):
+        if tag in font:
+            del font[tag]
+    options = _ft_subset.Options()
+    options.layout_features = []
+    options.notdef_outline = True
+    subsetter = _ft_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    font.flavor = _FLAVOR
+    buf = io.BytesIO()
+    font.save(buf)
+    return buf.getvalue()
@@ -0,0 +1,87 @@
+"""
+KPI views — row counts and column sums kept up to date one row change at a time, so a page
+reads its KPI cards instead of scanning the rows behind them.
+Usage:
+    from services.kpis import KpiView
+    pallets = KpiView(by=('status', 'location'), sums=('load', 'cap'))
+    pallets.load(rows)                                        # once, from the rows already there
+    pallets.insert(row)
+    pallets.update(row, {'status': 'Damaged'})                # same row, new values
+    pallets.delete(row)
+
+    pallets.count()                                           # → number of rows
+    pallets.count(status='Available')
+    pallets.total('load')                                     # → sum over all rows
+    pallets.total('load', location='Dock 1')
+    pallets.counts('location')                                # → {'Dock 1': n, ...}
+
+Every (column, value) of the `by` columns has one cell holding its row count and its sums, and
+so does the whole table. A change touches one cell per `by` column, whatever the row count;
+a read is one cell. Only single-column conditions are kept — for combinations, use a RollupCube
+(services/rollups.py).
+"""
+
+import threading
+
+
+class KpiView:
+
+    def __init__(self, *, by: tuple[str, ...] = (), sums: tuple[str, ...] = ()) -> None:
+        self.by = by
+        self.sums = sums
+        # None for the whole table, else (column, value) → [count, *sums]
+        self._cells: dict[tuple[str, object] | None, list] = {None: [0] + [0] * len(sums)}
+        self._lock = threading.Lock()
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+
+    def load(self, rows) -> None:
+        for row in rows:
+            self.insert(row)
+
+    def insert(self, row: dict, count: int = 1) -> None:
+        """Book `count` rows like `row`; it needs every `by` and `sums` column."""
+        with self._lock:
+            self._book(row, count)
+
+    def delete(self, row: dict, count: int = 1) -> None:
+        self.insert(row, -count)
+
+    def update(self, old: dict, new: dict) -> None:
+        """Re-book one row from `old` to `new`; columns missing from `new` keep their value."""
+        with self._lock:
+            self._book(old, -1)
+            self._book({**old, **new}, 1)
+
+    def _book(self, row: dict, count: int) -> None:
+        amounts = [row[name] * count for name in self.sums]
+        for key in [None, *((name, row[name]) for name in self.by)]:
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = [0] + [0] * len(self.sums)
+            cell[0] += count
+            for i, amount in enumerate(amounts, 1):
+                cell[i] += amount
+            if key is not None and not cell[0]:
+                del self._cells[key]
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def count(self, **where: object) -> int:
+        return self._cell(where)[0]
+
+    def total(self, name: str, **where: object) -> float:
+        return self._cell(where)[1 + self.sums.index(name)]
+
+    def counts(self, name: str) -> dict:
+        """Row count per value of `by` column `name`, values without rows left out."""
+        with self._lock:
+            return {key[1]: cell[0] for key, cell in self._cells.items() if key is not None and key[0] == name}
+
+    def _cell(self, where: dict) -> list:
+        if len(where) > 1:
+            raise ValueError('KPI views answer one condition at a time')
+        if where and next(iter(where)) not in self.by:
+            raise ValueError(f'not a KPI view column: {next(iter(where))}')
+        key = next(iter(where.items()), None)
+        return self._cells.get(key) or [0] + [0] * len(self.sums)
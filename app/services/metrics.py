@@ -0,0 +1,188 @@
+"""
+Runtime metrics — connected clients, live elements, websocket traffic, storage writes and
+provider cache outcomes and page module load times, rendered in the Prometheus text exposition format.
+Usage:
+    from services import metrics
+    metrics.install()                                  # once, at import time of main.py
+    metrics.watch_client(ui.context.client, nav.route)     # inside the page layout
+    metrics.render()                                   # → text for GET /metrics
+
+Counters are plain dict entries bumped on the event loop thread, so no locks are needed;
+render() runs on the same loop and reads a consistent snapshot without blocking writers.
+Traffic is attributed to the route pattern a client currently shows, e.g. '/customer/{kundennummer}'.
+"""
+
+from collections.abc import Callable
+from contextvars import ContextVar
+
+from nicegui import Client, app, core
+
+from services import cache, pages
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Page label for clients on a path no route matches, or not yet watched
+_OTHER = 'other'
+
+# client id → page label, kept current by the sub-pages router
+_PAGE: dict[str, str] = {}
+
+# (page, message type) → count / payload length; run_javascript calls are message type 'run_javascript'
+_WS_MESSAGES: dict[tuple[str, str], int] = {}
+_WS_BYTES: dict[str, int] = {}
+
+# storage scope → writes
+_STORAGE_WRITES: dict[str, int] = {'user': 0, 'client': 0, 'general': 0}
+
+# Set for the duration of one sio.emit so the engine.io send_packet below knows whose bytes it carries
+_emit_page: ContextVar[str | None] = ContextVar('metrics_emit_page', default=None)
+
+_installed = False
+
+
+# ── Hooks ─────────────────────────────────────────────────────────────────────
+
+def install() -> None:
+    """Wrap the socket.io server's emit/send and start counting; safe to call more than once."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    sio = core.sio
+    emit = sio.emit
+    send_packet = sio.eio.send_packet
+
+    async def counted_emit(event, data=None, *args, room=None, **kwargs):
+        # nicegui addresses every outbox message to the room named after the client id;
+        # feeds broadcast to a list of those rooms
+        if isinstance(room, list):
+            labels = {_PAGE.get(r, _OTHER) for r in room}
+            page = labels.pop() if len(labels) == 1 else 'broadcast'
+        else:
+            page = _PAGE.get(room, _OTHER)
+        key = (page, event)
+        _WS_MESSAGES[key] = _WS_MESSAGES.get(key, 0) + 1
+        token = _emit_page.set(page)
+        try:
+            return await emit(event, data, *args, room=room, **kwargs)
+        finally:
+            _emit_page.reset(token)
+
+    # Every socket.io send ends here; the per-recipient tasks inherit the context set by counted_emit
+    async def counted_send_packet(sid, pkt):
+        page = _emit_page.get()
+        if page is not None and pkt.data is not None:
+            # Encoded payload — characters for text frames, bytes for binary attachments
+            _WS_BYTES[page] = _WS_BYTES.get(page, 0) + len(pkt.data)
+        return await send_packet(sid, pkt)
+
+    sio.emit = counted_emit
+    sio.eio.send_packet = counted_send_packet
+    app.storage.general.on_change(_general_written)
+    app.on_delete(_forget)
+
+
+def watch_client(client: Client, page_of: Callable[[str], str | None]) -> None:
+    """Attribute `client`'s traffic to `page_of(path)` and count writes to its storage."""
+    router = client.sub_pages_router
+
+    def track(path: str) -> None:
+        _PAGE[client.id] = page_of(path) or _OTHER
+
+    track(router.current_path)
+    router.on_path_changed(track)
+
+    client.storage.on_change(_client_written)
+    user = app.storage.user
+    # User storage is shared by all tabs of a session — register the counter only once
+    if _user_written not in user.change_handlers:
+        user.on_change(_user_written)
+
+
+def _user_written() -> None:
+    _STORAGE_WRITES['user'] += 1
+
+
+def _client_written() -> None:
+    _STORAGE_WRITES['client'] += 1
+
+
+def _general_written() -> None:
+    _STORAGE_WRITES['general'] += 1
+
+
+def _forget(client: Client) -> None:
+    _PAGE.pop(client.id, None)
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def render() -> str:
+    """Return all metrics in the Prometheus text format."""
+    clients = list(Client.instances.values())
+    connected = sum(1 for c in clients if c.has_socket_connection)
+
+    per_client = []
+    per_page: dict[str, int] = {}
+    for client in clients:
+        page = _PAGE.get(client.id, _OTHER)
+        count = len(client.elements)
+        per_client.append((client.id, page, count))
+        per_page[page] = per_page.get(page, 0) + count
+
+    out = [
+        '# HELP nicegui_clients Client instances held by the server.',
+        '# TYPE nicegui_clients gauge',
+        f'nicegui_clients{{state="connected"}} {connected}',
+        f'nicegui_clients{{state="disconnected"}} {len(clients) - connected}',
+        '# HELP nicegui_client_elements Live elements per client.',
+        '# TYPE nicegui_client_elements gauge',
+    ]
+    out += [f'nicegui_client_elements{{client="{cid}",page="{page}"}} {n}' for cid, page, n in per_client]
+    out += [
+        '# HELP nicegui_page_elements Live elements summed over all clients showing a page.',
+        '# TYPE nicegui_page_elements gauge',
+    ]
+    out += [f'nicegui_page_elements{{page="{page}"}} {n}' for page, n in sorted(per_page.items())]
+    out += [
+        '# HELP nicegui_ws_messages_total Websocket messages sent, by page and message type.',
+        '# TYPE nicegui_ws_messages_total counter',
+    ]
+    out += [f'nicegui_ws_messages_total{{page="{page}",type="{kind}"}} {n}'
+            for (page, kind), n in sorted(dict(_WS_MESSAGES).items())]
+    out += [
+        '# HELP nicegui_ws_sent_bytes_total Encoded websocket payload sent, by page.',
+        '# TYPE nicegui_ws_sent_bytes_total counter',
+    ]
+    out += [f'nicegui_ws_sent_bytes_total{{page="{page}"}} {n}' for page, n in sorted(dict(_WS_BYTES).items())]
+    run_js = sum(n for (_, kind), n in _WS_MESSAGES.items() if kind == 'run_javascript')
+    out += [
+        '# HELP nicegui_run_javascript_total run_javascript calls delivered to browsers.',
+        '# TYPE nicegui_run_javascript_total counter',
+        f'nicegui_run_javascript_total {run_js}',
+        '# HELP nicegui_storage_writes_total Writes to app.storage, by scope.',
+        '# TYPE nicegui_storage_writes_total counter',
+    ]
+    out += [f'nicegui_storage_writes_total{{scope="{scope}"}} {n}' for scope, n in _STORAGE_WRITES.items()]
+    providers = cache.stats()
+    out += [
+        '# HELP provider_cache_calls_total Cached data provider calls, by outcome.',
+        '# TYPE provider_cache_calls_total counter',
+    ]
+    out += [f'provider_cache_calls_total{{provider="{name}",result="{result}"}} {n}'
+            for name, counts in providers.items() for result, n in counts.items() if result != 'size']
+    out += [
+        '# HELP provider_cache_entries Entries held per cached data provider.',
+        '# TYPE provider_cache_entries gauge',
+    ]
+    out += [f'provider_cache_entries{{provider="{name}"}} {counts["size"]}' for name, counts in providers.items()]
+    loads = pages.timings()
+    out += [
+        '# HELP page_module_load_ms Page module import and first build time (services/pages.py), once per process.',
+        '# TYPE page_module_load_ms gauge',
+    ]
+    out += [f'page_module_load_ms{{module="{module}",phase="{phase}"}} {t[key]:.1f}'
+            for module, t in sorted(loads.items()) for phase, key in (('import', 'import_ms'), ('build', 'build_ms'))
+            if t[key] is not None]
+    return '\n'.join(out) + '\n'
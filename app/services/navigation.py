@@ -0,0 +1,83 @@
+"""
+Navigation registry — one declarative table that drives both the `ui.sub_pages` routes and
+the sidebar links.
+Usage:
+    from services.navigation import NavItem, Navigation
+    nav = Navigation([
+        NavItem('/',         LazyPage('components.dashboard_content'), label='Dashboard', icon='dashboard'),
+        NavItem('/shipping', LazyPage('components.shipping_content'),  label='Shipping',  icon='local_shipping',
+                also=['/customer']),
+        NavItem('/customer/{kundennummer}', LazyPage('components.data_content')),   # route only, no link
+    ])
+    ui.sub_pages(nav.routes)
+    nav.resolve('/customer/42')   # → '/shipping', the sidebar link to highlight
+    nav.route('/customer/42')     # → '/customer/{kundennummer}', the route that builds it
+"""
+
+import re
+from collections.abc import Callable
+
+
+class NavItem:
+    """A sub-page route; it also gets a sidebar link when `label` is given.
+
+    The link is highlighted for its own path and everything below it (`exact` limits it to the
+    path itself); `also` lists further path prefixes that belong to the same section.
+    `separator` draws a divider above the link.
+    """
+
+    def __init__(self,
+                 path: str,
+                 page: Callable,
+                 *,
+                 label: str | None = None,
+                 icon: str | None = None,
+                 also: list[str] | None = None,
+                 exact: bool | None = None,
+                 separator: bool = False) -> None:
+        self.path = path
+        self.page = page
+        self.label = label
+        self.icon = icon
+        self.patterns = [path, *(also or [])]
+        self.exact = path == '/' if exact is None else exact
+        self.separator = separator
+
+
+class Navigation:
+
+    def __init__(self, items: list[NavItem]) -> None:
+        self.items = items
+        # Route table for ui.sub_pages, in declaration order
+        self.routes: dict[str, Callable] = {item.path: item.page for item in items}
+        # JSON-ready link list for the sidebar component — built once, shared by every client
+        linked = [item for item in items if item.label]
+        self.links: list[dict] = [
+            {'path': item.path, 'label': item.label, 'icon': item.icon, 'separator': item.separator}
+            for item in linked
+        ]
+        # All link patterns folded into one regex; the named group that matches is the link index
+        alternatives = []
+        for i, item in enumerate(linked):
+            patterns = '|'.join(re.escape(p.rstrip('/') or '/') for p in item.patterns)
+            tail = '$' if item.exact else '(?:/|$)'
+            alternatives.append(f'(?P<l{i}>(?:{patterns}){tail})')
+        self._matcher = re.compile('|'.join(alternatives))
+        # Route patterns folded the same way; a `{name}` parameter matches one path segment
+        alternatives = []
+        for i, item in enumerate(items):
+            pattern = re.sub(r'\\\{\w+\\\}', '[^/]+', re.escape(item.path))
+            alternatives.append(f'(?P<r{i}>{pattern.rstrip("/")}/?$)')
+        self._route_matcher = re.compile('|'.join(alternatives))
+
+    def resolve(self, path: str) -> str | None:
+        """Return the path of the sidebar link that owns `path` (query and fragment are ignored)."""
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        m = self._matcher.match(path)
+        return self.links[int(m.lastgroup[1:])]['path'] if m else None
+
+    def route(self, path: str) -> str | None:
+        """Return the route pattern that builds `path`, e.g. '/customer/{kundennummer}'."""
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        m = self._route_matcher.match(path)
+        return self.items[int(m.lastgroup[1:])].path if m else None
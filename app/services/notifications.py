@@ -7,11 +7,13 @@ Usage:
     notify('Review your input', type='warning')
     notify('Server restarted', type='info')
 
-    handle = await notify_ongoing('Processing…', title='Loading')
+    handle = notify_ongoing('Processing…', title='Loading')
+    handle.update('Halfway there…')
     await asyncio.sleep(3)
     handle.dismiss()
 """
 
+import json
 import uuid
 from nicegui import ui
 
@@ -128,9 +130,19 @@ def notify(
 class _OngoingNotification:
     def __init__(self, toast_id: str) -> None:
         self._id = toast_id
+        self._client = ui.context.client     # so timers and background tasks can update it too
+
+    def update(self, message: str) -> None:
+        """Replace the toast's message, e.g. with progress."""
+        self._client.run_javascript(f"""
+        (function() {{
+          const el = document.querySelector('#{self._id} .toast-message');
+          if (el) el.textContent = {json.dumps(message)};
+        }})();
+        """)
 
     def dismiss(self) -> None:
-        ui.run_javascript(f"""
+        self._client.run_javascript(f"""
         (function() {{
           const el = document.getElementById({self._id!r});
           if (el) {{
@@ -142,7 +154,7 @@ class _OngoingNotification:
 
 
 def notify_ongoing(message: str, title: str = 'Loading', position: str | None = None) -> _OngoingNotification:
-    """Show a persistent spinner toast. Returns a handle with .dismiss()."""
+    """Show a persistent spinner toast. Returns a handle with .update(message) and .dismiss()."""
     toast_id = f'toast-ongoing-{uuid.uuid4().hex[:8]}'
     pos = position or DEFAULT_POSITION
     pos = pos if pos in _POS_CSS else 'bottom-right'
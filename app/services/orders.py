@@ -0,0 +1,240 @@
+"""
+Order repository — every order, held column by column, with sorted secondary indexes by
+creation time, status and customer, paged by keyset (cursor) rather than by offset.
+Usage:
+    from services.orders import OrderRepository
+    orders = OrderRepository()
+    order_id = orders.add(ts, customer='Acme Corp', product='Gear Box', qty=3, amount=412.5, status='Open')
+    orders.set_status(order_id, 'Processing')
+
+    page = orders.page(50)                                   # newest first
+    # → {'rows': [{'id': 'ORD-…', 'ts': …, 'customer': …, …}, …], 'next': cursor or None}
+    orders.page(50, page['next'])                            # the 50 after those
+    orders.page(50, status='Open', customer='Acme Corp', start=t0, end=t1)
+    orders.count(status='Open')
+    orders.explain(status='Open', customer='Acme Corp')      # → the plan page() and count() follow
+
+Each index is an array of row numbers sorted by (creation time, row): one over all orders,
+one per status, one per customer. A query runs on the narrowest index its filters allow — with
+both a status and a customer, the shorter of the two, testing the other per row — and finds its
+time range and its cursor by binary search. A page then costs the search plus its rows: the
+same on page 1 and page 10,000, and new orders do not shift the pages after a cursor.
+A cursor is the (creation time, row) of the last row served; `offset` skips rows from there,
+which is a jump within the index unless a second filter has to be tested row by row.
+count() is a difference of two positions; for a status and a customer over all time, a counter
+kept per pair.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+_FIRST_ID = 10_000
+_ENCODED = ('status', 'customer', 'product')
+_INDEXED = ('status', 'customer')
+
+
+class OrderRepository:
+
+    def __init__(self) -> None:
+        self._ts = array('d')
+        self._qty = array('H')
+        self._amount = array('d')
+        self._codes = {name: array('H') for name in _ENCODED}
+        self._values: dict[str, list[str]] = {name: [] for name in _ENCODED}      # code → text
+        self._lookup: dict[str, dict[str, int]] = {name: {} for name in _ENCODED}
+        # Row numbers sorted by (ts, row): all orders, and per code of each indexed column
+        self._by_time = array('I')
+        self._index: dict[str, dict[int, array]] = {name: {} for name in _INDEXED}
+        self._pairs: dict[tuple[int, int], int] = {}       # (status, customer) → orders, for count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def add(self, ts: float, *, customer: str, product: str, qty: int, amount: float, status: str) -> str:
+        """Store a new order and return its id."""
+        with self._lock:
+            row = len(self._ts)
+            self._ts.append(ts)
+            self._qty.append(qty)
+            self._amount.append(amount)
+            for name, value in (('status', status), ('customer', customer), ('product', product)):
+                self._codes[name].append(self._code(name, value))
+            self._insert(self._by_time, row)
+            for name in _INDEXED:
+                self._insert(self._posting(name, self._codes[name][row]), row)
+            pair = self._codes['status'][row], self._codes['customer'][row]
+            self._pairs[pair] = self._pairs.get(pair, 0) + 1
+        return f'ORD-{_FIRST_ID + row}'
+
+    def extend(self, orders: list[dict]) -> None:
+        """add() each of `orders` — for bulk loads, sorting every index once at the end."""
+        with self._lock:
+            for order in orders:
+                self._ts.append(order['ts'])
+                self._qty.append(order['qty'])
+                self._amount.append(order['amount'])
+                for name in _ENCODED:
+                    self._codes[name].append(self._code(name, order[name]))
+            ts = self._ts
+            self._by_time = array('I', sorted(range(len(ts)), key=lambda i: (ts[i], i)))
+            for name in _INDEXED:
+                codes, postings = self._codes[name], {}
+                for row in self._by_time:
+                    postings.setdefault(codes[row], []).append(row)
+                self._index[name] = {code: array('I', rows) for code, rows in postings.items()}
+            self._pairs = {}
+            for pair in zip(self._codes['status'], self._codes['customer']):
+                self._pairs[pair] = self._pairs.get(pair, 0) + 1
+
+    def set_status(self, order_id: str, status: str) -> None:
+        with self._lock:
+            row = self._row_number(order_id)
+            codes = self._codes['status']
+            old, new = codes[row], self._code('status', status)
+            if old == new:
+                return
+            posting = self._index['status'][old]
+            del posting[bisect_left(posting, self._key(row), key=self._key)]
+            self._insert(self._posting('status', new), row)
+            codes[row] = new
+            customer = self._codes['customer'][row]
+            self._pairs[old, customer] -= 1
+            self._pairs[new, customer] = self._pairs.get((new, customer), 0) + 1
+
+    def _code(self, name: str, value: str) -> int:
+        code = self._lookup[name].get(value)
+        if code is None:
+            code = self._lookup[name][value] = len(self._values[name])
+            self._values[name].append(value)
+        return code
+
+    def _posting(self, name: str, code: int) -> array:
+        posting = self._index[name].get(code)
+        if posting is None:
+            posting = self._index[name][code] = array('I')
+        return posting
+
+    def _insert(self, index: array, row: int) -> None:
+        # Orders mostly arrive in time order, so this is usually an append
+        if not index or self._key(index[-1]) < self._key(row):
+            index.append(row)
+        else:
+            insort(index, row, key=self._key)
+
+    def _key(self, row: int) -> tuple[float, int]:
+        return self._ts[row], row
+
+    def _row_number(self, order_id: str) -> int:
+        number = order_id.removeprefix('ORD-')
+        row = int(number) - _FIRST_ID if number.isdigit() else -1
+        if not 0 <= row < len(self._ts):
+            raise KeyError(order_id)
+        return row
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def get(self, order_id: str) -> dict:
+        with self._lock:
+            return self._row(self._row_number(order_id))
+
+    def page(self, limit: int = 50, cursor: str | None = None, *, offset: int = 0, status: str | None = None,
+             customer: str | None = None, start: float | None = None, end: float | None = None,
+             descending: bool = True) -> dict:
+        """Up to `limit` orders created in [start, end) after `cursor`, skipping `offset` more, newest first unless not `descending`.
+
+        'next' is the cursor of the following page, None on the last one.
+        """
+        with self._lock:
+            index, residual, lo, hi = self._plan(status, customer, start, end)
+            if cursor is not None:
+                ts, row = _parse_cursor(cursor)
+                if descending:
+                    hi = min(hi, bisect_left(index, (ts, row), lo, hi, key=self._key))
+                else:
+                    lo = max(lo, bisect_right(index, (ts, row), lo, hi, key=self._key))
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            if residual is None:
+                positions = positions[offset:]
+                rows = [index[p] for p in positions[:limit]]
+                more = len(positions) > limit
+            else:
+                codes, code = residual
+                matches = (index[p] for p in positions if codes[index[p]] == code)
+                for _ in zip(range(offset), matches):
+                    pass
+                rows = [row for _, row in zip(range(limit), matches)]
+                more = len(rows) == limit and next(matches, None) is not None
+            return {
+                'rows': [self._row(row) for row in rows],
+                'next': f'{self._ts[rows[-1]]!r}~{rows[-1]}' if rows and more else None,
+            }
+
+    def count(self, *, status: str | None = None, customer: str | None = None,
+              start: float | None = None, end: float | None = None) -> int:
+        with self._lock:
+            index, residual, lo, hi = self._plan(status, customer, start, end)
+            if residual is None:
+                return hi - lo
+            if start is None and end is None:
+                return self._pairs.get((self._lookup['status'][status], self._lookup['customer'][customer]), 0)
+            codes, code = residual
+            return sum(1 for p in range(lo, hi) if codes[index[p]] == code)
+
+    def explain(self, *, status: str | None = None, customer: str | None = None,
+                start: float | None = None, end: float | None = None) -> str:
+        """The plan page() and count() follow for these filters, e.g. "index customer='Acme Corp': 1,204 rows in range, test status='Open'"."""
+        with self._lock:
+            index, residual, lo, hi = self._plan(status, customer, start, end)
+            name = next((f'{n}={self._values[n][c]!r}' for n, postings in self._index.items()
+                         for c, posting in postings.items() if posting is index),
+                        'time' if index is self._by_time else 'none (no such value)')
+            plan = f'index {name}: {hi - lo:,} rows in range'
+            if residual is not None:
+                tested = 'status' if residual[0] is self._codes['status'] else 'customer'
+                plan += f', test {tested}={self._values[tested][residual[1]]!r}'
+            return plan
+
+    def _plan(self, status: str | None, customer: str | None, start: float | None,
+              end: float | None) -> tuple[array, tuple[array, int] | None, int, int]:
+        """The index to scan, a (codes, code) test for the rows it yields or None, and the range of positions to scan."""
+        candidates = []
+        for name, value in (('status', status), ('customer', customer)):
+            if value is None:
+                continue
+            code = self._lookup[name].get(value)
+            posting = self._index[name].get(code) if code is not None else None
+            if posting is None:
+                return array('I'), None, 0, 0       # no such value, no rows
+            candidates.append((len(posting), posting, name, code))
+        if not candidates:
+            index, residual = self._by_time, None
+        else:
+            candidates.sort(key=lambda c: c[0])
+            index = candidates[0][1]
+            residual = (self._codes[candidates[1][2]], candidates[1][3]) if len(candidates) > 1 else None
+        lo = 0 if start is None else bisect_left(index, (start, -1), key=self._key)
+        hi = len(index) if end is None else bisect_left(index, (end, -1), key=self._key)
+        return index, residual, lo, max(lo, hi)
+
+    def _row(self, row: int) -> dict:
+        return {
+            'id': f'ORD-{_FIRST_ID + row}',
+            'ts': self._ts[row],
+            'customer': self._values['customer'][self._codes['customer'][row]],
+            'product': self._values['product'][self._codes['product'][row]],
+            'qty': self._qty[row],
+            'amount': self._amount[row],
+            'status': self._values['status'][self._codes['status'][row]],
+        }
+
+
+def _parse_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        ts, row = cursor.split('~')
+        return float(ts), int(row)
+    except ValueError:
+        raise ValueError(f'malformed cursor: {cursor!r}') from None
@@ -0,0 +1,114 @@
+"""
+Lazy page registry — a sub-page module is imported the first time its route is visited,
+so cold starts (container restarts, the PyInstaller / native build) only pay for the pages
+that are actually opened.
+Usage:
+    from services.pages import LazyPage, warm_up, timed, log_report
+    routes = {
+        '/':           LazyPage('components.dashboard_content'),
+        '/production': LazyPage('components.production_content', searchFilter=''),
+    }
+    ui.sub_pages(routes)
+    warm_up(routes, ['/'])     # optional — import selected pages at boot
+    with timed('asset pipeline'):
+        assets.build()
+    log_report()
+    timings()                  # → {module: {'import_ms', 'build_ms', 'warm'}}; each first build is logged too
+"""
+
+import importlib
+import logging
+import time
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from typing import Any
+
+from nicegui import PageArguments
+
+log = logging.getLogger(__name__)
+
+# module name → {'import_ms': float | None, 'build_ms': float | None, 'warm': bool}
+_TIMINGS: dict[str, dict] = {}
+
+# boot step label → duration in ms, in execution order
+_BOOT_STEPS: dict[str, float] = {}
+
+
+class LazyPage:
+    """Sub-page builder that resolves `module.attr` on first use.
+
+    Path parameters are forwarded to the builder as keyword arguments on top of `defaults`.
+    """
+
+    def __init__(self, module: str, attr: str = 'content', **defaults: Any) -> None:
+        self.module = module
+        self.attr = attr
+        self.defaults = defaults
+        self._builder: Callable | None = None
+        _TIMINGS.setdefault(module, {'import_ms': None, 'build_ms': None, 'warm': False})
+
+    def load(self) -> Callable:
+        if self._builder is None:
+            timing = _TIMINGS[self.module]
+            if timing['import_ms'] is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.module)
+                timing['import_ms'] = (time.perf_counter() - start) * 1000
+                log.info('imported %s in %.1f ms', self.module, timing['import_ms'])
+            else:
+                module = importlib.import_module(self.module)
+            self._builder = getattr(module, self.attr)
+        return self._builder
+
+    def __call__(self, args: PageArguments) -> Any:
+        builder = self.load()
+        timing = _TIMINGS[self.module]
+        if timing['build_ms'] is not None:
+            return builder(**self.defaults, **args.path_parameters)
+        start = time.perf_counter()
+        result = builder(**self.defaults, **args.path_parameters)
+        timing['build_ms'] = (time.perf_counter() - start) * 1000
+        log.info('first build of %s in %.1f ms', self.module, timing['build_ms'])
+        return result
+
+
+def warm_up(routes: dict[str, LazyPage], paths: Iterable[str]) -> None:
+    """Import the pages behind `paths` now instead of on first visit."""
+    for path in paths:
+        page = routes.get(path)
+        if page is None:
+            log.warning('warm-up path %s is not a registered route', path)
+            continue
+        try:
+            page.load()
+        except Exception:
+            log.exception('warm-up of %s (%s) failed', path, page.module)
+            continue
+        _TIMINGS[page.module]['warm'] = True
+
+
+@contextmanager
+def timed(step: str):
+    """Record the duration of an initialisation step for the boot report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _BOOT_STEPS[step] = (time.perf_counter() - start) * 1000
+
+
+def timings() -> dict[str, dict]:
+    """Import and first-build time per page module, in ms (None until it happened) — for /metrics."""
+    return {module: dict(t) for module, t in _TIMINGS.items()}
+
+
+def log_report() -> None:
+    """Log boot step and per-module import timings; pages not warmed up are listed as deferred."""
+    lines = [f'  {step:<40} {ms:8.1f} ms' for step, ms in _BOOT_STEPS.items()]
+    for module, t in sorted(_TIMINGS.items()):
+        if t['import_ms'] is None:
+            lines.append(f'  {module:<40} deferred')
+        else:
+            lines.append(f'  {module:<40} {t["import_ms"]:8.1f} ms' + ('  (warm-up)' if t['warm'] else ''))
+    total = sum(_BOOT_STEPS.values()) + sum(t['import_ms'] or 0 for t in _TIMINGS.values())
+    log.info('startup report — %.1f ms\n%s', total, '\n'.join(lines))
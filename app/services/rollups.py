@@ -0,0 +1,180 @@
+"""
+Rollup cube — counts and amounts pre-aggregated into hourly, daily and monthly buckets per
+combination of dimension values, kept up to date one event at a time.
+Usage:
+    from services.rollups import RollupCube
+    orders = RollupCube(('status', 'customer', 'product'))
+    orders.add(ts, 412.5, status='Open', customer='Acme Corp', product='Gear Box')
+    orders.move(ts, 412.5, {'status': 'Open'}, {'status': 'Fulfilled'})   # same order, new status
+
+    orders.totals(start, end)                                  # → (count, amount)
+    orders.totals(start, end, by='status')                     # → {'Open': (count, amount), ...}
+    orders.totals(start, end, where={'customer': 'Acme Corp'})
+    orders.series(start, end, 'day', by='status')              # → [(day start, {status: (count, amount)}), ...]
+
+A range is answered from the coarsest buckets that fit inside it: whole months, then whole
+days, then hours at the ragged edges — at most about 23 + 30 + months + 30 + 23 buckets, however
+many events went in. Bounds are rounded out to whole hours, and days and months follow local
+time. Hourly detail is kept for `hour_retention` seconds; older edges round to whole days.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+HOUR = 3600
+DAY = 86400
+
+GRAINS = ('hour', 'day', 'month')
+
+Totals = tuple[int, float]
+
+
+class RollupCube:
+
+    def __init__(self, dimensions: tuple[str, ...], *, hour_retention: float = 35 * DAY) -> None:
+        self.dimensions = dimensions
+        self.hour_retention = hour_retention
+        # grain → bucket start → dimension values → [count, amount]
+        self._buckets: dict[str, dict[int, dict[tuple, list]]] = {grain: {} for grain in GRAINS}
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+
+    def add(self, ts: float, amount: float = 0.0, count: int = 1, **values: str) -> None:
+        """Book `count` events worth `amount` in total at `ts`; `values` gives every dimension."""
+        key = tuple(values[d] for d in self.dimensions)
+        starts = _starts(ts)
+        with self._lock:
+            self._book(starts, key, count, amount)
+        if ts - self._pruned_at > HOUR:
+            self._prune(ts)
+
+    def remove(self, ts: float, amount: float = 0.0, count: int = 1, **values: str) -> None:
+        self.add(ts, -amount, -count, **values)
+
+    def move(self, ts: float, amount: float, old: dict[str, str], new: dict[str, str]) -> None:
+        """Re-book one event from `old` (every dimension) to `new`; dimensions missing from `new` keep their value."""
+        old_key = tuple(old[d] for d in self.dimensions)
+        new_key = tuple(new.get(d, old[d]) for d in self.dimensions)
+        starts = _starts(ts)
+        with self._lock:
+            self._book(starts, old_key, -1, -amount)
+            self._book(starts, new_key, 1, amount)
+
+    def _book(self, starts: tuple[int, int, int], key: tuple, count: int, amount: float) -> None:
+        for grain, start in zip(GRAINS, starts):
+            cells = self._buckets[grain].setdefault(start, {})
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [count, amount]
+            else:
+                cell[0] += count
+                cell[1] += amount
+                if not cell[0] and abs(cell[1]) < 1e-9:
+                    del cells[key]
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.hour_retention
+        with self._lock:
+            hours = self._buckets['hour']
+            for start in [s for s in hours if s < horizon]:
+                del hours[start]
+            self._pruned_at = now
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def totals(self, start: float, end: float, *, by: str | None = None,
+               where: dict[str, str] | None = None) -> Totals | dict[str, Totals]:
+        """Count and amount of the events in [start, end), overall or per value of dimension `by`."""
+        with self._lock:
+            cells = [self._buckets[grain].get(bucket, {}) for grain, bucket in self._cover(start, end)]
+            return self._sum(cells, by, where)
+
+    def series(self, start: float, end: float, grain: str, *, by: str | None = None,
+               where: dict[str, str] | None = None) -> list[tuple[int, Totals | dict[str, Totals]]]:
+        """One (bucket start, totals) entry per `grain` bucket overlapping [start, end), empty ones included."""
+        step = _STEPS[grain]
+        out = []
+        with self._lock:
+            buckets = self._buckets[grain]
+            t = _floor(start, grain)
+            while t < end:
+                out.append((t, self._sum([buckets.get(t, {})], by, where)))
+                t = step(t)
+        return out
+
+    def _cover(self, start: float, end: float) -> list[tuple[str, int]]:
+        """The fewest buckets that exactly tile [start, end) — coarse in the middle, fine at the edges."""
+        horizon = time.time() - self.hour_retention
+        t = _floor(start, 'day') if start < horizon else _floor(start, 'hour')
+        end = _ceil(end, 'day') if end < horizon else _ceil(end, 'hour')
+        out = []
+        while t < end:
+            for grain in ('month', 'day', 'hour'):
+                following = _STEPS[grain](t)
+                if (grain == 'hour' or _floor(t, grain) == t) and following <= end:
+                    break
+            out.append((grain, t))
+            t = following
+        return out
+
+    def _sum(self, cells_list: list[dict[tuple, list]], by: str | None,
+             where: dict[str, str] | None) -> Totals | dict[str, Totals]:
+        filters = [(self.dimensions.index(d), v) for d, v in (where or {}).items()]
+        group = self.dimensions.index(by) if by else None
+        grouped: dict[str, list] = {}
+        count, amount = 0, 0.0
+        for cells in cells_list:
+            for key, (n, a) in cells.items():
+                if any(key[i] != v for i, v in filters):
+                    continue
+                if group is None:
+                    count += n
+                    amount += a
+                else:
+                    totals = grouped.setdefault(key[group], [0, 0.0])
+                    totals[0] += n
+                    totals[1] += a
+        if group is None:
+            return count, amount
+        return {value: (n, a) for value, (n, a) in grouped.items()}
+
+
+# ── Local-time bucket arithmetic ──────────────────────────────────────────────
+
+def _starts(ts: float) -> tuple[int, int, int]:
+    """Start of the hour, day and month holding `ts`."""
+    local = datetime.fromtimestamp(ts)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(ts // HOUR * HOUR), int(day.timestamp()), int(day.replace(day=1).timestamp())
+
+
+def _floor(ts: float, grain: str) -> int:
+    if grain == 'hour':
+        return int(ts // HOUR * HOUR)
+    return _starts(ts)[GRAINS.index(grain)]
+
+
+def _ceil(ts: float, grain: str) -> int:
+    start = _floor(ts, grain)
+    return start if start == ts else _STEPS[grain](start)
+
+
+def _next_hour(ts: int) -> int:
+    return ts + HOUR
+
+
+def _next_day(ts: int) -> int:
+    # Via the calendar, so days stay aligned across DST changes
+    return int((datetime.fromtimestamp(ts) + timedelta(days=1)).replace(hour=0).timestamp())
+
+
+def _next_month(ts: int) -> int:
+    local = datetime.fromtimestamp(ts)
+    year, month = (local.year + 1, 1) if local.month == 12 else (local.year, local.month + 1)
+    return int(local.replace(year=year, month=month, day=1, hour=0).timestamp())
+
+
+_STEPS = {'hour': _next_hour, 'day': _next_day, 'month': _next_month}
@@ -0,0 +1,87 @@
+"""
+N-gram index — finds the terms containing a search token without scanning them all.
+Usage:
+    from services.search import NgramIndex, match_score
+    index = NgramIndex()
+    code = index.add('Acme Corp')           # → term id: 0, 1, 2, … in the order added
+    index.find('cme')                       # → [0]  term ids whose text contains 'cme', case-insensitive
+    match_score('acme corp', 'acme')        # → 3 exact, 2 prefix of a word, 1 anywhere inside
+
+Every term is cut into overlapping n-grams (trigrams by default); a posting per n-gram lists the
+terms it occurs in, in the order they were added. A token is looked up through its rarest
+n-gram, and the few terms posted there are checked for the whole token — so a lookup costs about
+the length of the shortest posting, not the number of terms.
+Tokens shorter than n have no n-gram; they are matched by scanning, which small indexes (up to
+SCAN_LIMIT terms) do and large ones skip — a one-letter token would match most of them anyway.
+Terms are never removed: the caller keeps the mapping from term ids to what they stand for.
+"""
+
+from array import array
+
+SCAN_LIMIT = 1000
+
+
+class NgramIndex:
+
+    def __init__(self, n: int = 3) -> None:
+        self.n = n
+        self._texts: list[str] = []                 # term id → lower-cased text
+        self._postings: dict[str, array] = {}       # n-gram → term ids, ascending
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str) -> int:
+        term = len(self._texts)
+        text = text.lower()
+        self._texts.append(text)
+        for gram in {text[i:i + self.n] for i in range(len(text) - self.n + 1)}:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array('I')
+            posting.append(term)
+        return term
+
+    def extend(self, texts: list[str]) -> None:
+        """add() each of `texts` — for bulk loads, collecting postings in lists first."""
+        n, first = self.n, len(self._texts)
+        texts = [text.lower() for text in texts]
+        self._texts.extend(texts)       # texts first: a concurrent find() may see the new postings
+        collected: dict[str, list[int]] = {}
+        for term, text in enumerate(texts, first):
+            for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+                posting = collected.get(gram)
+                if posting is None:
+                    posting = collected[gram] = []
+                posting.append(term)
+        for gram, terms in collected.items():
+            self._postings.setdefault(gram, array('I')).extend(terms)
+
+    def text(self, term: int) -> str:
+        return self._texts[term]
+
+    def find(self, token: str) -> list[int]:
+        """Ids of the terms containing `token`, ascending."""
+        token = token.lower()
+        n, texts = self.n, self._texts
+        if len(token) < n:
+            return [t for t, text in enumerate(texts) if token in text] if len(texts) <= SCAN_LIMIT else []
+        postings = []
+        for i in range(len(token) - n + 1):
+            posting = self._postings.get(token[i:i + n])
+            if posting is None:
+                return []
+            postings.append(posting)
+        rarest = min(postings, key=len)
+        if len(token) == n:
+            return rarest.tolist()
+        return [t for t in rarest if token in texts[t]]
+
+
+def match_score(text: str, token: str) -> int:
+    """How well lower-cased `token` matches lower-cased `text`: 3 equal, 2 a word starts with it, 1 inside, 0 not at all."""
+    if text == token:
+        return 3
+    if text.startswith(token) or f' {token}' in text or f'-{token}' in text:
+        return 2
+    return 1 if token in text else 0
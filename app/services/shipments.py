@@ -0,0 +1,511 @@
+"""
+Shipments service — the shipment table, held column by column, answering the shipping grid's
+block requests with sorting and filtering done here rather than in the browser.
+Usage:
+    from services import shipments
+    table = shipments.table()                   # built on first use (mock: ~200k shipments)
+    table.block(0, 100, sort=[{'colId': 'eta', 'sort': 'asc'}],
+                filters={'carrier': {'filterType': 'text', 'type': 'contains', 'filter': 'dhl'}})
+    # → {'rows': [{'id': 'SHP-…', 'customer': …}, …], 'last': number of matching rows}
+    table.add(customer='Acme Corp', destination='Berlin', carrier='DHL', status='Pending',
+              eta='2026-03-14', weight_kg=12.5)
+    table.block(0, 100, search='acme ber')      # rows matching every word, best matches first
+    total, rows = table.rows(sort, filters, search)   # the same view, whole, as a lazy iterator — for exports
+    table.update([{'id': 'SHP-100042', 'status': 'Delivered'}, …])   # a carrier burst, one version
+    table.remove(['SHP-100043'])
+    table.status_counts()                       # → {'Pending': n, 'In Transit': n, …}, kept per write
+
+    table.watch(callback)       # callback(kind, rows) after every write; kind is 'add', 'update' or 'remove'
+
+Every write is also queued for the database (services/db.py); table() loads the stored
+shipments on first use, and writes the mock shipments there on a first start.
+
+`sort` and `filters` are AG Grid's sortModel and filterModel as the infinite row model sends
+them: text filters (combined conditions included) on any column, number filters on weight_kg.
+
+Text columns with few distinct values (customer, destination, carrier, status) are dictionary
+encoded: one small integer per row, so a text filter is tested once per distinct value, not
+once per row. The row order for a sort and filter combination is computed once and kept as an
+index array; every further block of that view is a slice. Any write starts a new version, and
+views of older versions are never served again. Removed rows stay in the columns as tombstones.
+Watchers are called in the writing thread, once per write with all of its rows.
+
+Search looks each word up in n-gram indexes (services/search.py): one over shipment ids, one
+per searched column over its distinct values, with the rows of each value kept alongside. A
+row must match every word somewhere; it ranks by field (id, customer, destination, carrier)
+and by how well the word matched (whole value, start of a word, anywhere). Without a sort, a
+search view comes in rank order. The id index is built on first search, or by prepare_search().
+"""
+
+import json
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from datetime import date
+
+from services import db
+from services.kpis import KpiView
+from services.search import NgramIndex, match_score
+
+STATUSES  = ['Pending', 'In Transit', 'Delivered', 'Cancelled']
+CARRIERS  = ['DHL', 'FedEx', 'UPS', 'GLS', 'DPD']
+CUSTOMERS = ['Acme Corp', 'Beta GmbH', 'Gamma Ltd', 'Delta AG', 'Epsilon BV',
+             'Zeta KG', 'Eta SRL', 'Theta Inc', 'Iota LLC', 'Kappa OY']
+CITIES    = ['Berlin', 'Hamburg', 'Munich', 'Amsterdam', 'Vienna',
+             'Zurich', 'Brussels', 'Lyon', 'Milan', 'Warsaw']
+
+COLUMNS = ('id', 'customer', 'destination', 'carrier', 'status', 'eta', 'weight_kg')
+
+# Dictionary-encoded columns and the values they start with
+_ENCODED = {'customer': CUSTOMERS, 'destination': CITIES, 'carrier': CARRIERS, 'status': STATUSES}
+
+# Searched fields and their rank weight
+_SEARCHED = {'id': 4, 'customer': 3, 'destination': 2, 'carrier': 1}
+_LOW = 0xFFFFFFFF       # row bits of a packed search rank
+
+_MOCK_ROWS = 200_000
+_FIRST_ID = 100_000
+_VIEWS = 16             # sort/filter combinations kept per table
+
+_INSERT = f'INSERT INTO shipments ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})'
+
+
+class ShipmentTable:
+
+    def __init__(self) -> None:
+        self._ids = array('I')
+        self._codes = {name: array('H') for name in _ENCODED}
+        self._values = {name: list(values) for name, values in _ENCODED.items()}   # code → text
+        self._lookup = {name: {v: i for i, v in enumerate(values)} for name, values in _ENCODED.items()}
+        self._eta = array('I')          # date ordinal
+        self._weight = array('d')
+        self._next_id = _FIRST_ID
+        self._removed: set[int] = set()     # row indexes
+        self._watchers: list[Callable[[str, list[dict]], None]] = []
+        self.kpis = KpiView(by=('status',))     # kept current by every write
+        self.version = 0
+        self._lock = threading.Lock()
+        self._views: OrderedDict[tuple, array] = OrderedDict()
+        self._views_lock = threading.Lock()
+        # Search: term id = row index in the id index, = code in the value indexes
+        self._id_index: NgramIndex | None = None
+        self._value_index = {name: NgramIndex() for name in _SEARCHED if name in _ENCODED}
+        for name, index in self._value_index.items():
+            index.extend(self._values[name])
+        self._value_rows: dict[str, list[array] | None] = dict.fromkeys(self._value_index)   # None: not built
+        self._search_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._removed)
+
+    def watch(self, callback: Callable[[str, list[dict]], None]) -> None:
+        self._watchers.append(callback)
+
+    def unwatch(self, callback: Callable[[str, list[dict]], None]) -> None:
+        if callback in self._watchers:
+            self._watchers.remove(callback)
+
+    def _notify(self, kind: str, rows: list[dict]) -> None:
+        for callback in list(self._watchers):
+            callback(kind, rows)
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def add(self, **row) -> dict:
+        """Append a shipment (every column but `id`) and return it with its new id."""
+        with self._lock:
+            row['id'] = f'SHP-{self._next_id}'
+            self._ids.append(self._next_id)
+            self._next_id += 1
+            for name, codes in self._codes.items():
+                codes.append(self._code(name, row[name]))
+            self._eta.append(date.fromisoformat(row['eta']).toordinal())
+            self._weight.append(row['weight_kg'])
+            self.kpis.insert(row)
+            # Index last: a concurrent search may find the row as soon as it is posted
+            i = len(self._ids) - 1
+            for name, rows in self._value_rows.items():
+                if rows is not None:
+                    code = self._codes[name][i]
+                    rows.extend(array('I') for _ in range(code + 1 - len(rows)))
+                    rows[code].append(i)
+            if self._id_index is not None:
+                self._id_index.add(row['id'])
+            self.version += 1
+            db.execute(_INSERT, tuple(row[name] for name in COLUMNS))
+        self._notify('add', [row])
+        return row
+
+    def update(self, changes: list[dict]) -> list[dict]:
+        """Apply `changes` — each an 'id' plus the columns to set — as one write; returns the updated rows.
+
+        Raises KeyError for an unknown id and ValueError for a column that cannot be set or a value
+        it cannot hold, before anything is changed.
+        """
+        with self._lock:
+            indexes = [self._index(change['id']) for change in changes]
+            # Every value converted to its stored form first; only then is anything written
+            stored = [{name: self._stored(name, value) for name, value in change.items() if name != 'id'}
+                      for change in changes]
+            status = self._codes['status']
+            for i, change, values in zip(indexes, changes, stored):
+                if 'status' in values:
+                    self.kpis.update({'status': self._values['status'][status[i]]}, {'status': change['status']})
+                for name, value in values.items():
+                    # New text values get their code here, once nothing can be rejected any more
+                    self._column_of(name)[i] = self._code(name, value) if name in self._codes else value
+                    db.execute(f'UPDATE shipments SET {name} = ? WHERE id = ?', (change[name], change['id']))
+            for name in self._value_rows:
+                if any(name in change for change in changes):
+                    self._value_rows[name] = None       # rebuilt on the next search
+            self.version += 1
+            rows = [self._row(i) for i in dict.fromkeys(indexes)]
+        self._notify('update', rows)
+        return rows
+
+    def remove(self, ids: list[str]) -> None:
+        with self._lock:
+            indexes = list(dict.fromkeys(self._index(id) for id in ids))
+            self._removed.update(indexes)
+            for i in indexes:
+                self.kpis.delete({'status': self._values['status'][self._codes['status'][i]]})
+            self.version += 1
+            db.executemany('DELETE FROM shipments WHERE id = ?', [(f'SHP-{self._ids[i]}',) for i in indexes])
+        self._notify('remove', [{'id': id} for id in ids])
+
+    def _index(self, id: str) -> int:
+        number = id.removeprefix('SHP-')
+        i = int(number) - _FIRST_ID if number.isdigit() else -1
+        if not 0 <= i < len(self._ids) or i in self._removed:
+            raise KeyError(id)
+        return i
+
+    def _stored(self, name: str, value) -> str | int | float:
+        """`value` as column `name` holds it: text (coded when written), a date ordinal or a float;
+        ValueError if it cannot be. Changes nothing, so a rejected update leaves no trace."""
+        if name in self._codes:
+            if not isinstance(value, str):
+                raise ValueError(f'shipment {name} must be text: {value!r}')
+            return value
+        if name == 'eta':
+            if not isinstance(value, str):
+                raise ValueError(f'shipment eta must be an ISO date: {value!r}')
+            return date.fromisoformat(value).toordinal()     # ValueError for a malformed date
+        if name == 'weight_kg':
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f'shipment weight_kg must be a number: {value!r}')
+            return float(value)
+        raise ValueError(f'cannot set shipment column: {name}')
+
+    def _column_of(self, name: str) -> array:
+        return self._codes[name] if name in self._codes else self._column(name)
+
+    def _code(self, name: str, value: str) -> int:
+        code = self._lookup[name].get(value)
+        if code is None:
+            code = self._lookup[name][value] = len(self._values[name])
+            self._values[name].append(value)
+            if name in self._value_index:
+                self._value_index[name].add(value)
+        return code
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def block(self, start: int, end: int, sort: list[dict] | None = None, filters: dict | None = None,
+              search: str = '') -> dict:
+        """Rows [start, end) of the view sorted by `sort` and filtered by `filters` and `search`, and the view's length."""
+        view = self._view(sort or [], filters or {}, search.strip().lower())
+        return {'rows': [self._row(i) for i in view[start:end]], 'last': len(view)}
+
+    def rows(self, sort: list[dict] | None = None, filters: dict | None = None,
+             search: str = '') -> tuple[int, Iterator[dict]]:
+        """The view block() pages through, whole: its length and its rows, built as they are read."""
+        view = self._view(sort or [], filters or {}, search.strip().lower())
+        return len(view), (self._row(i) for i in view)
+
+    def status_counts(self) -> dict[str, int]:
+        """Shipments per status, read from the KPI view; every status is listed, if only with 0."""
+        return {status: self.kpis.count(status=status) for status in self._lookup['status']}
+
+    def _row(self, i: int) -> dict:
+        row = {name: self._values[name][codes[i]] for name, codes in self._codes.items()}
+        row['id'] = f'SHP-{self._ids[i]}'
+        row['eta'] = date.fromordinal(self._eta[i]).isoformat()
+        row['weight_kg'] = self._weight[i]
+        return row
+
+    def _view(self, sort: list[dict], filters: dict, search: str) -> array:
+        key = (self.version, json.dumps(sort, sort_keys=True), json.dumps(filters, sort_keys=True), search)
+        # One build per view at a time: the other clients scrolling the same view wait for it
+        with self._views_lock:
+            view = self._views.get(key)
+            if view is None:
+                view = self._views[key] = self._build(len(self._ids), sort, filters, search)
+                while len(self._views) > _VIEWS:
+                    self._views.popitem(last=False)
+            self._views.move_to_end(key)
+            return view
+
+    def _build(self, n: int, sort: list[dict], filters: dict, search: str) -> array:
+        if not isinstance(filters, dict):
+            raise ValueError('malformed filter model')
+        if not isinstance(sort, list):
+            raise ValueError('malformed sort model')
+        order = self._search(n, search) if search else list(range(n))
+        if self._removed:
+            with self._lock:
+                removed = set(self._removed)
+            order = [i for i in order if i not in removed]
+        for name, model in filters.items():
+            if not isinstance(model, dict):
+                raise ValueError(f'malformed filter for {name}')
+            order = self._filter(order, name, model)
+        # Stable sorts from the last key to the first give the combined order
+        for entry in reversed(sort):
+            if not isinstance(entry, dict) or 'colId' not in entry or entry.get('sort') not in ('asc', 'desc'):
+                raise ValueError('malformed sort model')
+            order.sort(key=self._sort_key(entry['colId']), reverse=entry.get('sort') == 'desc')
+        return array('I', order)
+
+    # ── Search ────────────────────────────────────────────────────────────────
+
+    def prepare_search(self) -> None:
+        """Build the search indexes now rather than on the first search; blocking, ~1 s for 200k rows."""
+        self._ids_indexed()
+        for name in self._value_rows:
+            self._rows_of(name)
+
+    def _search(self, n: int, query: str) -> list[int]:
+        """Rows matching every word of `query`, best first; rows of equal rank in table order."""
+        words = [self._word(token) for token in dict.fromkeys(query.split())]
+        # The word with the fewest rows drives; the others only score its rows
+        words.sort(key=lambda w: sum(len(rows) for _, rows in w[0]))
+        chunks = words[0][0]
+        if len(words) == 1 and len(chunks) == 1:
+            return list(chunks[0][1])
+        if len(words) == 1:
+            # One word: whole chunks per score, best first, each row where it scores highest
+            ranked, taken = [], set()
+            for score in sorted({score for score, _ in chunks}, reverse=True):
+                group = set().union(*(rows for s, rows in chunks if s == score)) - taken
+                taken |= group
+                ranked += sorted(group)
+            return ranked
+        # Several words: each driving row packed as score << 32 | ~row, so one plain integer sort
+        # ranks them, best first and in table order within a score
+        packed, seen = [], bytearray(n)
+        for score, rows in sorted(chunks, key=lambda c: -c[0]):
+            for i in rows:
+                if i < n and not seen[i]:       # rows added since the view began wait for the next one
+                    seen[i] = 1
+                    packed.append(score << 32 | _LOW - i)
+        for _, id_scores, columns in words[1:]:
+            if not id_scores and len(columns) == 1:
+                (codes, lut), = columns
+                packed = [p + (extra << 32) for p in packed if (extra := lut[codes[_LOW - (p & _LOW)]])]
+            else:
+                packed = [p + (extra << 32) for p in packed
+                          if (extra := max(0, id_scores.get(i := _LOW - (p & _LOW), 0), *(lut[c[i]] for c, lut in columns)))]
+        packed.sort(reverse=True)
+        return [_LOW - (p & _LOW) for p in packed]
+
+    def _word(self, token: str) -> tuple[list[tuple[int, Sequence[int]]], dict[int, int], list[tuple[array, list[int]]]]:
+        """The rows matching `token`: as (score, rows) chunks, and as the scores of matching
+        ids plus, per matching column, its codes with a code → score table."""
+        chunks: list[tuple[int, Sequence[int]]] = []
+        id_index = self._ids_indexed()
+        id_scores = {i: _SEARCHED['id'] * match_score(id_index.text(i), token) for i in id_index.find(token)}
+        by_score: dict[int, list[int]] = {}
+        for i, score in id_scores.items():
+            by_score.setdefault(score, []).append(i)
+        chunks += by_score.items()
+        columns = []
+        for name, index in self._value_index.items():
+            rows = self._rows_of(name)
+            lut = [0] * len(rows)
+            for code in index.find(token):
+                if code < len(rows):
+                    lut[code] = _SEARCHED[name] * match_score(index.text(code), token)
+                    chunks.append((lut[code], rows[code]))
+            if any(lut):
+                columns.append((self._codes[name], lut))
+        return chunks, id_scores, columns
+
+    def _ids_indexed(self) -> NgramIndex:
+        with self._search_lock:
+            if self._id_index is None:
+                # Ids never change: index those there are, then, holding off writes, the ones added meanwhile
+                n = len(self._ids)
+                index = NgramIndex()
+                index.extend([f'SHP-{number}' for number in self._ids[:n]])
+                with self._lock:
+                    index.extend([f'SHP-{number}' for number in self._ids[n:]])
+                    self._id_index = index      # add() keeps it current from here
+            return self._id_index
+
+    def _rows_of(self, name: str) -> list[array]:
+        """Row indexes per code of column `name`, ascending."""
+        with self._search_lock, self._lock:
+            rows = self._value_rows[name]
+            if rows is None:
+                rows = [array('I') for _ in self._values[name]]
+                for i, code in enumerate(self._codes[name]):
+                    rows[code].append(i)
+                self._value_rows[name] = rows
+            return rows
+
+    def _sort_key(self, name: str) -> Callable[[int], object]:
+        if name in self._codes:
+            values, codes = self._values[name], self._codes[name]
+            rank = [0] * len(values)
+            for position, code in enumerate(sorted(range(len(values)), key=values.__getitem__)):
+                rank[code] = position
+            return lambda i: rank[codes[i]]
+        column = self._column(name)
+        return column.__getitem__
+
+    def _filter(self, order: list[int], name: str, model: dict) -> list[int]:
+        if name in self._codes:
+            test = _text_test(model)
+            keep = [test(value.lower()) for value in self._values[name]]
+            codes = self._codes[name]
+            return [i for i in order if keep[codes[i]]]
+        if model.get('filterType') == 'number':
+            test = _number_test(model)
+            column = self._column(name)
+            return [i for i in order if test(column[i])]
+        test = _text_test(model)
+        return [i for i in order if test(self._text(name, i).lower())]
+
+    def _column(self, name: str) -> array:
+        columns = {'id': self._ids, 'eta': self._eta, 'weight_kg': self._weight}
+        if name not in columns:
+            raise ValueError(f'unknown shipment column: {name}')
+        return columns[name]
+
+    def _text(self, name: str, i: int) -> str:
+        if name == 'id':
+            return f'SHP-{self._ids[i]}'
+        if name == 'eta':
+            return date.fromordinal(self._eta[i]).isoformat()
+        return str(self._column(name)[i])
+
+
+# ── AG Grid filter models ─────────────────────────────────────────────────────
+
+_TEXT_TESTS: dict[str, Callable[[str, str], bool]] = {
+    'contains':    lambda v, f: f in v,
+    'notContains': lambda v, f: f not in v,
+    'equals':      lambda v, f: v == f,
+    'notEqual':    lambda v, f: v != f,
+    'startsWith':  lambda v, f: v.startswith(f),
+    'endsWith':    lambda v, f: v.endswith(f),
+    'blank':       lambda v, f: not v,
+    'notBlank':    lambda v, f: bool(v),
+}
+
+_NUMBER_TESTS: dict[str, Callable[[float, float, float], bool]] = {
+    'equals':             lambda v, a, b: v == a,
+    'notEqual':           lambda v, a, b: v != a,
+    'lessThan':           lambda v, a, b: v < a,
+    'lessThanOrEqual':    lambda v, a, b: v <= a,
+    'greaterThan':        lambda v, a, b: v > a,
+    'greaterThanOrEqual': lambda v, a, b: v >= a,
+    'inRange':            lambda v, a, b: a < v < b,     # AG Grid's default: bounds excluded
+}
+
+
+def _text_test(model: dict) -> Callable[[str], bool]:
+    """Predicate on a lower-cased cell value for a text filter model, as AG Grid's own filter would apply it."""
+    if 'conditions' in model:
+        return _combine(model, [_text_test(c) for c in _conditions(model)])
+    kind = model.get('type', 'contains')
+    if kind not in _TEXT_TESTS:
+        raise ValueError(f'unsupported text filter: {kind}')
+    test, needle = _TEXT_TESTS[kind], str(model.get('filter') or '').lower()
+    return lambda value: test(value, needle)
+
+
+def _number_test(model: dict) -> Callable[[float], bool]:
+    if 'conditions' in model:
+        return _combine(model, [_number_test(c) for c in _conditions(model)])
+    kind = model.get('type', 'equals')
+    if kind not in _NUMBER_TESTS:
+        raise ValueError(f'unsupported number filter: {kind}')
+    test, low, high = _NUMBER_TESTS[kind], model.get('filter'), model.get('filterTo')
+    for bound in (low, high) if kind == 'inRange' else (low,):
+        if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+            raise ValueError(f'number filter {kind} needs a number, got {bound!r}')
+    return lambda value: test(value, low, high)
+
+
+def _conditions(model: dict) -> list[dict]:
+    conditions = model['conditions']
+    if not isinstance(conditions, list) or not all(isinstance(c, dict) for c in conditions):
+        raise ValueError('malformed filter conditions')
+    return conditions
+
+
+def _combine(model: dict, tests: list[Callable]) -> Callable:
+    if model.get('operator') == 'OR':
+        return lambda value: any(test(value) for test in tests)
+    return lambda value: all(test(value) for test in tests)
+
+
+# ── Table instance — the stored shipments, or mock ones on a first start ──────
+
+_table: ShipmentTable | None = None
+_table_lock = threading.Lock()
+
+
+def table() -> ShipmentTable:
+    """The shipment table, filled on first use; call from a worker thread the first time."""
+    global _table
+    with _table_lock:
+        if _table is None:
+            stored = db.query(f'SELECT {", ".join(COLUMNS)} FROM shipments ORDER BY rowid')
+            if stored:
+                _table = _stored_table(stored)
+            else:
+                _table = _mock_table(_MOCK_ROWS)
+                _, rows = _table.rows()
+                db.executemany(_INSERT, [tuple(row[name] for name in COLUMNS) for row in rows])
+    return _table
+
+
+def _stored_table(stored: list) -> ShipmentTable:
+    t = ShipmentTable()
+    numbers = {int(row['id'].removeprefix('SHP-')): row for row in stored}
+    # Ids stay row positions: the ones deleted come back as tombstones
+    t._next_id = max(numbers) + 1
+    t._ids = array('I', range(_FIRST_ID, t._next_id))
+    gap = dict(zip(COLUMNS[1:], (CUSTOMERS[0], CITIES[0], CARRIERS[0], STATUSES[0], date.today().isoformat(), 0.0)))
+    for i, number in enumerate(t._ids):
+        row = numbers.get(number)
+        if row is None:
+            t._removed.add(i)
+            row = gap
+        for name, codes in t._codes.items():
+            codes.append(t._code(name, row[name]))
+        t._eta.append(date.fromisoformat(row['eta']).toordinal())
+        t._weight.append(row['weight_kg'])
+    for row in stored:
+        t.kpis.insert({'status': row['status']})
+    return t
+
+
+def _mock_table(n: int) -> ShipmentTable:
+    t = ShipmentTable()
+    today = date.today().toordinal()
+    t._ids = array('I', range(_FIRST_ID, _FIRST_ID + n))
+    t._next_id = _FIRST_ID + n
+    for name, values in _ENCODED.items():
+        weights = [8, 25, 60, 7] if name == 'status' else None
+        t._codes[name] = array('H', random.choices(range(len(values)), weights=weights, k=n))
+    t._eta = array('I', (today + d for d in random.choices(range(-60, 15), k=n)))
+    t._weight = array('d', (round(random.uniform(2, 50), 1) for _ in range(n)))
+    for status, code in t._lookup['status'].items():
+        t.kpis.insert({'status': status}, t._codes['status'].count(code))
+    return t
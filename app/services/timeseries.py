@@ -0,0 +1,197 @@
+"""
+Time-series store — fixed-size ring buffers of regularly sampled values, one per metric and
+production line, backed by `array` so a sample costs 8 bytes (4 with typecode 'f').
+Usage:
+    from services.timeseries import TimeSeriesStore
+    store = TimeSeriesStore()
+    store.register('throughput', step=60, capacity=24 * 60, line='Line A')
+    store.append('throughput', 93.4, line='Line A')               # O(1), timestamp defaults to now
+    times, values = store.window('throughput', 24 * 60, line='Line A')   # oldest → newest
+    times, values = store.range('throughput', start, end, line='Line A')  # samples in [start, end]
+    times, values = downsample(times, values, 800)                        # ≤ 800 points, same shape
+
+Timestamps are not stored: a buffer knows the slot of its newest sample and its step, so the
+time of every other sample follows from its position. Skipped slots read back as None, which
+ECharts draws as a gap.
+
+downsample() is Largest-Triangle-Three-Buckets: it keeps the first and last sample and, per
+bucket, the one spanning the largest triangle with its neighbours — peaks and dips survive,
+flat stretches thin out. Sized to a chart's pixel width it costs O(n) and the payload stays
+bounded however long the history is.
+"""
+
+import math
+import threading
+import time
+from array import array
+
+
+class RingBuffer:
+    """`capacity` slots of `step` seconds each, the newest at slot `last_slot`."""
+
+    __slots__ = ('step', 'capacity', 'last_slot', '_data', '_head', '_count')
+
+    def __init__(self, capacity: int, step: float, typecode: str = 'd') -> None:
+        self.step = step
+        self.capacity = capacity
+        self.last_slot: int | None = None
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._head = 0      # index the next slot is written to
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.itemsize * self.capacity
+
+    def append(self, value: float, ts: float) -> None:
+        slot = int(ts // self.step)
+        if self.last_slot is not None:
+            if slot < self.last_slot:
+                return                                          # late sample — its slot is history
+            if slot == self.last_slot:
+                self._data[(self._head - 1) % self.capacity] = value
+                return
+            for _ in range(min(slot - self.last_slot - 1, self.capacity)):
+                self._push(math.nan)                            # gap
+        self._push(value)
+        self.last_slot = slot
+
+    def extend(self, values: list[float], ts: float) -> None:
+        """Append consecutive samples, the first at `ts`."""
+        slot = int(ts // self.step)
+        if self.last_slot is not None and slot != self.last_slot + 1:
+            for i, value in enumerate(values):
+                self.append(value, ts + i * self.step)
+            return
+        for value in values:
+            self._push(value)
+        if values:
+            self.last_slot = slot + len(values) - 1
+
+    def _push(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def window(self, count: int) -> tuple[float | None, array]:
+        """Return (timestamp of the first slot, values) for the newest `count` slots, oldest first."""
+        count = min(count, self._count)
+        if not count:
+            return None, self._data[:0]
+        return (self.last_slot - count + 1) * self.step, self._slice(count, count)
+
+    def range(self, start: float, end: float) -> tuple[float | None, array]:
+        """Return (timestamp of the first slot, values) for the slots between `start` and `end`."""
+        if not self._count:
+            return None, self._data[:0]
+        first = max(math.ceil(start / self.step), self.last_slot - self._count + 1)
+        last = min(int(end // self.step), self.last_slot)
+        if first > last:
+            return None, self._data[:0]
+        return first * self.step, self._slice(self.last_slot - first + 1, last - first + 1)
+
+    def _slice(self, back: int, count: int) -> array:
+        # `count` slots starting `back` slots before the head
+        start = (self._head - back) % self.capacity
+        end = start + count
+        return self._data[start:end] if end <= self.capacity else self._data[start:] + self._data[:end - self.capacity]
+
+
+class TimeSeriesStore:
+
+    def __init__(self) -> None:
+        self._buffers: dict[tuple[str, str | None], RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: str, *, step: float, capacity: int, line: str | None = None, typecode: str = 'd') -> None:
+        self._buffers.setdefault((metric, line), RingBuffer(capacity, step, typecode))
+
+    def buffer(self, metric: str, line: str | None = None) -> RingBuffer:
+        return self._buffers[(metric, line)]
+
+    def lines(self, metric: str) -> list[str | None]:
+        return [line for m, line in self._buffers if m == metric]
+
+    def append(self, metric: str, value: float, ts: float | None = None, line: str | None = None) -> None:
+        buf = self._buffers[(metric, line)]
+        with self._lock:
+            buf.append(value, time.time() if ts is None else ts)
+
+    def extend(self, metric: str, values: list[float], ts: float, line: str | None = None) -> None:
+        """Append consecutive samples, the first at `ts`, under one lock — for backfills."""
+        buf = self._buffers[(metric, line)]
+        with self._lock:
+            buf.extend(values, ts)
+
+    def window(self, metric: str, count: int, line: str | None = None) -> tuple[list[float], list[float | None]]:
+        """Timestamps and values of the newest `count` samples, ready for chart data."""
+        buf = self._buffers[(metric, line)]
+        with self._lock:
+            first, values = buf.window(count)
+        return _series(first, buf.step, values)
+
+    def range(self, metric: str, start: float, end: float, line: str | None = None) -> tuple[list[float], list[float | None]]:
+        """Timestamps and values of the samples between `start` and `end` (inclusive)."""
+        buf = self._buffers[(metric, line)]
+        with self._lock:
+            first, values = buf.range(start, end)
+        return _series(first, buf.step, values)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+
+def _series(first: float | None, step: float, values: array) -> tuple[list[float], list[float | None]]:
+    if first is None:
+        return [], []
+    return ([first + i * step for i in range(len(values))],
+            [None if v != v else v for v in values])     # NaN (gap) → None
+
+
+# ── Downsampling ──────────────────────────────────────────────────────────────
+
+def downsample(times: list[float], values: list[float | None], points: int) -> tuple[list[float], list[float | None]]:
+    """Reduce a series to at most `points` samples with Largest-Triangle-Three-Buckets.
+
+    Gaps (None) are dropped first, so a downsampled line bridges them.
+    """
+    if len(values) <= points:
+        return times, values
+    if any(v is None for v in values):
+        kept = [i for i, v in enumerate(values) if v is not None]
+        times, values = [times[i] for i in kept], [values[i] for i in kept]
+        if len(values) <= points:
+            return times, values
+    if points < 3:
+        return [times[0], times[-1]][:points], [values[0], values[-1]][:points]
+
+    n = len(values)
+    size = (n - 2) / (points - 2)       # samples per bucket, first and last excluded
+    out_t, out_v = [times[0]], [values[0]]
+    a = 0                               # index of the sample picked in the previous bucket
+    for i in range(points - 2):
+        lo = int(i * size) + 1
+        hi = int((i + 1) * size) + 1
+        # The third triangle vertex: mean of the next bucket (the last sample for the last bucket)
+        nlo, nhi = hi, min(int((i + 2) * size) + 1, n)
+        if nlo >= n - 1:
+            cx, cy = times[-1], values[-1]
+        else:
+            cx = sum(times[nlo:nhi]) / (nhi - nlo)
+            cy = sum(values[nlo:nhi]) / (nhi - nlo)
+        ax, ay = times[a], values[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - cx) * (values[j] - ay) - (ax - times[j]) * (cy - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_t.append(times[best])
+        out_v.append(values[best])
+        a = best
+    out_t.append(times[-1])
+    out_v.append(values[-1])
+    return out_t, out_v
@@ -0,0 +1,248 @@
+"""
+Render tracing — times each phase of building a page and keeps per-route latency histograms.
+Usage:
+    from services import tracing
+    tracing.configure('logs/render-trace.jsonl')       # optional JSON-lines trace file
+    routes = tracing.traced_routes(nav.routes)         # sub-page builders timed as 'content'
+    with tracing.render() as trace:                    # full page load, e.g. in the layout decorator
+        with trace.phase('head'):
+            ...
+    @tracing.data_source                               # provider time is booked as 'data'
+    def get_kpis(): ...
+    @tracing.data_source                               # awaited after the render: booked as 'load'
+    async def get_orders(): ...
+    tracing.stats()                                    # → {route: {phase: {count, p50, p95, p99, ...}}}
+
+Phases record self time: a nested phase is subtracted from the one around it, so
+head + frame + content + data add up to the total. Sub-page navigations inside an already
+loaded page get a trace of their own with only 'content' and 'data'. Async providers usually
+finish after the page was sent; each call is booked as 'load' on the route that started it and
+is not part of the total.
+"""
+
+import inspect
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from queue import SimpleQueue
+
+from nicegui import PageArguments
+
+log = logging.getLogger(__name__)
+
+# Renders slower than this are logged as warnings
+SLOW_MS = 250.0
+
+# Histogram bucket upper bounds in ms; the last bucket is open-ended
+_BOUNDS = [0.5, 1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250, 400, 600, 1000, 1500, 2500, 5000, 10000]
+
+# Route label for full page loads that did not reach a sub-page builder (404s, builder errors)
+_UNMATCHED = '(unmatched)'
+
+_current: ContextVar['Trace | None'] = ContextVar('render_trace', default=None)
+
+# route → phase → histogram
+_HISTOGRAMS: dict[str, dict[str, '_Histogram']] = {}
+
+# JSON lines waiting for the writer thread
+_queue: SimpleQueue[str] = SimpleQueue()
+_writer: threading.Thread | None = None
+
+
+# ── Histogram ─────────────────────────────────────────────────────────────────
+
+class _Histogram:
+    """Fixed-bucket latency histogram; quantiles are interpolated within a bucket."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = _BOUNDS[i - 1] if i else 0.0
+                upper = _BOUNDS[i] if i < len(_BOUNDS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50': round(self.quantile(0.50), 2),
+            'p95': round(self.quantile(0.95), 2),
+            'p99': round(self.quantile(0.99), 2),
+            'max': round(self.max, 2),
+        }
+
+
+# ── Traces ────────────────────────────────────────────────────────────────────
+
+class Trace:
+
+    def __init__(self, kind: str, route: str | None = None) -> None:
+        self.kind = kind            # 'page' for a full load, 'navigate' for a sub-page change
+        self.route = route
+        self.path: str | None = None
+        self.phases: dict[str, float] = {}
+        self.done = False
+        self._stack: list[list[float]] = []    # [start, time spent in nested phases]
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield self
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.phases[name] = self.phases.get(name, 0.0) + (elapsed - frame[1]) * 1000
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def finish(self) -> None:
+        self.done = True
+        total = (time.perf_counter() - self._start) * 1000
+        route = self.route or _UNMATCHED
+        histograms = _HISTOGRAMS.setdefault(route, {})
+        for name, ms in (*self.phases.items(), ('total', total)):
+            histograms.setdefault(name, _Histogram()).add(ms)
+        if total > SLOW_MS:
+            log.warning('slow %s render of %s: %.1f ms %s', self.kind, route, total,
+                        {k: round(v, 1) for k, v in self.phases.items()})
+        if _writer is not None:
+            _queue.put(json.dumps({
+                'ts': round(time.time(), 3),
+                'kind': self.kind,
+                'route': route,
+                'path': self.path,
+                'total_ms': round(total, 3),
+                'phases': {k: round(v, 3) for k, v in self.phases.items()},
+            }) + '\n')
+
+
+def active() -> Trace | None:
+    """The trace being recorded in this context, if any."""
+    trace = _current.get()
+    return trace if trace is not None and not trace.done else None
+
+
+def detach() -> None:
+    """Stop booking into the trace this task inherited, for long-lived tasks started during a render."""
+    _current.set(None)
+
+
+@contextmanager
+def render(kind: str = 'page', route: str | None = None):
+    """Record one trace around the block; the route is filled in by the sub-page builder."""
+    trace = Trace(kind, route)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.finish()
+
+
+# ── Instrumentation ───────────────────────────────────────────────────────────
+
+class _TracedRoute:
+
+    def __init__(self, route: str, page: Callable) -> None:
+        self.route = route
+        self.page = page
+
+    def __call__(self, args: PageArguments):
+        trace = active()
+        if trace is None:
+            with render('navigate', self.route) as trace:
+                trace.path = args.path
+                with trace.phase('content'):
+                    return self.page(args)
+        trace.route = self.route
+        trace.path = args.path
+        with trace.phase('content'):
+            return self.page(args)
+
+
+def traced_routes(routes: dict[str, Callable]) -> dict[str, Callable]:
+    """Wrap `ui.sub_pages` builders (taking PageArguments) so their build time is traced per route."""
+    return {route: _TracedRoute(route, page) for route, page in routes.items()}
+
+
+def data_source(func: Callable) -> Callable:
+    """Book the time spent in `func` as the 'data' phase of the active trace ('load' for coroutines)."""
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            trace = _current.get()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if trace is not None:
+                    route = trace.route or _UNMATCHED
+                    ms = (time.perf_counter() - start) * 1000
+                    _HISTOGRAMS.setdefault(route, {}).setdefault('load', _Histogram()).add(ms)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = active()
+        if trace is None:
+            return func(*args, **kwargs)
+        with trace.phase('data'):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# ── Output ────────────────────────────────────────────────────────────────────
+
+def stats() -> dict:
+    """Per-route, per-phase latency summary in ms."""
+    return {
+        route: {name: h.summary() for name, h in phases.items()}
+        for route, phases in sorted(_HISTOGRAMS.items())
+    }
+
+
+def configure(trace_file: str | None) -> None:
+    """Append every finished trace to `trace_file` as one JSON line; writes happen off the event loop."""
+    global _writer
+    if not trace_file or _writer is not None:
+        return
+    path = Path(trace_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _writer = threading.Thread(target=_write_lines, args=(path,), name='render-trace writer', daemon=True)
+    _writer.start()
+
+
+def _write_lines(path: Path) -> None:
+    with path.open('a', encoding='utf-8') as f:
+        while True:
+            f.write(_queue.get())
+            if _queue.empty():
+                f.flush()
@@ -0,0 +1,19 @@
+"""Tests run from app/ or the repository root; the services import as they do in main.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+from services import db  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """services.db on a fresh file, unconfigured again afterwards."""
+    db.configure(str(tmp_path / 'app.db'))
+    yield db
+    db.close()
+    db._path = None
@@ -0,0 +1,62 @@
+"""Provider cache (services/cache.py): TTL, single flight and invalidate() against a query in flight."""
+
+import threading
+import time
+
+from services.cache import cached
+
+
+def test_concurrent_callers_share_one_query():
+    calls, release = [], threading.Event()
+
+    @cached(ttl=60)
+    def provider():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == [1] * 5 and len(calls) == 1
+    assert provider() == 1      # served from the cache
+
+
+def test_invalidate_drops_the_result_of_a_query_already_running():
+    release = threading.Event()
+    source = {'value': 'old'}
+
+    @cached(ttl=60)
+    def provider():
+        value = source['value']
+        release.wait(5)
+        return value
+
+    early = []
+    thread = threading.Thread(target=lambda: early.append(provider()))
+    thread.start()
+    time.sleep(0.1)                 # the query has read 'old' and is still running
+    source['value'] = 'new'
+    provider.invalidate()
+    release.set()
+    thread.join(5)
+    assert early == ['old']         # its own caller still gets an answer
+    assert provider() == 'new'      # but it was not kept
+
+
+def test_entries_expire_after_ttl():
+    calls = []
+
+    @cached(ttl=0.05)
+    def provider():
+        calls.append(1)
+        return len(calls)
+
+    assert provider() == 1 and provider() == 1
+    time.sleep(0.08)
+    assert provider() == 2
@@ -0,0 +1,108 @@
+"""Chart deltas (services/charts.py): a delta applied as feed_listener.js does turns the old patch into the new one."""
+
+import copy
+import random
+
+import pytest
+
+from services import charts
+
+
+def _apply(old, options, roll):
+    """What components/feed_listener.js does: the roll first, then setOption(options)."""
+    out = copy.deepcopy(old)
+    if roll:
+        k = roll['shift']
+        for i, tail in roll['series'].items():
+            series = out['series'][int(i)]
+            series['data'] = series['data'][k:] + tail
+        out['xAxis']['data'] = out['xAxis']['data'][k:] + roll['xAxis']
+    for key, value in (options or {}).items():
+        if key == 'series':
+            for series, patch in zip(out['series'], value):
+                series.update(patch)
+        elif isinstance(value, dict):
+            out.setdefault(key, {}).update(value)
+        else:
+            out[key] = value
+    return out
+
+
+def _patch(days, *series):
+    return {'xAxis': {'data': list(days)}, 'series': [{'data': list(s)} for s in series]}
+
+
+def test_first_patch_goes_out_whole():
+    new = _patch('abc', [1, 2, 3])
+    assert charts.delta(None, new) == (new, None)
+
+
+def test_unchanged_patch_sends_nothing():
+    old = _patch('abc', [1, 2, 3], [4, 5, 6])
+    assert charts.delta(old, copy.deepcopy(old)) == (None, None)
+
+
+def test_rolling_window_sends_only_the_new_points():
+    old = _patch(['d1', 'd2', 'd3', 'd4'], [1, 2, 3, 4], [5, 6, 7, 8])
+    new = _patch(['d3', 'd4', 'd5', 'd6'], [3, 4, 9, 10], [7, 8, 11, 12])
+    options, roll = charts.delta(old, new)
+    assert options is None
+    assert roll == {'shift': 2, 'xAxis': ['d5', 'd6'], 'series': {'0': [9, 10], '1': [11, 12]}}
+    assert _apply(old, options, roll) == new
+
+
+def test_a_revised_series_goes_out_whole_while_the_others_roll():
+    old = _patch(['d1', 'd2', 'd3'], [1, 2, 3], [4, 5, 6])
+    new = _patch(['d2', 'd3', 'd4'], [2, 3, 7], [5, 60, 8])      # d3 of the second series was revised
+    options, roll = charts.delta(old, new)
+    assert roll['series'] == {'0': [7]}
+    assert options == {'series': [{}, {'data': [5, 60, 8]}]}
+    assert _apply(old, options, roll) == new
+
+
+def test_other_axis_changes_and_option_keys_are_sent_as_is():
+    old = {**_patch('abc', [1, 2, 3]), 'title': {'text': 'Revenue'}}
+    new = {**_patch('xyz', [1, 2, 3]), 'title': {'text': 'Revenue (EUR)'}}
+    options, roll = charts.delta(old, new)
+    assert roll is None
+    assert options == {'title': {'text': 'Revenue (EUR)'}, 'xAxis': {'data': list('xyz')}}     # series unchanged
+    assert _apply(old, options, roll) == new
+
+
+@pytest.mark.parametrize('old, new, shift', [
+    ([1, 2, 3, 4], [2, 3, 4, 5], 1),
+    ([0, 0, 0, 1], [0, 0, 1, 2], 1),        # the smallest shift wins
+    ([1, 2, 3], [4, 5, 6], 0),
+    ([1, 2, 3], [2, 3], 0),                 # windows of different length never roll
+    ([], [], 0),
+])
+def test_shift(old, new, shift):
+    assert charts._shift(old, new) == shift
+
+
+def test_random_windows_round_trip():
+    rng = random.Random(5)
+    days = [f'd{i}' for i in range(200)]
+    values = [rng.randrange(100) for _ in range(200)]
+    old = None
+    for start in sorted(rng.randrange(150) for _ in range(40)):
+        revised = list(values[start:start + 30])
+        if rng.random() < 0.3:
+            revised[-1] += 1
+        new = _patch(days[start:start + 30], values[start:start + 30], revised)
+        options, roll = charts.delta(old, new)
+        assert (_apply(old, options, roll) if old else options) == new
+        old = new
+
+
+def test_diff_snapshot_keeps_only_what_changed():
+    chart = _patch(['d1', 'd2'], [1, 2])
+    old = {'text': {'orders': '12', 'revenue': '€1,200'}, 'classes': {'trend': 'up'}, 'charts': {'daily': chart}}
+    new = {'text': {'orders': '13', 'revenue': '€1,200'}, 'classes': {'trend': 'up'},
+           'charts': {'daily': _patch(['d2', 'd3'], [2, 5])}}
+    assert charts.diff_snapshot(old, new) == {
+        'text': {'orders': '13'},
+        'rolls': {'daily': {'shift': 1, 'xAxis': ['d3'], 'series': {'0': [5]}}},
+    }
+    assert charts.diff_snapshot(new, copy.deepcopy(new)) == {}
+    assert charts.diff_snapshot(None, new) is new
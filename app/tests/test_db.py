@@ -0,0 +1,73 @@
+"""Write-behind queue of services/db.py: batching, a bad statement, a failing batch, a second configure()."""
+
+import threading
+
+from services import db
+
+
+def _ids(table: str) -> list[str]:
+    return [row['id'] for row in db.query(f'SELECT id FROM {table} ORDER BY rowid')]
+
+
+def test_queued_writes_are_committed_by_flush(database):
+    database.executemany('INSERT INTO pallets (id, status) VALUES (?, ?)', [(f'P{i}', 'Available') for i in range(500)])
+    database.execute('UPDATE pallets SET status = ? WHERE id = ?', ('Damaged', 'P7'))
+    assert database.flush(5)
+    assert len(_ids('pallets')) == 500
+    assert database.query('SELECT status FROM pallets WHERE id = ?', ('P7',))[0]['status'] == 'Damaged'
+
+
+def test_bad_statement_drops_only_itself(database):
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('P1',))
+    database.execute('INSERT INTO no_such_table VALUES (1)')
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('P1',))           # duplicate key
+    database.execute('INSERT INTO pallets (id) VALUES (?)', (object(),))       # unsupported parameter type
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('P2',))
+    assert database.flush(5)
+    assert _ids('pallets') == ['P1', 'P2']
+
+
+def test_writer_survives_a_failing_batch(database, monkeypatch):
+    commit = db._commit
+    calls = []
+
+    def failing_once(connection, batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError('disk on fire')
+        commit(connection, batch)
+
+    monkeypatch.setattr(db, '_commit', failing_once)
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('lost',))
+    assert database.flush(5)                # the waiter is released although the batch failed
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('kept',))
+    assert database.flush(5)
+    assert _ids('pallets') == ['kept']
+
+
+def test_configure_again_hands_over_to_one_writer(database, tmp_path):
+    database.execute('INSERT INTO pallets (id) VALUES (?)', ('old',))
+    database.configure(str(tmp_path / 'other.db'))      # commits 'old' to app.db first
+    for i in range(50):
+        database.execute('INSERT INTO pallets (id) VALUES (?)', (f'new{i}',))
+    assert database.flush(5)
+    assert _ids('pallets') == [f'new{i}' for i in range(50)]
+    assert [t.name for t in threading.enumerate()].count('db writer') == 1
+    database.configure(str(tmp_path / 'app.db'))
+    assert _ids('pallets') == ['old']
+
+
+def test_load_or_seed_writes_the_seed_once(database):
+    seed = [{'id': 'J1', 'stage': 'Pending'}, {'id': 'J2', 'stage': 'Packed'}]
+    assert database.load_or_seed('packing_jobs', seed) == seed
+    database.flush(5)
+    database.execute('UPDATE packing_jobs SET stage = ? WHERE id = ?', ('Packed', 'J1'))
+    database.flush(5)
+    stored = database.load_or_seed('packing_jobs', seed)
+    assert [(row['id'], row['stage']) for row in stored] == [('J1', 'Packed'), ('J2', 'Packed')]
+
+
+def test_unconfigured_database_drops_writes():
+    db.execute('INSERT INTO pallets (id) VALUES (?)', ('P1',))
+    assert db.query('SELECT * FROM pallets') == []
+    assert db.flush(0.1)
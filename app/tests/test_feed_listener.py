@@ -0,0 +1,43 @@
+"""Feed listener (components/feed_listener.py): mirrored snapshots keep the server-side elements current."""
+
+import pytest
+from nicegui import Client, ui
+from nicegui.page import page
+
+from components.feed_listener import FeedListener
+
+
+@pytest.fixture
+def client():
+    client = Client(page('/'), request=None)
+    with client:
+        yield client
+    client.delete()
+
+
+def test_mirrored_text_is_the_label_text_without_an_update(client):
+    label = ui.label('12 orders')
+    listener = FeedListener('kpis', {'orders': label})
+    sent = []
+    label.update = lambda: sent.append(label.text)
+
+    listener.mirror({'text': {'orders': '13 orders'}})
+    assert label.text == '13 orders' and sent == []
+    assert listener._state({'text': {'orders': ''}})['text'] == {'orders': '13 orders'}
+
+    label.set_text('12 orders')         # back to the text the label was built with: must reach the browser
+    assert sent == ['12 orders']
+
+
+def test_mirrored_classes_and_chart_data_send_no_update(client):
+    badge = ui.label('up').classes('text-green')
+    chart = ui.echart({'xAxis': {'data': ['d1', 'd2']}, 'series': [{'data': [1, 2]}]})
+    listener = FeedListener('kpis', {'trend': badge, 'daily': chart})
+    sent = []
+    badge.update = chart.update = lambda: sent.append(1)
+
+    listener.mirror({'classes': {'trend': 'text-red'},
+                     'charts': {'daily': {'xAxis': {'data': ['d2', 'd3']}, 'series': [{'data': [2, 3]}]}}})
+    assert badge.classes == ['text-red']
+    assert chart.options['series'][0]['data'] == [2, 3]
+    assert sent == []
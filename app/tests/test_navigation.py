@@ -0,0 +1,46 @@
+"""Navigation registry (services/navigation.py): sidebar link and route pattern lookup."""
+
+import pytest
+
+from services.navigation import NavItem, Navigation
+
+
+def _page():
+    pass
+
+
+@pytest.fixture
+def nav():
+    return Navigation([
+        NavItem('/',                          _page, label='Dashboard'),
+        NavItem('/shipping',                  _page, label='Shipping', also=['/customer']),
+        NavItem('/production',                _page, label='Production'),
+        NavItem('/production/{searchFilter}', _page),
+        NavItem('/settings',                  _page),
+        NavItem('/customer/{kundennummer}',   _page),
+    ])
+
+
+@pytest.mark.parametrize('path, link', [
+    ('/', '/'),
+    ('/shipping', '/shipping'),
+    ('/customer/42', '/shipping'),
+    ('/production/open?sort=eta', '/production'),
+    ('/settings', None),
+])
+def test_resolve_finds_the_sidebar_link(nav, path, link):
+    assert nav.resolve(path) == link
+
+
+@pytest.mark.parametrize('path, route', [
+    ('/', '/'),
+    ('/production', '/production'),
+    ('/production/open?sort=eta', '/production/{searchFilter}'),
+    ('/settings', '/settings'),
+    ('/settings/', '/settings'),
+    ('/customer/42#top', '/customer/{kundennummer}'),
+    ('/customer/42/orders', None),
+    ('/unknown', None),
+])
+def test_route_finds_the_route_pattern(nav, path, route):
+    assert nav.route(path) == route
@@ -0,0 +1,122 @@
+"""Order repository (services/orders.py): keyset paging against a brute-force scan, counts and set_status()."""
+
+import random
+
+import pytest
+
+from services.orders import OrderRepository
+
+STATUSES = ('Open', 'Processing', 'Fulfilled')
+CUSTOMERS = ('Acme Corp', 'Globex', 'Initech', 'Umbrella')
+
+
+def _orders(n=600, seed=3):
+    rng = random.Random(seed)
+    # Whole seconds, so many orders share a creation time and the row number breaks the tie
+    return [{'ts': float(rng.randrange(0, 200)), 'customer': rng.choice(CUSTOMERS), 'product': 'Gear Box',
+             'qty': rng.randrange(1, 9), 'amount': round(rng.uniform(5, 900), 2),
+             'status': rng.choices(STATUSES, (1, 3, 6))[0]} for _ in range(n)]
+
+
+@pytest.fixture
+def repo():
+    repo = OrderRepository()
+    for order in _orders():
+        repo.add(order.pop('ts'), **order)
+    return repo
+
+
+def _scan(repo, status=None, customer=None, start=None, end=None, descending=True):
+    rows = [repo.get(f'ORD-{10_000 + i}') for i in range(len(repo))]
+    rows = [r for r in rows if status in (None, r['status']) and customer in (None, r['customer'])
+            and (start is None or r['ts'] >= start) and (end is None or r['ts'] < end)]
+    rows.sort(key=lambda r: (r['ts'], r['id']), reverse=descending)
+    return [r['id'] for r in rows]
+
+
+def _walk(repo, limit, **filters):
+    ids, cursor = [], None
+    while True:
+        page = repo.page(limit, cursor, **filters)
+        assert len(page['rows']) <= limit
+        ids += [r['id'] for r in page['rows']]
+        cursor = page['next']
+        if cursor is None:
+            return ids
+
+
+FILTERS = [
+    {},
+    {'status': 'Open'},
+    {'customer': 'Globex'},
+    {'status': 'Fulfilled', 'customer': 'Initech'},
+    {'status': 'Open', 'customer': 'Acme Corp', 'start': 40, 'end': 150},
+    {'start': 199.5},
+    {'status': 'Cancelled'},
+]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('descending', [True, False])
+def test_walking_the_cursor_serves_every_match_once_in_order(repo, filters, descending):
+    for limit in (1, 7, 50, 1000):
+        assert _walk(repo, limit, descending=descending, **filters) == _scan(repo, descending=descending, **filters)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_count_matches_the_scan(repo, filters):
+    assert repo.count(**filters) == len(_scan(repo, **filters))
+
+
+@pytest.mark.parametrize('filters', [{}, {'status': 'Processing', 'customer': 'Umbrella'}])
+def test_offset_skips_rows_after_the_cursor(repo, filters):
+    expected = _scan(repo, **filters)
+    first = repo.page(10, **filters)
+    page = repo.page(10, first['next'], offset=15, **filters)
+    assert [r['id'] for r in page['rows']] == expected[25:35]
+
+
+def test_new_orders_do_not_shift_the_pages_after_a_cursor(repo):
+    first = repo.page(20)
+    before = repo.page(20, first['next'])
+    repo.add(500.0, customer='Globex', product='Gear Box', qty=1, amount=1.0, status='Open')
+    repo.add(0.0, customer='Globex', product='Gear Box', qty=1, amount=1.0, status='Open')
+    after = repo.page(20, first['next'])
+    assert after['rows'] == before['rows']
+
+
+def test_set_status_moves_the_order_between_indexes(repo):
+    order = repo.page(1, status='Open', customer='Globex')['rows'][0]
+    open_before = repo.count(status='Open', customer='Globex')
+    done_before = repo.count(status='Fulfilled', customer='Globex')
+    repo.set_status(order['id'], 'Fulfilled')
+    assert repo.get(order['id'])['status'] == 'Fulfilled'
+    assert repo.count(status='Open', customer='Globex') == open_before - 1
+    assert repo.count(status='Fulfilled', customer='Globex') == done_before + 1
+    assert order['id'] not in _walk(repo, 50, status='Open')
+    assert order['id'] in _walk(repo, 50, status='Fulfilled')
+    assert _walk(repo, 50, status='Fulfilled', customer='Globex') == _scan(repo, status='Fulfilled', customer='Globex')
+
+
+def test_extend_builds_the_same_indexes_as_add(repo):
+    bulk = OrderRepository()
+    bulk.extend(_orders())
+    for filters in FILTERS:
+        assert _walk(bulk, 50, **filters) == _walk(repo, 50, **filters)
+        assert bulk.count(**filters) == repo.count(**filters)
+
+
+def test_explain_scans_the_narrower_index(repo):
+    plan = repo.explain(status='Fulfilled', customer='Initech')
+    assert plan.startswith("index customer='Initech'") and plan.endswith("test status='Fulfilled'")
+    assert repo.explain().startswith('index time')
+    assert repo.explain(status='Cancelled').startswith('index none')
+
+
+def test_bad_ids_and_cursors_are_rejected(repo):
+    with pytest.raises(KeyError):
+        repo.get('ORD-9')
+    with pytest.raises(KeyError):
+        repo.set_status('nonsense', 'Open')
+    with pytest.raises(ValueError):
+        repo.page(10, 'not-a-cursor')
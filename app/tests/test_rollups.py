@@ -0,0 +1,96 @@
+"""Rollup cube (services/rollups.py): range totals against the raw events, grouping and move()."""
+
+import random
+import time
+
+import pytest
+
+from services.rollups import DAY, HOUR, RollupCube
+
+STATUSES = ('Open', 'Fulfilled', 'Cancelled')
+CUSTOMERS = ('Acme Corp', 'Globex')
+
+
+@pytest.fixture
+def events():
+    rng = random.Random(7)
+    now = int(time.time() // HOUR * HOUR)
+    return [(now - rng.uniform(0, 100 * DAY), round(rng.uniform(10, 500), 2),
+             rng.choice(STATUSES), rng.choice(CUSTOMERS)) for _ in range(2000)]
+
+
+def _cube(events, **kwargs):
+    cube = RollupCube(('status', 'customer'), **kwargs)
+    for ts, amount, status, customer in events:
+        cube.add(ts, amount, status=status, customer=customer)
+    return cube
+
+
+def _expected(events, start, end, status=None):
+    hits = [amount for ts, amount, s, _ in events if start <= ts < end and status in (None, s)]
+    return len(hits), sum(hits)
+
+
+def test_totals_match_the_raw_events_over_any_hour_aligned_range(events):
+    cube = _cube(events, hour_retention=200 * DAY)
+    rng = random.Random(11)
+    now = int(time.time() // HOUR * HOUR)
+    for _ in range(50):
+        start, end = sorted(now - rng.randrange(0, 110 * 24) * HOUR for _ in range(2))
+        count, amount = cube.totals(start, end)
+        expected_count, expected_amount = _expected(events, start, end)
+        assert count == expected_count
+        assert amount == pytest.approx(expected_amount)
+
+
+def test_a_long_range_is_answered_from_few_buckets(events):
+    cube = _cube(events, hour_retention=200 * DAY)
+    now = time.time()
+    cover = cube._cover(now - 100 * DAY, now)
+    assert len(cover) <= 23 + 30 + 4 + 30 + 23
+    assert {grain for grain, _ in cover} == {'hour', 'day', 'month'}
+
+
+def test_ranges_past_the_hour_retention_round_out_to_whole_days(events):
+    cube = _cube(events, hour_retention=10 * DAY)
+    day = cube._cover(time.time() - 50 * DAY, time.time() - 50 * DAY + HOUR)
+    assert day == [('day', day[0][1])]
+    start, end = day[0][1], day[0][1] + DAY
+    assert cube.totals(start + 5 * HOUR, start + 6 * HOUR)[0] == _expected(events, start, end)[0]
+
+
+def test_totals_group_by_and_filter_where(events):
+    cube = _cube(events)
+    start, end = time.time() - 20 * DAY, time.time() + HOUR
+    by_status = cube.totals(start, end, by='status')
+    assert set(by_status) == set(STATUSES)
+    for status in STATUSES:
+        count, amount = _expected(events, int(start // HOUR * HOUR), end, status)
+        assert by_status[status][0] == count
+        assert by_status[status][1] == pytest.approx(amount)
+    acme = cube.totals(start, end, by='status', where={'customer': 'Acme Corp'})
+    assert sum(n for n, _ in acme.values()) == sum(
+        1 for ts, _, _, c in events if int(start // HOUR * HOUR) <= ts < end and c == 'Acme Corp')
+
+
+def test_move_rebooks_one_event_and_drops_emptied_cells():
+    cube = RollupCube(('status', 'customer'))
+    ts = time.time() - HOUR
+    cube.add(ts, 100.0, status='Open', customer='Acme Corp')
+    cube.move(ts, 100.0, {'status': 'Open', 'customer': 'Acme Corp'}, {'status': 'Fulfilled'})
+    window = (ts - DAY, ts + DAY)
+    assert cube.totals(*window, by='status') == {'Fulfilled': (1, 100.0)}
+    assert cube.totals(*window, by='customer') == {'Acme Corp': (1, 100.0)}
+    assert all(('Open', 'Acme Corp') not in cells
+               for buckets in cube._buckets.values() for cells in buckets.values())
+
+
+def test_series_lists_every_bucket_including_empty_ones():
+    cube = RollupCube(('status', 'customer'))
+    now = time.time()
+    cube.add(now - 2 * DAY, 10.0, status='Open', customer='Globex')
+    series = cube.series(now - 6 * DAY, now, 'day')
+    assert len(series) in (6, 7)
+    assert [start for start, _ in series] == sorted(start for start, _ in series)
+    assert sum(count for _, (count, _) in series) == 1
+    assert sum(1 for _, (count, _) in series if count == 0) == len(series) - 1
@@ -0,0 +1,227 @@
+"""ShipmentTable (services/shipments.py): writes, block views and search over a small table."""
+
+import pytest
+
+from services import shipments
+from services.shipments import ShipmentTable, _mock_table
+
+_ROWS = [
+    ('Acme Corp', 'Berlin',    'DHL',   'Pending',    '2026-03-01', 12.5),
+    ('Beta GmbH', 'Hamburg',   'UPS',   'In Transit', '2026-03-04', 3.0),
+    ('Acme Corp', 'Amsterdam', 'FedEx', 'Delivered',  '2026-02-20', 40.0),
+    ('Gamma Ltd', 'Berlin',    'DHL',   'Delivered',  '2026-02-27', 7.25),
+    ('Delta AG',  'Vienna',    'GLS',   'Cancelled',  '2026-03-09', 18.0),
+]
+
+
+@pytest.fixture
+def table() -> ShipmentTable:
+    t = ShipmentTable()
+    for customer, destination, carrier, status, eta, weight in _ROWS:
+        t.add(customer=customer, destination=destination, carrier=carrier, status=status, eta=eta, weight_kg=weight)
+    return t
+
+
+def _ids(block: dict) -> list[str]:
+    return [row['id'] for row in block['rows']]
+
+
+# ── Writes ────────────────────────────────────────────────────────────────────
+
+def test_update_applies_every_change_as_one_version(table):
+    seen = []
+    table.watch(lambda kind, rows: seen.append((kind, [r['id'] for r in rows])))
+    version = table.version
+    rows = table.update([{'id': 'SHP-100000', 'status': 'Delivered', 'eta': '2026-03-02'},
+                         {'id': 'SHP-100001', 'weight_kg': 4}])
+    assert [r['status'] for r in rows] == ['Delivered', 'In Transit']
+    assert rows[0]['eta'] == '2026-03-02' and rows[1]['weight_kg'] == 4.0
+    assert table.version == version + 1
+    assert seen == [('update', ['SHP-100000', 'SHP-100001'])]
+    assert table.status_counts() == {'Pending': 0, 'In Transit': 1, 'Delivered': 3, 'Cancelled': 1}
+
+
+def test_rejected_update_registers_no_new_value(table):
+    with pytest.raises(ValueError):
+        table.update([{'id': 'SHP-100000', 'status': 'Lost', 'weight_kg': 'x'}])
+    assert 'Lost' not in table.status_counts()
+    table.update([{'id': 'SHP-100000', 'status': 'Lost'}])
+    assert table.status_counts()['Lost'] == 1
+
+
+@pytest.mark.parametrize('bad', [
+    {'id': 'SHP-100001', 'eta': 'not a date'},
+    {'id': 'SHP-100001', 'weight_kg': 'heavy'},
+    {'id': 'SHP-100001', 'carrier': None},
+    {'id': 'SHP-100001', 'colour': 'red'},
+])
+def test_update_with_a_bad_value_changes_nothing(table, bad):
+    before = table.block(0, 10)['rows']
+    counts, version = table.status_counts(), table.version
+    with pytest.raises(ValueError):
+        table.update([{'id': 'SHP-100000', 'status': 'Cancelled'}, bad])
+    assert table.block(0, 10)['rows'] == before
+    assert table.status_counts() == counts
+    assert table.version == version
+
+
+def test_update_of_an_unknown_or_removed_id_raises_key_error(table):
+    table.remove(['SHP-100002'])
+    for id in ('SHP-100002', 'SHP-999999', 'nonsense'):
+        with pytest.raises(KeyError):
+            table.update([{'id': id, 'status': 'Pending'}])
+
+
+def test_add_and_remove_keep_length_and_counts(table):
+    row = table.add(customer='Omega SA', destination='Oslo', carrier='DPD', status='Pending',
+                    eta='2026-04-01', weight_kg=1.0)
+    assert row['id'] == 'SHP-100005'
+    table.remove(['SHP-100000', 'SHP-100005'])
+    assert len(table) == 4
+    assert table.status_counts()['Pending'] == 0
+    assert 'SHP-100000' not in _ids(table.block(0, 10))
+
+
+# ── Block views ───────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def mock():
+    return _mock_table(3000)
+
+
+def _all(table: ShipmentTable) -> list[dict]:
+    return list(table.rows()[1])
+
+
+def test_blocks_page_through_the_whole_view(table):
+    view = table.block(0, 10, sort=[{'colId': 'eta', 'sort': 'asc'}])
+    pages = [table.block(start, start + 2, sort=[{'colId': 'eta', 'sort': 'asc'}]) for start in range(0, 6, 2)]
+    assert [id for page in pages for id in _ids(page)] == _ids(view)
+    assert all(page['last'] == 5 for page in pages)
+    assert [row['eta'] for row in view['rows']] == sorted(eta for *_, eta, _ in _ROWS)
+
+
+@pytest.mark.parametrize('sort', [
+    [{'colId': 'eta', 'sort': 'desc'}],
+    [{'colId': 'weight_kg', 'sort': 'asc'}],
+    [{'colId': 'customer', 'sort': 'asc'}, {'colId': 'weight_kg', 'sort': 'desc'}],
+    [{'colId': 'status', 'sort': 'desc'}, {'colId': 'carrier', 'sort': 'asc'}, {'colId': 'id', 'sort': 'desc'}],
+])
+def test_sort_matches_a_plain_sort_of_the_rows(mock, sort):
+    expected = _all(mock)
+    for entry in reversed(sort):
+        expected.sort(key=lambda row: row[entry['colId']], reverse=entry['sort'] == 'desc')
+    assert _ids(mock.block(0, len(mock), sort=sort)) == [row['id'] for row in expected]
+
+
+@pytest.mark.parametrize('filters, keep', [
+    ({'carrier': {'filterType': 'text', 'type': 'contains', 'filter': 'DH'}},
+     lambda row: 'dh' in row['carrier'].lower()),
+    ({'customer': {'filterType': 'text', 'operator': 'OR', 'conditions': [
+        {'filterType': 'text', 'type': 'startsWith', 'filter': 'acme'},
+        {'filterType': 'text', 'type': 'endsWith', 'filter': 'gmbh'}]}},
+     lambda row: row['customer'].lower().startswith('acme') or row['customer'].lower().endswith('gmbh')),
+    ({'weight_kg': {'filterType': 'number', 'type': 'inRange', 'filter': 10, 'filterTo': 20}},
+     lambda row: 10 < row['weight_kg'] < 20),
+    ({'id': {'filterType': 'text', 'type': 'endsWith', 'filter': '7'},
+      'status': {'filterType': 'text', 'type': 'notEqual', 'filter': 'delivered'}},
+     lambda row: row['id'].endswith('7') and row['status'] != 'Delivered'),
+    ({'eta': {'filterType': 'text', 'type': 'startsWith', 'filter': '2026-0'}},
+     lambda row: row['eta'].startswith('2026-0')),
+])
+def test_filters_match_a_plain_filter_of_the_rows(mock, filters, keep):
+    block = mock.block(0, len(mock), filters=filters)
+    expected = [row['id'] for row in _all(mock) if keep(row)]
+    assert _ids(block) == expected
+    assert block['last'] == len(expected)
+
+
+def test_a_write_starts_a_new_view(table):
+    carrier = {'carrier': {'filterType': 'text', 'type': 'equals', 'filter': 'dhl'}}
+    assert table.block(0, 10, filters=carrier)['last'] == 2
+    table.update([{'id': 'SHP-100001', 'carrier': 'DHL'}])
+    assert _ids(table.block(0, 10, filters=carrier)) == ['SHP-100000', 'SHP-100001', 'SHP-100003']
+    table.remove(['SHP-100000'])
+    assert _ids(table.block(0, 10, filters=carrier)) == ['SHP-100001', 'SHP-100003']
+
+
+@pytest.mark.parametrize('sort, filters', [
+    ([{'colId': 'colour', 'sort': 'asc'}], None),
+    (['eta'], None),
+    (None, {'colour': {'filterType': 'text', 'type': 'contains', 'filter': 'red'}}),
+    (None, {'carrier': {'filterType': 'text', 'type': 'soundsLike', 'filter': 'dhl'}}),
+    (None, {'weight_kg': {'filterType': 'number', 'type': 'roughly', 'filter': 3}}),
+    (None, {'carrier': 'dhl'}),
+    ([{'colId': 'eta', 'sort': 'sideways'}], None),
+    ({'colId': 'eta'}, None),
+    (None, [1]),
+    (None, {'weight_kg': {'filterType': 'number', 'type': 'lessThan', 'filter': '10'}}),
+    (None, {'weight_kg': {'filterType': 'number', 'type': 'inRange', 'filter': 10}}),
+    (None, {'weight_kg': {'filterType': 'number', 'operator': 'OR', 'conditions': [5]}}),
+    (None, {'carrier': {'filterType': 'text', 'operator': 'OR', 'conditions': 'dhl'}}),
+])
+def test_malformed_sort_or_filter_models_raise_value_error(table, sort, filters):
+    with pytest.raises(ValueError):
+        table.block(0, 10, sort=sort, filters=filters)
+
+
+# ── Search ────────────────────────────────────────────────────────────────────
+
+_FIELDS = ('id', 'customer', 'destination', 'carrier')
+
+
+@pytest.mark.parametrize('query', ['acme', 'ber', 'dhl mun', 'gmbh ams', 'ups 1001', '100 ups', 'shp-1002 lyo', 'shp lyo', 'zzz', 'acme qqq'])
+def test_search_finds_the_rows_matching_every_word(mock, query):
+    found = _ids(mock.block(0, len(mock), search=query))
+    expected = {row['id'] for row in _all(mock)
+                if all(any(word in row[f].lower() for f in _FIELDS) for word in query.split())}
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+
+def test_search_ranks_by_field_and_match_quality(table):
+    table.add(customer='Graham Ltd', destination='Oslo', carrier='DPD', status='Pending', eta='2026-04-01', weight_kg=1.0)
+    table.add(customer='Hamilton Co', destination='Oslo', carrier='DPD', status='Pending', eta='2026-04-01', weight_kg=1.0)
+    # customer, start of a word > destination, start of a word > customer, inside a word
+    assert _ids(table.block(0, 10, search='ham')) == ['SHP-100006', 'SHP-100001', 'SHP-100005']
+    assert _ids(table.block(0, 10, search='acme ber')) == ['SHP-100000']
+    assert _ids(table.block(0, 10, search='100003')) == ['SHP-100003']
+
+
+def test_search_combines_with_sort_and_filters(table):
+    block = table.block(0, 10, sort=[{'colId': 'weight_kg', 'sort': 'desc'}], search='acme',
+                        filters={'status': {'filterType': 'text', 'type': 'notEqual', 'filter': 'pending'}})
+    assert _ids(block) == ['SHP-100002'] and block['last'] == 1
+    assert _ids(table.block(0, 10, sort=[{'colId': 'eta', 'sort': 'asc'}], search='berlin')) == ['SHP-100003', 'SHP-100000']
+
+
+def test_search_follows_adds_and_removes(table):
+    assert _ids(table.block(0, 10, search='acme')) == ['SHP-100000', 'SHP-100002']
+    table.remove(['SHP-100000'])
+    row = table.add(customer='Acme Corp', destination='Oslo', carrier='DPD', status='Pending',
+                    eta='2026-04-01', weight_kg=1.0)
+    assert _ids(table.block(0, 10, search='acme')) == ['SHP-100002', row['id']]
+    assert _ids(table.block(0, 10, search=row['id'].lower())) == [row['id']]
+
+
+# ── Storage ───────────────────────────────────────────────────────────────────
+
+def test_table_comes_back_from_the_database_as_written(database, monkeypatch):
+    monkeypatch.setattr(shipments, '_MOCK_ROWS', 50)
+    monkeypatch.setattr(shipments, '_table', None)
+    first = shipments.table()
+    first.update([{'id': 'SHP-100003', 'status': 'Cancelled', 'weight_kg': 99.5}])
+    first.remove(['SHP-100007', 'SHP-100049'])
+    added = first.add(customer='Omega SA', destination='Oslo', carrier='DPD', status='Pending',
+                      eta='2026-04-01', weight_kg=1.0)
+    assert database.flush(5)
+
+    monkeypatch.setattr(shipments, '_table', None)
+    second = shipments.table()
+    assert second is not first
+    assert _all(second) == _all(first)
+    assert second.status_counts() == first.status_counts()
+    with pytest.raises(KeyError):
+        second.update([{'id': 'SHP-100007', 'status': 'Pending'}])     # removed rows stay removed
+    assert second.add(customer='Omega SA', destination='Oslo', carrier='DPD', status='Pending',
+                      eta='2026-04-01', weight_kg=1.0)['id'] == f'SHP-{int(added["id"][4:]) + 1}'
@@ -0,0 +1,69 @@
+"""LTTB downsampling (services/timeseries.py): output shape, kept extremes and gaps."""
+
+import math
+import random
+
+import pytest
+
+from services.timeseries import downsample
+
+
+def _series(n, seed=1):
+    rng = random.Random(seed)
+    times = [1_700_000_000 + 60 * i for i in range(n)]
+    values = [50 + 10 * math.sin(i / 40) + rng.uniform(-1, 1) for i in range(n)]
+    return times, values
+
+
+def test_short_series_come_back_unchanged():
+    times, values = _series(100)
+    assert downsample(times, values, 100) == (times, values)
+
+
+@pytest.mark.parametrize('n, points', [(1440, 800), (10_000, 300), (1000, 3), (7, 5)])
+def test_output_is_points_samples_in_order_with_both_ends(n, points):
+    times, values = _series(n)
+    out_t, out_v = downsample(times, values, points)
+    assert len(out_t) == len(out_v) == points
+    assert (out_t[0], out_v[0]) == (times[0], values[0])
+    assert (out_t[-1], out_v[-1]) == (times[-1], values[-1])
+    assert out_t == sorted(set(out_t))
+    sample = dict(zip(times, values))
+    assert all(sample[t] == v for t, v in zip(out_t, out_v))
+
+
+def test_one_sample_per_bucket():
+    times, values = _series(1000)
+    out_t, _ = downsample(times, values, 100)
+    size = (1000 - 2) / 98
+    buckets = [range(int(i * size) + 1, int((i + 1) * size) + 1) for i in range(98)]
+    assert all(times.index(t) in bucket for t, bucket in zip(out_t[1:-1], buckets, strict=True))
+
+
+def test_spikes_and_dips_survive():
+    times, values = _series(5000)
+    values[1234], values[3210] = 500.0, -400.0
+    _, out_v = downsample(times, values, 200)
+    assert 500.0 in out_v and -400.0 in out_v
+
+
+def test_gaps_are_dropped_before_sampling():
+    times, values = _series(2000)
+    for i in range(300, 700):
+        values[i] = None
+    out_t, out_v = downsample(times, values, 250)
+    assert len(out_t) == 250 and None not in out_v
+    assert not any(times[300] <= t <= times[699] for t in out_t)
+
+
+def test_mostly_empty_series_keeps_its_samples():
+    times, values = _series(1000)
+    values = [v if i % 10 == 0 else None for i, v in enumerate(values)]
+    out_t, out_v = downsample(times, values, 200)
+    assert out_t == times[::10] and out_v == values[::10]
+
+
+@pytest.mark.parametrize('points', [1, 2])
+def test_fewer_than_three_points_keeps_the_ends(points):
+    times, values = _series(50)
+    assert downsample(times, values, points) == ([times[0], times[-1]][:points], [values[0], values[-1]][:points])